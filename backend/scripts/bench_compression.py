@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark de compressão das listagens grandes.
+
+Gera um payload no formato de GET /propriedades/ e mede, para cada codec e
+nível, o tempo de CPU gasto e os bytes economizados, tanto comprimindo o
+corpo inteiro quanto em streaming (flush a cada lote de itens).
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from shared.utils.compression import ENCODERS
+
+ESTADOS = ["MT", "GO", "PR", "RS", "MS", "SP", "MG", "BA", "TO", "MA"]
+CIDADES = ["Sorriso", "Rio Verde", "Cascavel", "Passo Fundo", "Dourados", "Ribeirão Preto", "Uberaba", "Barreiras"]
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 6, 11], "zstd": [1, 3, 6, 12]}
+
+def gerar_propriedades(quantidade: int) -> list[dict]:
+    rnd = random.Random(42)
+    itens = []
+    for i in range(quantidade):
+        total = round(rnd.uniform(50, 5000), 2)
+        agricultavel = round(total * rnd.uniform(0.3, 0.7), 2)
+        itens.append({
+            "id": i + 1,
+            "nome": f"Fazenda {rnd.choice(['Santa', 'Boa', 'Nova', 'São'])} {i}",
+            "cidade": rnd.choice(CIDADES),
+            "estado": rnd.choice(ESTADOS),
+            "area_total": total,
+            "area_agricultavel": agricultavel,
+            "area_vegetacao": round(total - agricultavel, 2),
+            "produtor": {"id": i // 3 + 1, "cpf_cnpj": f"{rnd.randrange(10**10, 10**11)}", "nome": f"Produtor {i // 3}"},
+        })
+    return itens
+
+def medir(fn, repeticoes: int) -> tuple[float, int]:
+    tempos, tamanho = [], 0
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        tamanho = fn()
+        tempos.append(time.process_time() - inicio)
+    tempos.sort()
+    return tempos[len(tempos) // 2], tamanho
+
+def comprimir_inteiro(cls, nivel, corpo):
+    encoder = cls(nivel)
+    return len(encoder.compress(corpo) + encoder.finish())
+
+def comprimir_stream(cls, nivel, chunks):
+    encoder = cls(nivel)
+    total = 0
+    for chunk in chunks:
+        total += len(encoder.compress(chunk) + encoder.flush())
+    return total + len(encoder.finish())
+
+def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--itens", type=int, default=20000)
+    parser.add_argument("--lote", type=int, default=100, help="itens por chunk no modo streaming")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    itens = gerar_propriedades(args.itens)
+    corpo = json.dumps(itens).encode()
+    chunks = [json.dumps(itens[i:i + args.lote]).encode() for i in range(0, len(itens), args.lote)]
+
+    print(f"Payload: {args.itens} propriedades, {len(corpo) / 1024:.0f} KiB sem compressão")
+    print(f"{'codec':<6} {'nível':>5} {'modo':<7} {'bytes':>10} {'razão':>7} {'economia':>9} {'cpu ms':>8} {'MB/s':>8}")
+    for nome, cls in ENCODERS.items():
+        for nivel in LEVELS[nome]:
+            for modo, fn in (("inteiro", lambda: comprimir_inteiro(cls, nivel, corpo)), ("stream", lambda: comprimir_stream(cls, nivel, chunks))):
+                cpu, tamanho = medir(fn, args.repeticoes)
+                print(
+                    f"{nome:<6} {nivel:>5} {modo:<7} {tamanho:>10} {len(corpo) / tamanho:>6.1f}x "
+                    f"{(1 - tamanho / len(corpo)) * 100:>8.1f}% {cpu * 1000:>8.1f} {len(corpo) / cpu / 1e6 if cpu else float('inf'):>8.1f}"
+                )
+
+if __name__ == "__main__":
+    main()
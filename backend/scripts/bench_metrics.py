@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark do custo da instrumentação de métricas.
+
+Chama uma aplicação ASGI mínima com e sem o MetricsMiddleware e mede a
+diferença por requisição; faz o mesmo com os hooks de statement da engine
+e com o ``operacao_atual`` dos repositórios. O orçamento é de poucos
+microssegundos por requisição.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from shared.database import metrics as db_metrics
+from shared.middlewares.metrics import MetricsMiddleware
+from shared.utils.instrumentation import instrumentado
+
+ROTA = SimpleNamespace(path="/produtores/{produtor_id}")
+INICIO = {"type": "http.response.start", "status": 200, "headers": []}
+CORPO = {"type": "http.response.body", "body": b'{"id": 1}'}
+
+async def app(scope, receive, send):
+    scope["route"] = ROTA
+    await send(INICIO)
+    await send(CORPO)
+
+async def send(message):
+    pass
+
+async def receive():
+    return {"type": "http.request"}
+
+async def medir_requisicoes(alvo, repeticoes: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/produtores/1", "headers": []}
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        await alvo(dict(scope), receive, send)
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+@instrumentado
+class Repositorio:
+    async def get_by_id(self, _id):
+        return _id
+
+class RepositorioSemMarca:
+    async def get_by_id(self, _id):
+        return _id
+
+async def medir_repositorio(repositorio, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for i in range(repeticoes):
+        await repositorio.get_by_id(i)
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+def medir_hooks(repeticoes: int) -> float:
+    # O mesmo caminho do por_statement: o que _antes devolve passa pela
+    # pilha da conexão e volta para o _depois
+    conn = SimpleNamespace(info={})
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        conn.info.setdefault("metrics_inicio", []).append(db_metrics._antes(conn, "SELECT 1", (), False))
+        db_metrics._depois(conn, conn.info["metrics_inicio"].pop(), None, "SELECT 1", (), False)
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+def mediana(valores):
+    return sorted(valores)[len(valores) // 2]
+
+async def executar(args):
+    instrumentada = MetricsMiddleware(app)
+    sem, com, repo_sem, repo_com, hooks = [], [], [], [], []
+    for _ in range(args.rodadas):
+        sem.append(await medir_requisicoes(app, args.repeticoes))
+        com.append(await medir_requisicoes(instrumentada, args.repeticoes))
+        repo_sem.append(await medir_repositorio(RepositorioSemMarca(), args.repeticoes))
+        repo_com.append(await medir_repositorio(Repositorio(), args.repeticoes))
+        hooks.append(medir_hooks(args.repeticoes))
+
+    print(f"{'medida':<40} {'µs':>8}")
+    print(f"{'requisição sem middleware':<40} {mediana(sem):>8.2f}")
+    print(f"{'requisição com middleware':<40} {mediana(com):>8.2f}")
+    print(f"{'custo do middleware':<40} {mediana(com) - mediana(sem):>8.2f}")
+    print(f"{'custo de @instrumentado por chamada':<40} {mediana(repo_com) - mediana(repo_sem):>8.2f}")
+    print(f"{'hooks da engine por statement':<40} {mediana(hooks):>8.2f}")
+
+def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticoes", type=int, default=100000)
+    parser.add_argument("--rodadas", type=int, default=5)
+    asyncio.run(executar(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
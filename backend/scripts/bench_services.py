@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark da CPU dos services com os repositórios em memória.
+
+Sem banco, sem sessão e sem rede, o tempo medido é o dos services, dos
+DTOs e das entidades do ORM. Roda milhões de operações em segundos e
+aceita ``--perfil`` para ver com o cProfile onde o tempo vai.
+"""
+
+import argparse
+import asyncio
+import cProfile
+import pstats
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from modules.cultura.dtos.cultura_dto import CulturaCreateDTO
+from modules.cultura.repositories.catalogo_cultura_memoria_repository import CatalogoCulturaMemoriaRepository
+from modules.cultura.repositories.cultura_memoria_repository import CulturaMemoriaRepository
+from modules.cultura.services.catalogo_cultura_service import CatalogoCulturaCache, CatalogoCulturaService
+from modules.cultura.services.cultura_service import CulturaService
+from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO, ProdutorPatchDTO
+from modules.produtor.repositories.produtor_memoria_repository import ProdutorMemoriaRepository
+from modules.produtor.services.produtor_service import ProdutorService
+from modules.propriedade.dtos.propriedade_dto import PropriedadeCreateDTO, PropriedadePatchDTO
+from modules.propriedade.repositories.propriedade_memoria_repository import PropriedadeMemoriaRepository
+from modules.propriedade.services.propriedade_mirror import PropriedadeMirror
+from modules.propriedade.services.propriedade_service import PropriedadeService
+from modules.safra.dtos.safra_dto import SafraCreateDTO
+from modules.safra.repositories.safra_memoria_repository import SafraMemoriaRepository
+from modules.safra.services.safra_service import SafraService
+from shared.database.memoria import BancoEmMemoria
+from shared.utils.documento_fiscal import DocumentoFiscal, TIPO_CPF
+
+CULTURAS = ["Soja", "Milho", "Café", "Algodão", "Cana-de-açúcar"]
+
+def cpf(numero: int) -> str:
+    return str(DocumentoFiscal.from_chave(TIPO_CPF, numero))
+
+def servicos(banco: BancoEmMemoria) -> dict:
+    catalogo = CatalogoCulturaService(CatalogoCulturaMemoriaRepository(banco), CatalogoCulturaCache())
+    return {
+        "produtor": ProdutorService(ProdutorMemoriaRepository(banco)),
+        "propriedade": PropriedadeService(PropriedadeMemoriaRepository(banco), PropriedadeMirror()),
+        "safra": SafraService(SafraMemoriaRepository(banco)),
+        "cultura": CulturaService(CulturaMemoriaRepository(banco), catalogo, SafraMemoriaRepository(banco)),
+    }
+
+async def cenarios(s: dict, n: int):
+    """Cada cenário é (nome, corrotina que executa n operações)."""
+    async def criar_produtores():
+        for i in range(n):
+            await s["produtor"].create_produtor(ProdutorCreateDTO(cpf_cnpj=cpf(100000 + i), nome=f"Produtor {i}"))
+
+    async def buscar_produtores():
+        for i in range(n):
+            await s["produtor"].get_produtor_by_id(i % n + 1)
+
+    async def buscar_por_documento():
+        for i in range(n):
+            await s["produtor"].repository.get_by_cpf_cnpj(cpf(100000 + i))
+
+    async def alterar_produtores():
+        for i in range(n):
+            produtor = await s["produtor"].get_produtor_by_id(i % n + 1)
+            await s["produtor"].patch_produtor(produtor.id, ProdutorPatchDTO(versao=produtor.versao, nome=f"Alterado {i}"))
+
+    async def criar_propriedades():
+        for i in range(n):
+            await s["propriedade"].create_propriedade(PropriedadeCreateDTO(
+                nome=f"Fazenda {i}", cidade="Sorriso", estado="MT",
+                area_total=1000, area_agricultavel=600, area_vegetacao=300, produtor_id=i % n + 1,
+            ))
+
+    async def alterar_propriedades():
+        for i in range(n):
+            propriedade = await s["propriedade"].get_propriedade_by_id(i % n + 1)
+            await s["propriedade"].patch_propriedade(propriedade.id, PropriedadePatchDTO(versao=propriedade.versao, area_vegetacao=200 + i % 100))
+
+    async def criar_safras():
+        for i in range(n):
+            await s["safra"].create_safra(SafraCreateDTO(ano=2020 + i % 5, propriedade_id=i % n + 1))
+
+    async def criar_culturas():
+        for i in range(n):
+            await s["cultura"].create_cultura(CulturaCreateDTO(nome=CULTURAS[i % len(CULTURAS)], safra_id=i % n + 1, propriedade_id=i % n + 1))
+
+    return [
+        ("produtor: create", criar_produtores),
+        ("produtor: get_by_id", buscar_produtores),
+        ("produtor: get_by_cpf_cnpj", buscar_por_documento),
+        ("produtor: get + patch", alterar_produtores),
+        ("propriedade: create", criar_propriedades),
+        ("propriedade: get + patch", alterar_propriedades),
+        ("safra: create", criar_safras),
+        ("cultura: create", criar_culturas),
+    ]
+
+async def executar(args):
+    s = servicos(BancoEmMemoria())
+    perfil = cProfile.Profile() if args.perfil else None
+    print(f"{'cenário':<32} {'ops/s':>12} {'µs/op':>8}")
+    for nome, cenario in await cenarios(s, args.operacoes):
+        if perfil:
+            perfil.enable()
+        inicio = time.perf_counter()
+        await cenario()
+        decorrido = time.perf_counter() - inicio
+        if perfil:
+            perfil.disable()
+        print(f"{nome:<32} {args.operacoes / decorrido:>12,.0f} {decorrido / args.operacoes * 1e6:>8.2f}")
+    if perfil:
+        pstats.Stats(perfil).sort_stats("cumulative").print_stats(25)
+
+def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--operacoes", type=int, default=100000, help="operações por cenário")
+    parser.add_argument("--perfil", action="store_true", help="imprime o cProfile dos cenários")
+    asyncio.run(executar(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Exporta produtores, propriedades, safras e culturas para Parquet.
+
+Lê da réplica (READ_DATABASE_URL, ou o primário se não houver) em lotes por
+cursor no servidor. Sem --completo, exporta só o que mudou desde a última
+execução registrada no manifesto do destino.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from shared.config.settings import settings
+from shared.database.session import read_engine
+from shared.snapshots.exporter import SnapshotExporter
+
+async def run(args):
+    exporter = SnapshotExporter(read_engine, args.destino, args.lote)
+    resumo = await exporter.export(completo=args.completo)
+    await read_engine.dispose()
+    print(json.dumps(resumo, indent=2))
+
+def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--destino", default=settings.snapshot_dir)
+    parser.add_argument("--lote", type=int, default=settings.snapshot_batch_size)
+    parser.add_argument("--completo", action="store_true", help="reescreve o snapshot inteiro (captura exclusões)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Confere se o backend colunar do dashboard devolve o mesmo que o SQL.
+
+Exporta um snapshot completo, carrega-o e compara indicador a indicador com
+o DashboardService consultando o mesmo banco. Sai com código 1 se houver
+divergência. Rode com o banco parado para escrita, senão o snapshot e as
+consultas podem ver estados diferentes.
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from shared.database.session import SessionLocal, read_engine
+from shared.snapshots.cache import SnapshotCache
+from shared.snapshots.exporter import SnapshotExporter
+from modules.dashboard.services.dashboard_service import DashboardService
+from modules.dashboard.services.columnar_dashboard_service import ColumnarDashboardService
+from modules.dashboard.services.dashboard_validation import compare_backends
+
+async def run(destino: Path) -> int:
+    await SnapshotExporter(read_engine, destino).export(completo=True)
+    snapshot = SnapshotCache(destino, ("propriedades", "culturas", "catalogo_culturas"), refresh_s=0)
+    await snapshot.load()
+    async with SessionLocal() as session:
+        divergencias = await compare_backends(DashboardService(session), ColumnarDashboardService(snapshot))
+    await read_engine.dispose()
+    for kpi, (sql, colunar) in divergencias.items():
+        print(f"{kpi}:\n  sql:     {sql}\n  colunar: {colunar}")
+    print("OK: resultados idênticos" if not divergencias else f"{len(divergencias)} indicador(es) divergente(s)")
+    return 1 if divergencias else 0
+
+def main():
+    """Função principal do script."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--destino", help="pasta do snapshot (padrão: temporária)")
+    args = parser.parse_args()
+    if args.destino:
+        sys.exit(asyncio.run(run(Path(args.destino))))
+    with tempfile.TemporaryDirectory() as destino:
+        sys.exit(asyncio.run(run(Path(destino))))
+
+if __name__ == "__main__":
+    main()
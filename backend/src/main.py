@@ -1,7 +1,106 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import logging
+from datetime import date
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from shared.config.settings import settings
+from shared.database.partitions import ensure_partition_window, partition_window
+from shared.database.session import SessionLocal, engine, read_engine
+from shared.database.warmup import warm_up
+from shared.middlewares.admission import AdmissionControlMiddleware
+from shared.middlewares.compression import CompressionMiddleware
+from shared.middlewares.deadline import DeadlineMiddleware
+from shared.middlewares.metrics import MetricsMiddleware
+from shared.middlewares.profiling import ProfilingMiddleware
+from shared.middlewares.tracing import TracingMiddleware
+from shared.utils.tracing import tracer
+from modules.produtor.controllers.produtor_controller import router as produtor_router
+from modules.propriedade.controllers.propriedade_controller import router as propriedade_router
+from modules.safra.controllers.safra_controller import router as safra_router
+from modules.cultura.controllers.cultura_controller import router as cultura_router
+from modules.dashboard.controllers.dashboard_controller import router as dashboard_router
+from modules.jobs.controllers.job_controller import router as job_router
+from modules.debug.controllers.debug_controller import router as debug_router
+from modules.changes.controllers.change_controller import router as change_router
+from modules.metrics.controllers.metrics_controller import router as metrics_router
+from modules.jobs.services.job_runner import job_runner
+from modules.propriedade.services.propriedade_mirror import propriedade_mirror, run_reconciliation
+
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+logger = logging.getLogger(__name__)
+
+ROUTERS = [
+    produtor_router,
+    propriedade_router,
+    safra_router,
+    cultura_router,
+    dashboard_router,
+    job_router,
+    change_router,
+    debug_router,
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    engines = {engine, read_engine}
+    aquecidas = 0
+    for target in engines:
+        aquecidas += await warm_up(target, settings.db_warmup_connections)
+    anos = partition_window(date.today(), settings.partition_years_behind, settings.partition_years_ahead)
+    particoes = await ensure_partition_window(engine, anos)
+    app.state.startup = {
+        "import_s": round(IMPORT_SECONDS, 4),
+        "warmup_s": round(time.perf_counter() - started, 4),
+        "conexoes_aquecidas": aquecidas,
+        "particoes_criadas": particoes,
+    }
+    logger.info("Startup: %s", app.state.startup)
+    retomados = await job_runner.resume()
+    if retomados:
+        logger.info("Jobs retomados: %s", retomados)
+    reconciliacao = None
+    if settings.dashboard_backend == "memoria":
+        reconciliacao = asyncio.create_task(
+            run_reconciliation(propriedade_mirror, SessionLocal, settings.propriedade_mirror_reconcile_s)
+        )
+    yield
+    if reconciliacao is not None:
+        reconciliacao.cancel()
+    await job_runner.shutdown()
+    await tracer.encerrar()
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="Cadastro de Produtores Rurais", lifespan=lifespan)
+    for router in ROUTERS:
+        app.include_router(router)
+    # O mais interno: o perfil cobre a task que executa a rota, sem a fila de admissão
+    if settings.profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware)
+    if settings.admission_enabled:
+        app.add_middleware(AdmissionControlMiddleware)
+    # Por fora da admissão: a espera na fila conta no prazo
+    if settings.deadline_enabled:
+        app.add_middleware(DeadlineMiddleware)
+    # Por fora de todos: conta também os 503 da admissão e os 504 de prazo
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+        app.include_router(metrics_router)
+    # Span raiz por fora de tudo, para a fila e o prazo entrarem no trace
+    if settings.tracing_exporter:
+        app.add_middleware(TracingMiddleware)
+
+    @app.get("/")
+    def root():
+        return {"message": "API de Cadastro de Produtores Rurais"}
 
-app = FastAPI(title="Cadastro de Produtores Rurais")
+    return app
 
-@app.get("/")
-def root():
-    return {"message": "API de Cadastro de Produtores Rurais"} 
\ No newline at end of file
+app = create_app()
\ No newline at end of file
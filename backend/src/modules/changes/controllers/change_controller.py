@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared.database.session import get_read_db
+from modules.changes.dtos.alteracao_dto import AlteracoesDTO
+from modules.changes.repositories.alteracao_repository import AlteracaoRepository
+from modules.changes.services.change_service import ChangeService
+from shared.utils.tracing import RotaInstrumentada
+
+router = APIRouter(prefix="/changes", tags=["Changes"], route_class=RotaInstrumentada)
+
+@router.get("", response_model=AlteracoesDTO)
+async def list_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    service = ChangeService(AlteracaoRepository(db))
+    return await service.get_changes(since, limit)
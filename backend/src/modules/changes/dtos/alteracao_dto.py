@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Any, Optional
+
+class AlteracaoReadDTO(BaseModel):
+    seq: int
+    entidade: str
+    entidade_id: int
+    operacao: str
+    dados: Optional[dict[str, Any]] = None
+    criado_em: datetime
+
+    class Config:
+        from_attributes = True
+
+class AlteracoesDTO(BaseModel):
+    alteracoes: list[AlteracaoReadDTO]
+    # Valor de since para a próxima chamada
+    proximo: int
+    mais: bool
@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON
+from shared.database.base import Base
+
+class Alteracao(Base):
+    __tablename__ = "alteracoes"
+    # BIGSERIAL no Postgres; o SQLite só incrementa sozinho INTEGER PRIMARY KEY
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    entidade = Column(String(30), nullable=False)
+    entidade_id = Column(Integer, nullable=False)
+    operacao = Column(String(10), nullable=False)
+    # Linha completa na criação e na alteração; vazio na exclusão (tombstone)
+    dados = Column(JSON, nullable=True)
+    criado_em = Column(DateTime, nullable=False, default=datetime.utcnow)
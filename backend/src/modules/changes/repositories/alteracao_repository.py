@@ -0,0 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from modules.changes.entities.alteracao import Alteracao
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class AlteracaoRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_since(self, since: int, limit: int) -> list[Alteracao]:
+        result = await self.session.execute(
+            select(Alteracao).where(Alteracao.seq > since).order_by(Alteracao.seq).limit(limit)
+        )
+        return list(result.scalars().all())
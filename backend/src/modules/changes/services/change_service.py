@@ -0,0 +1,109 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from modules.changes.entities.alteracao import Alteracao
+from modules.changes.repositories.alteracao_repository import AlteracaoRepository
+from modules.produtor.entities.produtor import Produtor
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.safra.entities.safra import Safra
+from modules.cultura.entities.cultura import Cultura
+from shared.utils.instrumentation import instrumentado
+
+# Entidades publicadas em /changes, com o nome que o cliente recebe
+RASTREADAS = {
+    Produtor: "produtor",
+    Propriedade: "propriedade",
+    Safra: "safra",
+    Cultura: "cultura",
+}
+
+# Chave do advisory lock que ordena as gravações no changelog
+CHANGELOG_LOCK = 39039
+# Linhas do changelog da transação em curso, gravadas no commit
+PENDENTES = "alteracoes_pendentes"
+
+def linha_de_alteracao(objeto, operacao: str) -> dict:
+    dados = None
+    if operacao != "exclusao":
+        mapper = inspect(objeto).mapper
+        dados = {coluna.key: getattr(objeto, coluna.key) for coluna in mapper.column_attrs}
+        # Campos compostos (como o documento do produtor) vão no formato da API
+        for composto in mapper.composites:
+            for coluna in composto.props:
+                dados.pop(coluna.key, None)
+            dados[composto.key] = getattr(objeto, composto.key)
+        # Controle interno da exclusão lógica, fora do payload publicado
+        dados.pop("excluido_em", None)
+    return {"entidade": RASTREADAS[type(objeto)], "entidade_id": objeto.id, "operacao": operacao, "dados": dados}
+
+def coletar_alteracoes(session: Session) -> list[dict]:
+    """Linhas do changelog para o que o flush em curso gravou."""
+    linhas = []
+    for objetos, operacao in ((session.new, "criacao"), (session.dirty, "alteracao"), (session.deleted, "exclusao")):
+        for objeto in objetos:
+            if type(objeto) not in RASTREADAS:
+                continue
+            if operacao == "alteracao" and not session.is_modified(objeto, include_collections=False):
+                continue
+            linhas.append(linha_de_alteracao(objeto, operacao))
+    return linhas
+
+def gravar_alteracoes(connection, linhas: list[dict]):
+    """Grava as linhas; chamar só no fim da transação, logo antes do commit.
+
+    No Postgres o advisory lock, preso até o commit, faz a ordem do seq ser
+    a ordem de commit: sem isso uma transação lenta poderia aparecer com um
+    seq menor do que o que o cliente já leu, e ele nunca a veria. O preço é
+    serializar os commits que gravam no changelog, mas só do INSERT aqui até
+    o commit, não a transação inteira.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({CHANGELOG_LOCK})")
+    connection.execute(Alteracao.__table__.insert(), linhas)
+
+def adiar_alteracoes(session: Session, linhas: list[dict]):
+    session.info.setdefault(PENDENTES, []).extend(linhas)
+
+@event.listens_for(Session, "after_flush")
+def _registrar_alteracoes(session, flush_context):
+    # Coletadas agora, enquanto o flush diz o que mudou; gravadas no commit
+    adiar_alteracoes(session, coletar_alteracoes(session))
+
+@event.listens_for(Session, "before_commit")
+def _gravar_pendentes(session):
+    # O commit só faz o último flush depois deste hook: feito aqui, o que ele
+    # gravaria entra no changelog. Mesma transação da escrita, então o commit
+    # grava as duas coisas ou nenhuma
+    session.flush()
+    linhas = session.info.pop(PENDENTES, None)
+    if linhas:
+        gravar_alteracoes(session.connection(bind_arguments={"primary": True}), linhas)
+
+@event.listens_for(Session, "after_transaction_end")
+def _descartar_pendentes(session, transaction):
+    # Rollback: o que a transação desfeita coletou não vai para a próxima
+    if transaction.parent is None:
+        session.info.pop(PENDENTES, None)
+
+async def registrar_alteracao(session: AsyncSession, objeto, operacao: str):
+    """Para escritas feitas com UPDATE direto, que não passam pelo flush."""
+    await registrar_alteracoes(session, [objeto], operacao)
+
+async def registrar_alteracoes(session: AsyncSession, objetos: list, operacao: str):
+    adiar_alteracoes(session.sync_session, [linha_de_alteracao(objeto, operacao) for objeto in objetos])
+
+@instrumentado
+class ChangeService:
+    def __init__(self, repository: AlteracaoRepository):
+        self.repository = repository
+
+    async def get_changes(self, since: int, limit: int) -> dict:
+        # Um a mais só para saber se há próxima página
+        alteracoes = await self.repository.get_since(since, limit + 1)
+        mais = len(alteracoes) > limit
+        alteracoes = alteracoes[:limit]
+        return {
+            "alteracoes": alteracoes,
+            "proximo": alteracoes[-1].seq if alteracoes else since,
+            "mais": mais,
+        }
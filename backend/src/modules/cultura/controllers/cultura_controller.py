@@ -1,15 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from shared.database.session import get_db
-from modules.cultura.dtos.cultura_dto import CulturaCreateDTO, CulturaUpdateDTO, CulturaReadDTO
+from shared.database.memoria import usar_memoria
+from shared.database.session import get_db, get_read_db
+from shared.exceptions import ConflitoDeVersao
+from shared.database.counts import Contagem
+from shared.utils.count_headers import set_count_headers
+from shared.utils.multi_get import parse_ids
+from modules.cultura.dtos.cultura_dto import CulturaCreateDTO, CulturaPatchDTO, CulturaUpdateDTO, CulturaReadDTO, CatalogoCulturaReadDTO
 from modules.cultura.repositories.cultura_repository import CulturaRepository
+from modules.cultura.repositories.cultura_memoria_repository import CulturaMemoriaRepository
+from modules.cultura.repositories.catalogo_cultura_memoria_repository import CatalogoCulturaMemoriaRepository
+from modules.cultura.services.catalogo_cultura_service import CatalogoCulturaService
+from modules.safra.repositories.safra_memoria_repository import SafraMemoriaRepository
 from modules.cultura.services.cultura_service import CulturaService
+from shared.utils.tracing import RotaInstrumentada
 
-router = APIRouter(prefix="/culturas", tags=["Culturas"])
+router = APIRouter(prefix="/culturas", tags=["Culturas"], route_class=RotaInstrumentada)
+
+def get_service(db: AsyncSession) -> CulturaService:
+    if usar_memoria():
+        catalogo = CatalogoCulturaService(CatalogoCulturaMemoriaRepository())
+        return CulturaService(CulturaMemoriaRepository(), catalogo, SafraMemoriaRepository())
+    return CulturaService(CulturaRepository(db))
 
 @router.post("/", response_model=CulturaReadDTO, status_code=status.HTTP_201_CREATED)
 async def create_cultura(dto: CulturaCreateDTO, db: AsyncSession = Depends(get_db)):
-    service = CulturaService(CulturaRepository(db))
+    service = get_service(db)
     try:
         cultura = await service.create_cultura(dto)
         return cultura
@@ -17,30 +34,66 @@ async def create_cultura(dto: CulturaCreateDTO, db: AsyncSession = Depends(get_d
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=list[CulturaReadDTO])
-async def list_culturas(db: AsyncSession = Depends(get_db)):
-    service = CulturaService(CulturaRepository(db))
-    return await service.get_all_culturas()
+async def list_culturas(response: Response, ano: Optional[int] = None, exato: Optional[bool] = None, ids: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
+    service = get_service(db)
+    if ids is not None:
+        # Multi-get: ?ids=1,2,3 numa consulta, na ordem pedida; ids inexistentes ficam de fora
+        try:
+            lista = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        entidades = await service.get_culturas_by_ids(lista, ano)
+        if exato is not None:
+            # O total de um multi-get é o que foi encontrado, sempre exato
+            set_count_headers(response, Contagem(len(entidades)))
+        return entidades
+    if exato is not None:
+        set_count_headers(response, await service.count_culturas(exato))
+    return await service.get_all_culturas(ano)
+
+@router.get("/catalogo", response_model=list[CatalogoCulturaReadDTO])
+async def list_catalogo(db: AsyncSession = Depends(get_read_db)):
+    service = get_service(db)
+    return await service.get_catalogo()
 
 @router.get("/{cultura_id}", response_model=CulturaReadDTO)
-async def get_cultura(cultura_id: int, db: AsyncSession = Depends(get_db)):
-    service = CulturaService(CulturaRepository(db))
-    cultura = await service.get_cultura_by_id(cultura_id)
+async def get_cultura(cultura_id: int, ano: Optional[int] = None, db: AsyncSession = Depends(get_read_db)):
+    service = get_service(db)
+    cultura = await service.get_cultura_by_id(cultura_id, ano)
     if not cultura:
         raise HTTPException(status_code=404, detail="Cultura não encontrada")
     return cultura
 
 @router.put("/{cultura_id}", response_model=CulturaReadDTO)
 async def update_cultura(cultura_id: int, dto: CulturaUpdateDTO, db: AsyncSession = Depends(get_db)):
-    service = CulturaService(CulturaRepository(db))
+    service = get_service(db)
     try:
         return await service.update_cultura(cultura_id, dto)
+    except ConflitoDeVersao as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.patch("/{cultura_id}", response_model=CulturaReadDTO)
+async def patch_cultura(cultura_id: int, dto: CulturaPatchDTO, db: AsyncSession = Depends(get_db)):
+    service = get_service(db)
+    try:
+        cultura = await service.patch_cultura(cultura_id, dto)
+    except ConflitoDeVersao as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not cultura:
+        raise HTTPException(status_code=404, detail="Cultura não encontrada")
+    return cultura
+
 @router.delete("/{cultura_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_cultura(cultura_id: int, db: AsyncSession = Depends(get_db)):
-    service = CulturaService(CulturaRepository(db))
+async def delete_cultura(cultura_id: int, response: Response, db: AsyncSession = Depends(get_db)):
+    service = get_service(db)
     try:
-        await service.delete_cultura(cultura_id)
+        exclusao = await service.delete_cultura(cultura_id)
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+    if exclusao.purga is not None:
+        # A purga das dependentes segue em /jobs/{id}
+        response.headers["X-Purge-Job"] = str(exclusao.purga)
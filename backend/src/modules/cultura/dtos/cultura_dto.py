@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class CulturaBaseDTO(BaseModel):
     nome: str
@@ -11,12 +12,26 @@ class CulturaCreateDTO(CulturaBaseDTO):
 class CulturaUpdateDTO(CulturaBaseDTO):
     pass
 
+class CulturaPatchDTO(BaseModel):
+    nome: Optional[str] = None
+    safra_id: Optional[int] = None
+    propriedade_id: Optional[int] = None
+    versao: int
+
 class CulturaReadDTO(BaseModel):
     id: int
     nome: str
+    ano: int
     safra_id: int
     propriedade_id: int
+    versao: int
+
+    class Config:
+        from_attributes = True
+
+class CatalogoCulturaReadDTO(BaseModel):
+    id: int
+    nome: str
 
     class Config:
         from_attributes = True
- 
\ No newline at end of file
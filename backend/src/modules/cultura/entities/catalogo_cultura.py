@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, SmallInteger
+from shared.database.base import Base
+
+class CatalogoCultura(Base):
+    __tablename__ = "catalogo_culturas"
+    id = Column(SmallInteger, primary_key=True, autoincrement=True)
+    nome = Column(String(100), nullable=False)
+    nome_normalizado = Column(String(100), nullable=False, unique=True, index=True)
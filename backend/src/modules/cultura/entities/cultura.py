@@ -1,12 +1,28 @@
-from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy import Column, Integer, SmallInteger, ForeignKey, ForeignKeyConstraint
 from sqlalchemy.orm import relationship
 from shared.database.base import Base
+from shared.database.exclusao import ExclusaoLogica
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura  # noqa: F401
 
-class Cultura(Base):
+class Cultura(ExclusaoLogica, Base):
     __tablename__ = "culturas"
-    id = Column(Integer, primary_key=True, index=True)
-    nome = Column(String(100), nullable=False)
-    safra_id = Column(Integer, ForeignKey("safras.id"), nullable=False)
+    # Particionada pelo mesmo ano da safra, copiado para cá; o cascade
+    # acompanha a safra quando o ano dela muda
+    __table_args__ = (
+        ForeignKeyConstraint(["safra_id", "ano"], ["safras.id", "safras.ano"], onupdate="CASCADE"),
+        {"postgresql_partition_by": "RANGE (ano)"},
+    )
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    ano = Column(Integer, primary_key=True, nullable=False)
+    catalogo_id = Column(SmallInteger, ForeignKey("catalogo_culturas.id"), nullable=False, index=True)
+    safra_id = Column(Integer, nullable=False)
     propriedade_id = Column(Integer, ForeignKey("propriedades.id"), nullable=False)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": versao}
+    catalogo = relationship("CatalogoCultura", lazy="joined", innerjoin=True)
     safra = relationship("Safra", back_populates="culturas")
-    propriedade = relationship("Propriedade", back_populates="culturas") 
\ No newline at end of file
+    propriedade = relationship("Propriedade", back_populates="culturas")
+
+    @property
+    def nome(self) -> str:
+        return self.catalogo.nome if self.catalogo else None
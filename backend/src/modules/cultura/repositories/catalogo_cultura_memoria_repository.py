@@ -0,0 +1,13 @@
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
+from shared.database.memoria import MemoriaRepository
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class CatalogoCulturaMemoriaRepository(MemoriaRepository):
+    tabela = "catalogo_culturas"
+
+    async def get_or_create(self, nome_normalizado: str, nome: str) -> CatalogoCultura:
+        entrada = self.linhas.buscar_unico("uq_catalogo_culturas_nome", (nome_normalizado,))
+        if entrada is None:
+            entrada = self.linhas.inserir(CatalogoCultura(nome=nome, nome_normalizado=nome_normalizado))
+        return entrada
@@ -0,0 +1,38 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.dialects.postgresql import insert
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class CatalogoCulturaRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_all(self) -> list[CatalogoCultura]:
+        result = await self.session.execute(select(CatalogoCultura).order_by(CatalogoCultura.id))
+        return list(result.scalars().all())
+
+    async def get_by_nome(self, nome_normalizado: str, primary: bool = False) -> CatalogoCultura | None:
+        result = await self.session.execute(
+            select(CatalogoCultura).where(CatalogoCultura.nome_normalizado == nome_normalizado),
+            bind_arguments={"primary": primary},
+        )
+        return result.scalars().first()
+
+    async def get_or_create(self, nome_normalizado: str, nome: str) -> CatalogoCultura:
+        entrada = await self.get_by_nome(nome_normalizado)
+        if entrada is not None:
+            return entrada
+        # Só nome novo chega ao INSERT: mesmo no conflito ele gasta um valor
+        # da sequência SMALLSERIAL, que acaba em 32767. Entradas do catálogo
+        # nunca são removidas, então vão numa transação própria, gravadas na
+        # hora sem comitar a sessão do chamador
+        async with self.session.bind.begin() as conn:
+            await conn.execute(
+                insert(CatalogoCultura)
+                .values(nome=nome, nome_normalizado=nome_normalizado)
+                .on_conflict_do_nothing(index_elements=["nome_normalizado"])
+            )
+        # No primário: a réplica pode ainda não ter a entrada recém-criada
+        return await self.get_by_nome(nome_normalizado, primary=True)
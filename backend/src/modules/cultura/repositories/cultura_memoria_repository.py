@@ -0,0 +1,27 @@
+from typing import Optional
+from modules.cultura.entities.cultura import Cultura
+from shared.database.memoria import MemoriaRepository, relacionar
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class CulturaMemoriaRepository(MemoriaRepository):
+    tabela = "culturas"
+
+    def carregar(self, cultura: Cultura) -> Cultura:
+        # O joined do catálogo, de onde sai o nome
+        relacionar(cultura, "catalogo", self.banco["catalogo_culturas"].get(cultura.catalogo_id))
+        return cultura
+
+    async def get_all(self, ano: Optional[int] = None) -> list[Cultura]:
+        culturas = self.linhas.todas() if ano is None else self.linhas.buscar("ano", ano)
+        return [self.carregar(cultura) for cultura in culturas]
+
+    async def get_by_id(self, cultura_id: int, ano: Optional[int] = None) -> Optional[Cultura]:
+        cultura = self.linhas.get(cultura_id)
+        if cultura is None or (ano is not None and cultura.ano != ano):
+            return None
+        return self.carregar(cultura)
+
+    async def get_by_ids(self, ids: list[int], ano: Optional[int] = None) -> list[Cultura]:
+        culturas = await super().get_by_ids(ids)
+        return culturas if ano is None else [cultura for cultura in culturas if cultura.ano == ano]
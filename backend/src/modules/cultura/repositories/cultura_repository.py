@@ -1,31 +1,96 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
 from modules.cultura.entities.cultura import Cultura
+from shared.database.batch_loader import ids_em, na_ordem
+from shared.database.counts import Contagem, count_rows
+from shared.database.exclusao import Exclusao, travar_pais
+from shared.database.group_commit import group_commit, usar_group_commit
+from modules.jobs.services.purga import excluir
+from modules.changes.services.change_service import registrar_alteracao
+from shared.database.versioning import versioned_update
+from shared.exceptions import ConflitoDeVersao
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from typing import List, Optional
+from shared.utils.instrumentation import instrumentado
 
+@instrumentado
 class CulturaRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all(self) -> list[Cultura]:
-        result = await self.session.execute(select(Cultura))
+    async def get_all(self, ano: Optional[int] = None) -> list[Cultura]:
+        # Com o ano o Postgres varre só a partição daquela safra
+        query = select(Cultura)
+        if ano is not None:
+            query = query.where(Cultura.ano == ano)
+        result = await self.session.execute(query)
         return list(result.scalars().all())
 
-    async def get_by_id(self, cultura_id: int) -> Optional[Cultura]:
-        result = await self.session.execute(select(Cultura).where(Cultura.id == cultura_id))
+    async def get_by_id(self, cultura_id: int, ano: Optional[int] = None) -> Optional[Cultura]:
+        # Sem o ano a busca pelo id consulta o índice de cada partição
+        query = select(Cultura).where(Cultura.id == cultura_id)
+        if ano is not None:
+            query = query.where(Cultura.ano == ano)
+        result = await self.session.execute(query)
         return result.scalars().first()
 
+    async def get_by_ids(self, ids: list[int], ano: Optional[int] = None) -> list[Cultura]:
+        query = select(Cultura).where(ids_em(self.session, Cultura.id, ids))
+        if ano is not None:
+            query = query.where(Cultura.ano == ano)
+        result = await self.session.execute(query)
+        return na_ordem(ids, result.scalars().all())
+
+    async def count(self, exato: bool = True) -> Contagem:
+        return await count_rows(self.session, Cultura, exato)
+
     async def create(self, cultura: Cultura) -> Cultura:
+        if usar_group_commit():
+            # Sai da sessão: vai no INSERT de várias linhas do group commit
+            cultura = await group_commit(self.session.bind).inserir(cultura)
+            # O nome vem do catálogo: uma busca pela PK, ou nenhuma se o resolve já o trouxe para a sessão
+            set_committed_value(cultura, "catalogo", await self.session.get(CatalogoCultura, cultura.catalogo_id))
+            return cultura
+        await travar_pais(self.session, Cultura, [cultura])
         self.session.add(cultura)
         await self.session.commit()
         await self.session.refresh(cultura)
         return cultura
 
     async def update(self, cultura: Cultura) -> Cultura:
-        await self.session.commit()
+        try:
+            await travar_pais(self.session, Cultura, [cultura])
+            await self.session.commit()
+        except StaleDataError:
+            await self.session.rollback()
+            raise ConflitoDeVersao()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
         await self.session.refresh(cultura)
         return cultura
 
-    async def delete(self, cultura: Cultura):
-        await self.session.delete(cultura)
-        await self.session.commit() 
\ No newline at end of file
+    async def patch(self, cultura_id: int, versao: int, valores: dict) -> Optional[Cultura]:
+        try:
+            await travar_pais(self.session, Cultura, [valores])
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+        result = await self.session.execute(
+            versioned_update(Cultura, cultura_id, versao, valores)
+            .options(selectinload(Cultura.catalogo))
+        )
+        cultura = result.scalars().first()
+        if cultura is None:
+            await self.session.rollback()
+            return None
+        await registrar_alteracao(self.session, cultura, "alteracao")
+        await self.session.commit()
+        return cultura
+
+    async def delete(self, cultura_id: int) -> Optional[Exclusao]:
+        return await excluir(self.session, Cultura, cultura_id) 
\ No newline at end of file
@@ -0,0 +1,60 @@
+import unicodedata
+from modules.cultura.repositories.catalogo_cultura_repository import CatalogoCulturaRepository
+from shared.utils.metrics import registrar_consulta_ao_cache
+from shared.utils.instrumentation import instrumentado
+
+def normalizar_nome(nome: str) -> str:
+    sem_acento = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    return " ".join(sem_acento.split()).casefold()
+
+class CatalogoCulturaCache:
+    """Catálogo de culturas em memória, por processo.
+
+    Só cresce: ids nunca mudam de nome nem somem, então uma entrada em cache
+    nunca fica inválida e um miss só significa consultar o banco.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._nomes = {}
+
+    def get_id(self, nome_normalizado: str) -> int | None:
+        catalogo_id = self._ids.get(nome_normalizado)
+        registrar_consulta_ao_cache("catalogo_culturas", catalogo_id is not None)
+        return catalogo_id
+
+    def get_nome(self, catalogo_id: int) -> str | None:
+        return self._nomes.get(catalogo_id)
+
+    def add(self, catalogo_id: int, nome_normalizado: str, nome: str):
+        self._ids[nome_normalizado] = catalogo_id
+        self._nomes[catalogo_id] = nome
+
+    def clear(self):
+        self._ids.clear()
+        self._nomes.clear()
+
+catalogo_cache = CatalogoCulturaCache()
+
+@instrumentado
+class CatalogoCulturaService:
+    def __init__(self, repository: CatalogoCulturaRepository, cache: CatalogoCulturaCache = catalogo_cache):
+        self.repository = repository
+        self.cache = cache
+
+    async def resolve(self, nome: str) -> int:
+        nome_normalizado = normalizar_nome(nome)
+        if not nome_normalizado:
+            raise ValueError("Nome da cultura é obrigatório")
+        catalogo_id = self.cache.get_id(nome_normalizado)
+        if catalogo_id is None:
+            entrada = await self.repository.get_or_create(nome_normalizado, " ".join(nome.split()))
+            self.cache.add(entrada.id, entrada.nome_normalizado, entrada.nome)
+            catalogo_id = entrada.id
+        return catalogo_id
+
+    async def get_catalogo(self):
+        entradas = await self.repository.get_all()
+        for entrada in entradas:
+            self.cache.add(entrada.id, entrada.nome_normalizado, entrada.nome)
+        return entradas
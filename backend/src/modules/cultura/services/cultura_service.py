@@ -1,36 +1,110 @@
 from modules.cultura.repositories.cultura_repository import CulturaRepository
 from modules.cultura.entities.cultura import Cultura
-from modules.cultura.dtos.cultura_dto import CulturaCreateDTO, CulturaUpdateDTO
+from modules.cultura.dtos.cultura_dto import CulturaCreateDTO, CulturaPatchDTO, CulturaReadDTO, CulturaUpdateDTO
+from modules.cultura.repositories.catalogo_cultura_repository import CatalogoCulturaRepository
+from modules.cultura.services.catalogo_cultura_service import CatalogoCulturaService
+from modules.safra.repositories.safra_repository import SafraRepository
+from shared.database.entity_cache import EntityCache, SemCache, cache_padrao, chave, registrar_entidade
+from shared.exceptions import ConflitoDeVersao
+from shared.utils import change_events
 from sqlalchemy.exc import IntegrityError
+from shared.utils.instrumentation import instrumentado
 
+# Mudar o ano da safra muda o das culturas, em cascata no banco
+registrar_entidade("cultura", CulturaReadDTO, lambda cultura: [chave("safra", cultura.safra_id)])
+
+@instrumentado
 class CulturaService:
-    def __init__(self, repository: CulturaRepository):
+    def __init__(self, repository: CulturaRepository, catalogo: CatalogoCulturaService | None = None, safras: SafraRepository | None = None, cache: EntityCache | SemCache | None = None):
         self.repository = repository
+        self.cache = cache_padrao() if cache is None else cache
+        self.catalogo = catalogo or CatalogoCulturaService(CatalogoCulturaRepository(repository.session))
+        self.safras = safras or SafraRepository(repository.session)
+
+    async def ano_da_safra(self, safra_id: int) -> int:
+        # A cultura fica na partição do ano da sua safra
+        safra = await self.safras.get_by_id(safra_id)
+        if not safra:
+            raise ValueError("Safra não encontrada")
+        return safra.ano
 
     async def create_cultura(self, dto: CulturaCreateDTO) -> Cultura:
-        cultura = Cultura(nome=dto.nome, safra_id=dto.safra_id, propriedade_id=dto.propriedade_id)
+        catalogo_id = await self.catalogo.resolve(dto.nome)
+        ano = await self.ano_da_safra(dto.safra_id)
+        cultura = Cultura(catalogo_id=catalogo_id, ano=ano, safra_id=dto.safra_id, propriedade_id=dto.propriedade_id)
         try:
-            return await self.repository.create(cultura)
+            cultura = await self.repository.create(cultura)
         except IntegrityError:
             raise ValueError("Erro ao cadastrar cultura.")
+        # A safra embute a lista de culturas
+        await self.cache.invalidar(chave("safra", cultura.safra_id))
+        change_events.publish("cultura", "criacao", cultura.id)
+        return cultura
+
+    async def get_all_culturas(self, ano: int | None = None):
+        return await self.repository.get_all(ano)
 
-    async def get_all_culturas(self):
-        return await self.repository.get_all()
+    async def count_culturas(self, exato: bool = True):
+        return await self.repository.count(exato)
 
-    async def get_cultura_by_id(self, cultura_id: int):
-        return await self.repository.get_by_id(cultura_id)
+    async def get_catalogo(self):
+        return await self.catalogo.get_catalogo()
+
+    async def get_cultura_by_id(self, cultura_id: int, ano: int | None = None):
+        cultura = await self.cache.obter("cultura", cultura_id, lambda: self.repository.get_by_id(cultura_id, ano), self.repository.session)
+        # O cache guarda pelo id; o ano só restringe a busca à partição
+        if cultura is not None and ano is not None and cultura.ano != ano:
+            return None
+        return cultura
+
+    async def get_culturas_by_ids(self, ids: list[int], ano: int | None = None):
+        return await self.repository.get_by_ids(ids, ano)
 
     async def update_cultura(self, cultura_id: int, dto: CulturaUpdateDTO):
         cultura = await self.repository.get_by_id(cultura_id)
         if not cultura:
             raise ValueError("Cultura não encontrada")
-        cultura.nome = dto.nome
+        cultura.catalogo_id = await self.catalogo.resolve(dto.nome)
+        if dto.safra_id != cultura.safra_id:
+            cultura.ano = await self.ano_da_safra(dto.safra_id)
         cultura.safra_id = dto.safra_id
         cultura.propriedade_id = dto.propriedade_id
-        return await self.repository.update(cultura)
+        try:
+            cultura = await self.repository.update(cultura)
+        except IntegrityError:
+            raise ValueError("Erro ao alterar cultura.")
+        # A safra anterior cai junto, por embutir a cultura
+        await self.cache.invalidar(chave("cultura", cultura_id), chave("safra", dto.safra_id))
+        change_events.publish("cultura", "alteracao", cultura.id)
+        return cultura
+
+    async def patch_cultura(self, cultura_id: int, dto: CulturaPatchDTO):
+        valores = dto.model_dump(exclude_none=True, exclude={"versao", "nome"})
+        if dto.nome is not None:
+            valores["catalogo_id"] = await self.catalogo.resolve(dto.nome)
+        if dto.safra_id is not None:
+            # Trocar de safra pode mover a cultura para outra partição
+            valores["ano"] = await self.ano_da_safra(dto.safra_id)
+        try:
+            cultura = await self.repository.patch(cultura_id, dto.versao, valores)
+        except IntegrityError:
+            raise ValueError("Erro ao alterar cultura.")
+        if cultura is None:
+            if await self.repository.get_by_id(cultura_id):
+                # Só no caminho de erro: a linha existe, então a versão mudou
+                raise ConflitoDeVersao()
+            return None
+        chaves = [chave("cultura", cultura_id)]
+        if dto.safra_id is not None:
+            chaves.append(chave("safra", dto.safra_id))
+        await self.cache.invalidar(*chaves)
+        change_events.publish("cultura", "alteracao", cultura.id)
+        return cultura
 
     async def delete_cultura(self, cultura_id: int):
-        cultura = await self.repository.get_by_id(cultura_id)
-        if not cultura:
+        exclusao = await self.repository.delete(cultura_id)
+        if exclusao is None:
             raise ValueError("Cultura não encontrada")
-        await self.repository.delete(cultura) 
\ No newline at end of file
+        await self.cache.invalidar(chave("cultura", cultura_id))
+        change_events.publish("cultura", "exclusao", cultura_id)
+        return exclusao
\ No newline at end of file
@@ -1,29 +1,93 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from shared.database.session import get_db
+from shared.config.settings import settings
+from shared.database.session import get_read_db
 from modules.dashboard.services.dashboard_service import DashboardService
+from modules.dashboard.services.dashboard_stream import LimiteDeAssinantes, dashboard_broadcaster, formatar_sse
+from modules.dashboard.services.mirror_dashboard_service import MirrorDashboardService
+from modules.propriedade.services.propriedade_mirror import propriedade_mirror
+from shared.utils.count_headers import set_count_headers
+from shared.utils.tracing import RotaInstrumentada
 
-router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"], route_class=RotaInstrumentada)
+
+async def get_dashboard_service(response: Response, db: AsyncSession = Depends(get_read_db)):
+    if settings.dashboard_backend == "columnar":
+        # Import tardio: pyarrow só é carregado com o backend colunar
+        from modules.dashboard.services.columnar_dashboard_service import ColumnarDashboardService, dashboard_snapshot
+        # Sem snapshot exportado ainda, cai para o SQL
+        if await dashboard_snapshot.load():
+            response.headers["X-Dashboard-Snapshot"] = dashboard_snapshot.execucao
+            return ColumnarDashboardService(dashboard_snapshot)
+    # Até a primeira reconciliação o espelho está vazio e o SQL responde
+    if settings.dashboard_backend == "memoria" and propriedade_mirror.carregado:
+        return MirrorDashboardService(db, propriedade_mirror)
+    return DashboardService(db)
 
 @router.get("/totais")
-async def get_totais(db: AsyncSession = Depends(get_db)):
-    service = DashboardService(db)
+async def get_totais(response: Response, exato: bool = True, service=Depends(get_dashboard_service)):
+    fazendas = await service.contar_fazendas(exato)
+    set_count_headers(response, fazendas)
     return {
-        "total_fazendas": await service.total_fazendas(),
+        "total_fazendas": fazendas.total,
         "total_hectares": await service.total_hectares(),
     }
 
 @router.get("/por-estado")
-async def get_por_estado(db: AsyncSession = Depends(get_db)):
-    service = DashboardService(db)
+async def get_por_estado(service=Depends(get_dashboard_service)):
     return await service.fazendas_por_estado()
 
+@router.get("/area-por-estado")
+async def get_area_por_estado(service=Depends(get_dashboard_service)):
+    return await service.area_por_estado()
+
 @router.get("/por-cultura")
-async def get_por_cultura(db: AsyncSession = Depends(get_db)):
-    service = DashboardService(db)
-    return await service.fazendas_por_cultura()
+async def get_por_cultura(ano: Optional[int] = None, service=Depends(get_dashboard_service)):
+    return await service.fazendas_por_cultura(ano)
+
+@router.get("/culturas-por-ano")
+async def get_culturas_por_ano(service=Depends(get_dashboard_service)):
+    return await service.culturas_por_ano()
 
 @router.get("/uso-do-solo")
-async def get_uso_do_solo(db: AsyncSession = Depends(get_db)):
-    service = DashboardService(db)
-    return await service.uso_do_solo() 
\ No newline at end of file
+async def get_uso_do_solo(service=Depends(get_dashboard_service)):
+    return await service.uso_do_solo()
+
+@router.get("/stream")
+async def stream_dashboard():
+    """Server-Sent Events: um evento ``snapshot`` com todos os indicadores e
+    depois eventos ``delta`` só com os que mudaram."""
+    try:
+        assinante, inicial = await dashboard_broadcaster.assinar()
+    except LimiteDeAssinantes:
+        raise HTTPException(status_code=503, detail="Limite de conexões do dashboard atingido")
+
+    async def eventos():
+        async for tipo, dados in dashboard_broadcaster.eventos(assinante, inicial, settings.dashboard_stream_heartbeat_s):
+            yield formatar_sse(tipo, dados)
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def websocket_dashboard(websocket: WebSocket):
+    try:
+        assinante, inicial = await dashboard_broadcaster.assinar()
+    except LimiteDeAssinantes:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+    eventos = dashboard_broadcaster.eventos(assinante, inicial, settings.dashboard_stream_heartbeat_s)
+    try:
+        async for tipo, dados in eventos:
+            await websocket.send_json({"evento": tipo if dados is not None else "ping", "dados": dados})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await eventos.aclose()
+        dashboard_broadcaster.cancelar(assinante)
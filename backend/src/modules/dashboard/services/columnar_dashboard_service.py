@@ -0,0 +1,83 @@
+from shared.config.settings import settings
+from shared.database.counts import Contagem
+from shared.snapshots.cache import SnapshotCache
+from shared.utils.instrumentation import instrumentado
+
+try:
+    import pyarrow.compute as compute
+except ImportError:
+    compute = None
+
+@instrumentado
+class ColumnarDashboardService:
+    """Mesmos indicadores do DashboardService, calculados com kernels
+    vetorizados do Arrow sobre o snapshot Parquet em memória, sem tocar no
+    Postgres. Os números refletem a última exportação (``snapshot_id``)."""
+
+    def __init__(self, snapshot: SnapshotCache):
+        self.snapshot = snapshot
+
+    @property
+    def snapshot_id(self) -> str | None:
+        return self.snapshot.execucao
+
+    @property
+    def propriedades(self):
+        return self.snapshot.tabelas["propriedades"]
+
+    async def contar_fazendas(self, exato: bool = True) -> Contagem:
+        return Contagem(self.propriedades.num_rows)
+
+    async def total_fazendas(self, exato: bool = True) -> int:
+        return (await self.contar_fazendas(exato)).total
+
+    async def total_hectares(self) -> float:
+        return compute.sum(self.propriedades["area_total"]).as_py() or 0.0
+
+    async def fazendas_por_estado(self):
+        totais = self.propriedades.group_by("estado").aggregate([("id", "count")])
+        return [{"estado": row["estado"], "total": row["id_count"]} for row in totais.to_pylist()]
+
+    async def area_por_estado(self):
+        totais = self.propriedades.group_by("estado").aggregate([
+            ("area_total", "sum"),
+            ("area_agricultavel", "sum"),
+            ("area_vegetacao", "sum"),
+        ])
+        return [
+            {
+                "estado": row["estado"],
+                "area_total": row["area_total_sum"],
+                "agricultavel": row["area_agricultavel_sum"],
+                "vegetacao": row["area_vegetacao_sum"],
+            }
+            for row in totais.to_pylist()
+        ]
+
+    def _com_nome_da_cultura(self, totais):
+        catalogo = self.snapshot.tabelas["catalogo_culturas"].select(["id", "nome"])
+        return totais.join(catalogo, keys="catalogo_id", right_keys="id", join_type="inner")
+
+    async def fazendas_por_cultura(self, ano: int | None = None):
+        culturas = self.snapshot.tabelas["culturas"]
+        if ano is not None:
+            culturas = culturas.filter(compute.equal(culturas["ano"], ano))
+        totais = self._com_nome_da_cultura(culturas.group_by("catalogo_id").aggregate([("id", "count")]))
+        return [{"cultura": row["nome"], "total": row["id_count"]} for row in totais.to_pylist()]
+
+    async def culturas_por_ano(self):
+        culturas = self.snapshot.tabelas["culturas"]
+        totais = self._com_nome_da_cultura(culturas.group_by(["ano", "catalogo_id"]).aggregate([("id", "count")]))
+        return [{"ano": row["ano"], "cultura": row["nome"], "total": row["id_count"]} for row in totais.to_pylist()]
+
+    async def uso_do_solo(self):
+        return {
+            "agricultavel": compute.sum(self.propriedades["area_agricultavel"]).as_py() or 0.0,
+            "vegetacao": compute.sum(self.propriedades["area_vegetacao"]).as_py() or 0.0,
+        }
+
+dashboard_snapshot = SnapshotCache(
+    settings.snapshot_dir,
+    ("propriedades", "culturas", "catalogo_culturas"),
+    settings.dashboard_snapshot_refresh_s,
+)
@@ -2,15 +2,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, select
 from modules.propriedade.entities.propriedade import Propriedade
 from modules.cultura.entities.cultura import Cultura
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
 from modules.produtor.entities.produtor import Produtor
+from shared.database.counts import Contagem, count_rows
+from shared.utils.instrumentation import instrumentado
 
+@instrumentado
 class DashboardService:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def total_fazendas(self) -> int:
-        result = await self.session.execute(select(func.count(Propriedade.id)))
-        return result.scalar()
+    async def contar_fazendas(self, exato: bool = True) -> Contagem:
+        return await count_rows(self.session, Propriedade, exato)
+
+    async def total_fazendas(self, exato: bool = True) -> int:
+        return (await self.contar_fazendas(exato)).total
 
     async def total_hectares(self) -> float:
         result = await self.session.execute(select(func.sum(Propriedade.area_total)))
@@ -22,12 +28,44 @@ class DashboardService:
         )
         return [{"estado": row[0], "total": row[1]} for row in result.all()]
 
-    async def fazendas_por_cultura(self):
+    async def fazendas_por_cultura(self, ano: int | None = None):
+        # Agrupa pelo id inteiro (indexado) e só depois junta com o catálogo;
+        # filtrando por ano só a partição daquela safra é lida
+        totais = select(Cultura.catalogo_id, func.count(Cultura.id).label("total"))
+        if ano is not None:
+            totais = totais.where(Cultura.ano == ano)
+        totais = totais.group_by(Cultura.catalogo_id).subquery()
         result = await self.session.execute(
-            select(Cultura.nome, func.count(Cultura.id)).group_by(Cultura.nome)
+            select(CatalogoCultura.nome, totais.c.total).join(totais, totais.c.catalogo_id == CatalogoCultura.id)
         )
         return [{"cultura": row[0], "total": row[1]} for row in result.all()]
 
+    async def area_por_estado(self):
+        result = await self.session.execute(
+            select(
+                Propriedade.estado,
+                func.sum(Propriedade.area_total),
+                func.sum(Propriedade.area_agricultavel),
+                func.sum(Propriedade.area_vegetacao),
+            ).group_by(Propriedade.estado)
+        )
+        return [
+            {"estado": row[0], "area_total": row[1], "agricultavel": row[2], "vegetacao": row[3]}
+            for row in result.all()
+        ]
+
+    async def culturas_por_ano(self):
+        totais = (
+            select(Cultura.ano, Cultura.catalogo_id, func.count(Cultura.id).label("total"))
+            .group_by(Cultura.ano, Cultura.catalogo_id)
+            .subquery()
+        )
+        result = await self.session.execute(
+            select(totais.c.ano, CatalogoCultura.nome, totais.c.total)
+            .join(totais, totais.c.catalogo_id == CatalogoCultura.id)
+        )
+        return [{"ano": row[0], "cultura": row[1], "total": row[2]} for row in result.all()]
+
     async def uso_do_solo(self):
         result = await self.session.execute(
             select(
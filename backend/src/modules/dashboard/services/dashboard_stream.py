@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+from shared.config.settings import settings
+from shared.database.session import SessionLocal, use_primary
+from shared.utils import change_events
+from modules.dashboard.services.dashboard_service import DashboardService
+
+logger = logging.getLogger(__name__)
+
+async def calcular_kpis() -> dict:
+    # No primário, para o recálculo logo após a escrita já enxergá-la
+    async with SessionLocal() as session:
+        service = DashboardService(use_primary(session))
+        return {
+            "totais": {
+                "total_fazendas": await service.total_fazendas(),
+                "total_hectares": await service.total_hectares(),
+            },
+            "por_estado": sorted(await service.fazendas_por_estado(), key=lambda item: item["estado"]),
+            "por_cultura": sorted(await service.fazendas_por_cultura(), key=lambda item: item["cultura"]),
+            "uso_do_solo": await service.uso_do_solo(),
+        }
+
+class LimiteDeAssinantes(Exception):
+    pass
+
+class Assinante:
+    """Guarda só o último valor de cada indicador ainda não entregue.
+
+    Um cliente lento não acumula fila: deltas novos sobrescrevem os
+    pendentes e ele recebe o estado mais recente quando voltar a ler.
+    """
+
+    def __init__(self):
+        self.pendente = {}
+        self._evento = asyncio.Event()
+
+    def entregar(self, delta: dict):
+        self.pendente.update(delta)
+        self._evento.set()
+
+    def descartar(self):
+        self.pendente = {}
+        self._evento.clear()
+
+    async def proximo(self, timeout: float) -> dict | None:
+        try:
+            await asyncio.wait_for(self._evento.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._evento.clear()
+        delta, self.pendente = self.pendente, {}
+        return delta
+
+class DashboardBroadcaster:
+    """Recalcula os indicadores uma vez por rajada de escritas e distribui
+    só os que mudaram para todas as conexões abertas."""
+
+    def __init__(self, calcular=calcular_kpis, max_assinantes: int | None = None, debounce_s: float | None = None, refresh_s: float | None = None):
+        self.calcular = calcular
+        self.max_assinantes = settings.dashboard_stream_max_subscribers if max_assinantes is None else max_assinantes
+        self.debounce_s = settings.dashboard_stream_debounce_ms / 1000 if debounce_s is None else debounce_s
+        self.refresh_s = settings.dashboard_stream_refresh_s if refresh_s is None else refresh_s
+        self.assinantes = set()
+        self.estado = None
+        self.recalculos = 0
+        self._sujo = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    def notificar(self, *_):
+        if not self.assinantes:
+            # Ninguém ouvindo: o próximo assinante recalcula do zero
+            self.estado = None
+            return
+        self._sujo.set()
+
+    async def atualizar(self):
+        async with self._lock:
+            novo = await self.calcular()
+            self.recalculos += 1
+            anterior = self.estado or {}
+            delta = {chave: valor for chave, valor in novo.items() if anterior.get(chave) != valor}
+            self.estado = novo
+        if delta:
+            for assinante in self.assinantes:
+                assinante.entregar(delta)
+
+    async def assinar(self) -> tuple[Assinante, dict]:
+        if len(self.assinantes) >= self.max_assinantes:
+            raise LimiteDeAssinantes()
+        # Entra antes do await: quem chegar durante o cálculo já conta a vaga
+        assinante = Assinante()
+        self.assinantes.add(assinante)
+        if self.estado is None:
+            try:
+                await self.atualizar()
+            except BaseException:
+                self.cancelar(assinante)
+                raise
+            # O snapshot já traz o que o cálculo entregou como delta
+            assinante.descartar()
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+        return assinante, self.estado
+
+    def cancelar(self, assinante: Assinante):
+        self.assinantes.discard(assinante)
+        if not self.assinantes and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._sujo.wait(), self.refresh_s)
+                await asyncio.sleep(self.debounce_s)
+            except asyncio.TimeoutError:
+                pass
+            self._sujo.clear()
+            try:
+                await self.atualizar()
+            except Exception:
+                logger.exception("Falha ao recalcular indicadores do dashboard")
+
+    async def eventos(self, assinante: Assinante, inicial: dict, heartbeat_s: float):
+        """Mensagens ``(tipo, dados)``; ``dados`` None é só um heartbeat."""
+        try:
+            yield "snapshot", inicial
+            while True:
+                yield "delta", await assinante.proximo(heartbeat_s)
+        finally:
+            self.cancelar(assinante)
+
+def formatar_sse(tipo: str, dados: dict | None) -> str:
+    if dados is None:
+        return ": ping\n\n"
+    return f"event: {tipo}\ndata: {json.dumps(dados)}\n\n"
+
+dashboard_broadcaster = DashboardBroadcaster()
+change_events.subscribe("propriedade", dashboard_broadcaster.notificar)
+change_events.subscribe("cultura", dashboard_broadcaster.notificar)
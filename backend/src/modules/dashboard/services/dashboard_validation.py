@@ -0,0 +1,41 @@
+import math
+
+# Indicadores comparados entre as implementações do dashboard
+KPIS = (
+    "total_fazendas",
+    "total_hectares",
+    "fazendas_por_estado",
+    "area_por_estado",
+    "fazendas_por_cultura",
+    "culturas_por_ano",
+    "uso_do_solo",
+)
+
+def _chave(item):
+    # Ordena agrupamentos pelos campos que não são float, já que a soma
+    # pode diferir na última casa dependendo da ordem de acumulação
+    if isinstance(item, dict):
+        return tuple(sorted((k, repr(v)) for k, v in item.items() if not isinstance(v, float)))
+    return repr(item)
+
+def equivalentes(a, b, rel_tol: float = 1e-9) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return a is not None and b is not None and math.isclose(a, b, rel_tol=rel_tol, abs_tol=1e-9)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(equivalentes(a[k], b[k], rel_tol) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(
+            equivalentes(x, y, rel_tol) for x, y in zip(sorted(a, key=_chave), sorted(b, key=_chave))
+        )
+    return a == b
+
+async def compare_backends(referencia, candidato) -> dict:
+    """Executa cada indicador nas duas implementações e devolve as
+    divergências como ``{kpi: (referencia, candidato)}``."""
+    divergencias = {}
+    for kpi in KPIS:
+        esperado = await getattr(referencia, kpi)()
+        obtido = await getattr(candidato, kpi)()
+        if not equivalentes(esperado, obtido):
+            divergencias[kpi] = (esperado, obtido)
+    return divergencias
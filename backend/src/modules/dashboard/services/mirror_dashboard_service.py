@@ -0,0 +1,39 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from modules.dashboard.services.dashboard_service import DashboardService
+from modules.propriedade.services.propriedade_mirror import PropriedadeMirror
+from shared.database.counts import Contagem
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class MirrorDashboardService(DashboardService):
+    """Indicadores de propriedades a partir do espelho colunar do processo,
+    com reduções vetorizadas e sem consulta ao banco. Os de culturas
+    continuam no SQL herdado."""
+
+    def __init__(self, session: AsyncSession, mirror: PropriedadeMirror):
+        super().__init__(session)
+        self.colunas = mirror.colunas
+
+    async def contar_fazendas(self, exato: bool = True) -> Contagem:
+        return Contagem(self.colunas.tamanho)
+
+    async def total_hectares(self) -> float:
+        return self.colunas.soma("area_total")
+
+    async def fazendas_por_estado(self):
+        return [{"estado": estado, "total": total} for estado, total in self.colunas.por_estado().items()]
+
+    async def area_por_estado(self):
+        total = self.colunas.por_estado("area_total")
+        agricultavel = self.colunas.por_estado("area_agricultavel")
+        vegetacao = self.colunas.por_estado("area_vegetacao")
+        return [
+            {"estado": estado, "area_total": total[estado], "agricultavel": agricultavel[estado], "vegetacao": vegetacao[estado]}
+            for estado in total
+        ]
+
+    async def uso_do_solo(self):
+        return {
+            "agricultavel": self.colunas.soma("area_agricultavel"),
+            "vegetacao": self.colunas.soma("area_vegetacao"),
+        }
@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from shared.database.slow_queries import slow_query_log
+from shared.middlewares.admission import admission_controller
+from shared.middlewares.profiling import profile_store
+from shared.utils.debug_auth import require_debug_token
+from shared.utils.tracing import MemoriaExporter, tracer
+
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+@router.get("/admission", dependencies=[Depends(require_debug_token)])
+async def get_admission():
+    return admission_controller.snapshot()
+
+@router.get("/profiles", dependencies=[Depends(require_debug_token)])
+async def list_profiles():
+    return profile_store.listar()
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_debug_token)])
+async def get_profile(profile_id: int):
+    perfil = profile_store.obter(profile_id)
+    if not perfil:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return perfil.detalhe()
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse, dependencies=[Depends(require_debug_token)])
+async def get_profile_folded(profile_id: int):
+    perfil = profile_store.obter(profile_id)
+    if not perfil:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return perfil.folded()
+
+@router.get("/slow-queries", dependencies=[Depends(require_debug_token)])
+async def get_slow_queries():
+    return slow_query_log.snapshot()
+
+def _traces_em_memoria() -> MemoriaExporter:
+    if not isinstance(tracer.exporter, MemoriaExporter):
+        raise HTTPException(status_code=404, detail="Tracing em memória desligado (TRACING_EXPORTER=memoria)")
+    return tracer.exporter
+
+@router.get("/traces", dependencies=[Depends(require_debug_token)])
+async def list_traces():
+    return _traces_em_memoria().listar()
+
+@router.get("/traces/{trace_id}", dependencies=[Depends(require_debug_token)])
+async def get_trace(trace_id: str):
+    spans = _traces_em_memoria().obter(trace_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="Trace não encontrado")
+    return spans
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared.database.session import get_db
+from modules.jobs.dtos.job_dto import JobCreateDTO, JobReadDTO
+from modules.jobs.repositories.job_repository import JobRepository
+from modules.jobs.services.job_service import JobService
+from modules.jobs.services import job_handlers  # noqa: F401
+from shared.utils.tracing import RotaInstrumentada
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"], route_class=RotaInstrumentada)
+
+@router.post("/", response_model=JobReadDTO, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(dto: JobCreateDTO, db: AsyncSession = Depends(get_db)):
+    service = JobService(JobRepository(db))
+    try:
+        return await service.create_job(dto)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{job_id}", response_model=JobReadDTO)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    service = JobService(JobRepository(db))
+    job = await service.get_job_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+    return job
@@ -0,0 +1,23 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Any, Optional
+
+class JobCreateDTO(BaseModel):
+    tipo: str
+    parametros: dict[str, Any] = {}
+
+class JobReadDTO(BaseModel):
+    id: int
+    tipo: str
+    status: str
+    parametros: dict[str, Any]
+    progresso: int
+    total: Optional[int] = None
+    resultado: Optional[Any] = None
+    erro: Optional[str] = None
+    criado_em: datetime
+    iniciado_em: Optional[datetime] = None
+    finalizado_em: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Text, DateTime, JSON
+from shared.database.base import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="pendente", index=True)
+    parametros = Column(JSON, nullable=False, default=dict)
+    progresso = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=True)
+    resultado = Column(JSON, nullable=True)
+    erro = Column(Text, nullable=True)
+    criado_em = Column(DateTime, nullable=False, default=datetime.utcnow)
+    iniciado_em = Column(DateTime, nullable=True)
+    finalizado_em = Column(DateTime, nullable=True)
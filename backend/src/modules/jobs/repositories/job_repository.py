@@ -0,0 +1,40 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import update
+from modules.jobs.entities.job import Job
+from typing import Optional
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class JobRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_by_id(self, job_id: int) -> Optional[Job]:
+        result = await self.session.execute(select(Job).where(Job.id == job_id))
+        return result.scalars().first()
+
+    async def create(self, job: Job) -> Job:
+        self.session.add(job)
+        await self.session.commit()
+        await self.session.refresh(job)
+        return job
+
+    async def update_fields(self, job_id: int, **fields):
+        await self.session.execute(update(Job).where(Job.id == job_id).values(**fields))
+        await self.session.commit()
+
+    async def claim(self, job_id: int, **fields) -> bool:
+        """Passa o job de pendente a executando; falso se outro o pegou."""
+        result = await self.session.execute(
+            update(Job).where(Job.id == job_id, Job.status == "pendente").values(status="executando", **fields)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def requeue_unfinished(self) -> list[int]:
+        """Devolve à fila os jobs que um restart deixou executando e lista os pendentes."""
+        await self.session.execute(update(Job).where(Job.status == "executando").values(status="pendente"))
+        await self.session.commit()
+        result = await self.session.execute(select(Job.id).where(Job.status == "pendente").order_by(Job.id))
+        return list(result.scalars())
@@ -0,0 +1,93 @@
+from datetime import date
+from modules.jobs.services.job_runner import JobContext, job_runner
+from modules.jobs.services.purga import PURGA, purgar, varrer
+from shared.config.settings import settings
+from shared.database.partitions import archive_partitions, ensure_partitions, partition_window
+from modules.produtor.repositories.produtor_repository import ProdutorRepository
+from shared.database.session import SessionLocal, engine, read_engine
+from shared.utils.documento_fiscal import DocumentoFiscal
+
+TAMANHO_LOTE = 1000
+
+def normalizar_lote(documentos: list[str]) -> list[str | None]:
+    """Forma canônica de cada documento, ou None se for inválido."""
+    canonicos = []
+    for documento in documentos:
+        try:
+            canonicos.append(str(DocumentoFiscal.parse(documento)))
+        except ValueError:
+            canonicos.append(None)
+    return canonicos
+
+@job_runner.register("validar_documentos")
+async def validar_documentos(ctx: JobContext, parametros: dict) -> dict:
+    documentos = parametros.get("documentos", [])
+    tamanho_lote = parametros.get("tamanho_lote", TAMANHO_LOTE)
+    await ctx.progresso(0, len(documentos))
+    invalidos = []
+    grafias = {}
+    cadastrados = []
+    for inicio in range(0, len(documentos), tamanho_lote):
+        lote = documentos[inicio:inicio + tamanho_lote]
+        canonicos = await ctx.run_cpu(normalizar_lote, lote)
+        novos = []
+        for documento, canonico in zip(lote, canonicos):
+            if canonico is None:
+                invalidos.append(documento)
+                continue
+            if canonico not in grafias:
+                novos.append(DocumentoFiscal(canonico))
+            grafias.setdefault(canonico, []).append(documento)
+        if parametros.get("verificar_cadastro") and novos:
+            async with SessionLocal() as session:
+                existentes = await ProdutorRepository(session).get_by_documentos(novos)
+            cadastrados.extend(str(produtor.cpf_cnpj) for produtor in existentes)
+        await ctx.progresso(inicio + len(lote))
+    resultado = {
+        "total": len(documentos),
+        "invalidos": invalidos,
+        # O mesmo documento escrito de formas diferentes dentro da lista
+        "duplicados": [grupo for grupo in grafias.values() if len(grupo) > 1],
+    }
+    if parametros.get("verificar_cadastro"):
+        resultado["cadastrados"] = cadastrados
+    return resultado
+
+@job_runner.register("manter_particoes")
+async def manter_particoes(ctx: JobContext, parametros: dict) -> dict:
+    anos = partition_window(
+        date.today(),
+        parametros.get("anos_antes", settings.partition_years_behind),
+        parametros.get("anos_depois", settings.partition_years_ahead),
+    )
+    async with engine.begin() as conn:
+        criadas = await ensure_partitions(conn, anos)
+    return {"criadas": criadas}
+
+@job_runner.register("arquivar_particoes")
+async def arquivar_particoes(ctx: JobContext, parametros: dict) -> dict:
+    if "ate_ano" not in parametros:
+        raise ValueError("Informe ate_ano")
+    schema = parametros.get("schema", settings.partition_archive_schema)
+    async with engine.begin() as conn:
+        arquivadas = await archive_partitions(conn, int(parametros["ate_ano"]), schema)
+    return {"arquivadas": arquivadas}
+
+@job_runner.register("exportar_snapshot")
+async def exportar_snapshot(ctx: JobContext, parametros: dict) -> dict:
+    # Import tardio: pyarrow só é carregado por quem exporta
+    from shared.snapshots.exporter import SnapshotExporter
+    exporter = SnapshotExporter(
+        read_engine,
+        parametros.get("destino", settings.snapshot_dir),
+        parametros.get("tamanho_lote", settings.snapshot_batch_size),
+    )
+    return await exporter.export(completo=bool(parametros.get("completo", False)))
+
+@job_runner.register(PURGA)
+async def purgar_exclusoes(ctx: JobContext, parametros: dict) -> dict:
+    tamanho_lote = parametros.get("tamanho_lote", settings.purge_batch_size)
+    if "entidade" in parametros:
+        return await purgar(engine, parametros["entidade"], int(parametros["id"]), tamanho_lote, ctx.progresso)
+    # Sem entidade: varre as exclusões que ficaram para trás
+    return await varrer(engine, tamanho_lote, ctx.progresso)
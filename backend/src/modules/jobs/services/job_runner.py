@@ -0,0 +1,114 @@
+import asyncio
+import logging
+from datetime import datetime
+from shared.config.settings import settings
+from shared.database.session import SessionLocal, use_primary
+from modules.jobs.repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+class JobContext:
+    def __init__(self, runner: "JobRunner", job_id: int):
+        self.runner = runner
+        self.job_id = job_id
+
+    async def progresso(self, atual: int, total: int | None = None):
+        fields = {"progresso": atual}
+        if total is not None:
+            fields["total"] = total
+        await self.runner.update_job(self.job_id, **fields)
+
+    async def run_cpu(self, fn, *args):
+        return await self.runner.run_cpu(fn, *args)
+
+class JobRunner:
+    """Executa jobs em background no próprio processo da API.
+
+    O semáforo limita quantos jobs rodam ao mesmo tempo, para que não
+    disputem o event loop e o pool de conexões com as requisições.
+    """
+
+    def __init__(self, session_factory=SessionLocal, max_concurrency: int | None = None, process_workers: int | None = None):
+        self.session_factory = session_factory
+        self.handlers = {}
+        self.max_concurrency = max_concurrency or settings.jobs_max_concurrency
+        self.process_workers = settings.jobs_process_workers if process_workers is None else process_workers
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._executor = None
+        self._tasks = set()
+
+    def register(self, tipo: str):
+        def decorator(handler):
+            self.handlers[tipo] = handler
+            return handler
+        return decorator
+
+    def submit(self, job_id: int) -> asyncio.Task:
+        task = asyncio.create_task(self._run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def run_cpu(self, fn, *args):
+        if self.process_workers <= 0:
+            return await asyncio.to_thread(fn, *args)
+        if self._executor is None:
+            # Import tardio: multiprocessing só é carregado se o pool for usado
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=self.process_workers)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def update_job(self, job_id: int, **fields):
+        async with self.session_factory() as session:
+            await JobRepository(use_primary(session)).update_fields(job_id, **fields)
+
+    async def load_job(self, job_id: int):
+        async with self.session_factory() as session:
+            return await JobRepository(use_primary(session)).get_by_id(job_id)
+
+    async def claim_job(self, job_id: int) -> bool:
+        async with self.session_factory() as session:
+            return await JobRepository(use_primary(session)).claim(job_id, iniciado_em=datetime.utcnow())
+
+    async def requeue_jobs(self) -> list[int]:
+        async with self.session_factory() as session:
+            return await JobRepository(use_primary(session)).requeue_unfinished()
+
+    async def resume(self) -> int:
+        """Resubmete, no startup, os jobs que o processo anterior não terminou."""
+        job_ids = await self.requeue_jobs()
+        for job_id in job_ids:
+            self.submit(job_id)
+        return len(job_ids)
+
+    async def _run(self, job_id: int):
+        async with self._semaphore:
+            job = await self.load_job(job_id)
+            if not job:
+                return
+            tipo, parametros = job.tipo, dict(job.parametros or {})
+            # Condicional: o mesmo job reenfileirado por dois workers roda uma vez só
+            if not await self.claim_job(job_id):
+                return
+            try:
+                resultado = await self.handlers[tipo](JobContext(self, job_id), parametros)
+            except asyncio.CancelledError:
+                # Shutdown: volta para a fila, e o próximo startup o retoma
+                logger.warning("Job %s (%s) interrompido", job_id, tipo)
+                await self.update_job(job_id, status="pendente", iniciado_em=None)
+                raise
+            except Exception as e:
+                logger.exception("Job %s (%s) falhou", job_id, tipo)
+                await self.update_job(job_id, status="falhou", erro=str(e), finalizado_em=datetime.utcnow())
+                return
+            await self.update_job(job_id, status="concluido", resultado=resultado, finalizado_em=datetime.utcnow())
+
+    async def shutdown(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+job_runner = JobRunner()
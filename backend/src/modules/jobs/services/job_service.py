@@ -0,0 +1,21 @@
+from modules.jobs.repositories.job_repository import JobRepository
+from modules.jobs.entities.job import Job
+from modules.jobs.dtos.job_dto import JobCreateDTO
+from modules.jobs.services.job_runner import JobRunner, job_runner
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class JobService:
+    def __init__(self, repository: JobRepository, runner: JobRunner = job_runner):
+        self.repository = repository
+        self.runner = runner
+
+    async def create_job(self, dto: JobCreateDTO) -> Job:
+        if dto.tipo not in self.runner.handlers:
+            raise ValueError(f"Tipo de job desconhecido: {dto.tipo}")
+        job = await self.repository.create(Job(tipo=dto.tipo, parametros=dto.parametros, status="pendente", progresso=0))
+        self.runner.submit(job.id)
+        return job
+
+    async def get_job_by_id(self, job_id: int):
+        return await self.repository.get_by_id(job_id)
@@ -0,0 +1,127 @@
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from modules.changes.services.change_service import RASTREADAS, adiar_alteracoes, gravar_alteracoes
+from modules.cultura.entities.cultura import Cultura
+from modules.jobs.entities.job import Job
+from modules.jobs.services.job_runner import JobRunner, job_runner
+from modules.produtor.entities.produtor import Produtor
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.propriedade.services.propriedade_mirror import propriedade_mirror
+from modules.safra.entities.safra import Safra
+from shared.database.entity_cache import cache_padrao, chave
+from shared.database.exclusao import Exclusao, marcar_excluida
+from shared.utils import change_events
+
+PURGA = "purgar_exclusoes"
+
+ENTIDADES = {nome: model for model, nome in RASTREADAS.items()}
+
+def exclusoes(model, ids) -> list[dict]:
+    nome = RASTREADAS[model]
+    return [{"entidade": nome, "entidade_id": _id, "operacao": "exclusao", "dados": None} for _id in ids]
+
+async def excluir(session: AsyncSession, model, entidade_id: int, runner: JobRunner = job_runner) -> Exclusao | None:
+    """Exclui logicamente a linha e agenda a purga das dependentes.
+
+    Um UPDATE, a linha do changelog e o job, numa transação só: o custo
+    não depende de quantas propriedades, safras e culturas vêm penduradas.
+    """
+    result = await session.execute(marcar_excluida(model, entidade_id).returning(model.id))
+    if result.first() is None:
+        await session.rollback()
+        return None
+    adiar_alteracoes(session.sync_session, exclusoes(model, [entidade_id]))
+    job = Job(tipo=PURGA, parametros={"entidade": RASTREADAS[model], "id": entidade_id}, status="pendente", progresso=0)
+    session.add(job)
+    await session.flush()
+    job_id = job.id
+    await session.commit()
+    runner.submit(job_id)
+    return Exclusao(entidade_id, job_id)
+
+def dependentes(entidade: str, entidade_id: int) -> list[tuple]:
+    """(model, critério) das linhas que dependem da raiz, das folhas para cima."""
+    if entidade == "cultura":
+        return []
+    if entidade == "safra":
+        return [(Cultura, Cultura.safra_id == entidade_id)]
+    if entidade == "propriedade":
+        propriedades = [entidade_id]
+    else:
+        propriedades = select(Propriedade.id).where(Propriedade.produtor_id == entidade_id)
+    safras = select(Safra.id).where(Safra.propriedade_id.in_(propriedades))
+    etapas = [
+        # A cultura aponta para a propriedade e para a safra, que podem não ser da mesma propriedade
+        (Cultura, or_(Cultura.propriedade_id.in_(propriedades), Cultura.safra_id.in_(safras))),
+        (Safra, Safra.propriedade_id.in_(propriedades)),
+    ]
+    if entidade == "produtor":
+        etapas.append((Propriedade, Propriedade.produtor_id == entidade_id))
+    return etapas
+
+async def apagar_lote(engine: AsyncEngine, model, criterio, tamanho_lote: int) -> int:
+    """Apaga até ``tamanho_lote`` linhas numa transação curta, registrando
+    cada uma no changelog."""
+    lote = select(model.id).where(criterio).limit(tamanho_lote)
+    async with engine.begin() as conn:
+        result = await conn.execute(delete(model).where(model.id.in_(lote)).returning(model.id))
+        ids = list(result.scalars())
+        if ids:
+            await conn.run_sync(gravar_alteracoes, exclusoes(model, ids))
+    if ids:
+        # A exclusão lógica só escondeu a raiz; as dependentes saem do cache,
+        # do espelho do dashboard e chegam aos assinantes do stream aqui,
+        # como num delete direto
+        nome = RASTREADAS[model]
+        await cache_padrao().invalidar(*(chave(nome, _id) for _id in ids))
+        for _id in ids:
+            if model is Propriedade:
+                propriedade_mirror.remover(_id)
+            change_events.publish(nome, "exclusao", _id)
+    return len(ids)
+
+async def purgar(engine: AsyncEngine, entidade: str, entidade_id: int, tamanho_lote: int, progresso=None) -> dict:
+    """Apaga de vez a raiz excluída e tudo o que depende dela, em lotes de
+    ``tamanho_lote`` linhas, cada um na sua transação."""
+    if entidade not in ENTIDADES:
+        raise ValueError(f"Entidade desconhecida: {entidade}")
+    raiz = ENTIDADES[entidade]
+    etapas = dependentes(entidade, entidade_id)
+    async with engine.connect() as conn:
+        totais = [(await conn.execute(select(func.count()).select_from(model).where(criterio))).scalar_one() for model, criterio in etapas]
+    total = sum(totais) + 1
+    if progresso:
+        await progresso(0, total)
+    apagadas, feitas = {}, 0
+    for model, criterio in etapas:
+        tabela = model.__tablename__
+        while True:
+            quantas = await apagar_lote(engine, model, criterio, tamanho_lote)
+            apagadas[tabela] = apagadas.get(tabela, 0) + quantas
+            feitas += quantas
+            if progresso:
+                await progresso(feitas)
+            if quantas < tamanho_lote:
+                break
+    async with engine.begin() as conn:
+        # Só se ainda estiver excluída; a exclusão em si já está no changelog
+        await conn.execute(delete(raiz).where(raiz.id == entidade_id, raiz.excluido_em.isnot(None)))
+    if progresso:
+        await progresso(feitas + 1, feitas + 1)
+    return {"entidade": entidade, "id": entidade_id, "apagadas": apagadas}
+
+async def varrer(engine: AsyncEngine, tamanho_lote: int, progresso=None) -> dict:
+    """Purga toda linha ainda excluída logicamente, como as de purgas
+    interrompidas por um restart."""
+    raizes = []
+    async with engine.connect() as conn:
+        for entidade, model in ENTIDADES.items():
+            result = await conn.execute(select(model.id).where(model.excluido_em.isnot(None)).order_by(model.id))
+            raizes.extend((entidade, _id) for _id in result.scalars())
+    if progresso:
+        await progresso(0, len(raizes))
+    for feitas, (entidade, entidade_id) in enumerate(raizes, 1):
+        await purgar(engine, entidade, entidade_id, tamanho_lote)
+        if progresso:
+            await progresso(feitas)
+    return {"purgadas": len(raizes)}
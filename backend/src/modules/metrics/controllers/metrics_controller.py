@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+from shared.utils.metrics import CONTENT_TYPE, registro_padrao
+
+router = APIRouter(tags=["Métricas"])
+
+@router.get("/metrics")
+async def get_metrics():
+    return Response(registro_padrao.renderizar(), media_type=CONTENT_TYPE)
@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from shared.database.session import get_db
-from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO, ProdutorUpdateDTO, ProdutorReadDTO
+from shared.database.memoria import usar_memoria
+from shared.database.session import get_db, get_read_db
+from shared.exceptions import ConflitoDeVersao
+from shared.database.counts import Contagem
+from shared.utils.count_headers import set_count_headers
+from shared.utils.multi_get import parse_ids
+from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO, ProdutorPatchDTO, ProdutorUpdateDTO, ProdutorReadDTO
 from modules.produtor.repositories.produtor_repository import ProdutorRepository
+from modules.produtor.repositories.produtor_memoria_repository import ProdutorMemoriaRepository
 from modules.produtor.services.produtor_service import ProdutorService
+from shared.utils.tracing import RotaInstrumentada
 
-router = APIRouter(prefix="/produtores", tags=["Produtores"])
+router = APIRouter(prefix="/produtores", tags=["Produtores"], route_class=RotaInstrumentada)
+
+def get_repository(db: AsyncSession):
+    if usar_memoria():
+        return ProdutorMemoriaRepository()
+    return ProdutorRepository(db)
 
 @router.post("/", response_model=ProdutorReadDTO, status_code=status.HTTP_201_CREATED)
 async def create_produtor(dto: ProdutorCreateDTO, db: AsyncSession = Depends(get_db)):
-    service = ProdutorService(ProdutorRepository(db))
+    service = ProdutorService(get_repository(db))
     try:
         produtor = await service.create_produtor(dto)
         return produtor
@@ -17,13 +30,26 @@ async def create_produtor(dto: ProdutorCreateDTO, db: AsyncSession = Depends(get
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=list[ProdutorReadDTO])
-async def list_produtores(db: AsyncSession = Depends(get_db)):
-    service = ProdutorService(ProdutorRepository(db))
+async def list_produtores(response: Response, exato: Optional[bool] = None, ids: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
+    service = ProdutorService(get_repository(db))
+    if ids is not None:
+        # Multi-get: ?ids=1,2,3 numa consulta, na ordem pedida; ids inexistentes ficam de fora
+        try:
+            lista = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        entidades = await service.get_produtores_by_ids(lista)
+        if exato is not None:
+            # O total de um multi-get é o que foi encontrado, sempre exato
+            set_count_headers(response, Contagem(len(entidades)))
+        return entidades
+    if exato is not None:
+        set_count_headers(response, await service.count_produtores(exato))
     return await service.get_all_produtores()
 
 @router.get("/{produtor_id}", response_model=ProdutorReadDTO)
-async def get_produtor(produtor_id: int, db: AsyncSession = Depends(get_db)):
-    service = ProdutorService(ProdutorRepository(db))
+async def get_produtor(produtor_id: int, db: AsyncSession = Depends(get_read_db)):
+    service = ProdutorService(get_repository(db))
     produtor = await service.get_produtor_by_id(produtor_id)
     if not produtor:
         raise HTTPException(status_code=404, detail="Produtor não encontrado")
@@ -31,16 +57,34 @@ async def get_produtor(produtor_id: int, db: AsyncSession = Depends(get_db)):
 
 @router.put("/{produtor_id}", response_model=ProdutorReadDTO)
 async def update_produtor(produtor_id: int, dto: ProdutorUpdateDTO, db: AsyncSession = Depends(get_db)):
-    service = ProdutorService(ProdutorRepository(db))
+    service = ProdutorService(get_repository(db))
     try:
         return await service.update_produtor(produtor_id, dto)
+    except ConflitoDeVersao as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.patch("/{produtor_id}", response_model=ProdutorReadDTO)
+async def patch_produtor(produtor_id: int, dto: ProdutorPatchDTO, db: AsyncSession = Depends(get_db)):
+    service = ProdutorService(get_repository(db))
+    try:
+        produtor = await service.patch_produtor(produtor_id, dto)
+    except ConflitoDeVersao as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not produtor:
+        raise HTTPException(status_code=404, detail="Produtor não encontrado")
+    return produtor
+
 @router.delete("/{produtor_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_produtor(produtor_id: int, db: AsyncSession = Depends(get_db)):
-    service = ProdutorService(ProdutorRepository(db))
+async def delete_produtor(produtor_id: int, response: Response, db: AsyncSession = Depends(get_db)):
+    service = ProdutorService(get_repository(db))
     try:
-        await service.delete_produtor(produtor_id)
+        exclusao = await service.delete_produtor(produtor_id)
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+    if exclusao.purga is not None:
+        # A purga das dependentes segue em /jobs/{id}
+        response.headers["X-Purge-Job"] = str(exclusao.purga)
@@ -23,10 +23,16 @@ class ProdutorCreateDTO(ProdutorBaseDTO):
 class ProdutorUpdateDTO(ProdutorBaseDTO):
     pass
 
+class ProdutorPatchDTO(BaseModel):
+    # CPF/CNPJ não muda
+    nome: Optional[str] = None
+    versao: int
+
 class ProdutorReadDTO(BaseModel):
     id: int
     cpf_cnpj: str
     nome: str
+    versao: int
     propriedades: Optional[List[PropriedadeReadDTO]] = None
 
     class Config:
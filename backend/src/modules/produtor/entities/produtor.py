@@ -1,10 +1,25 @@
-from sqlalchemy import Column, String, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, SmallInteger, BigInteger, Index, text
+from sqlalchemy.orm import composite, relationship
 from shared.database.base import Base
+from shared.database.exclusao import ExclusaoLogica
+from shared.utils.documento_fiscal import DocumentoFiscal
 
-class Produtor(Base):
+class Produtor(ExclusaoLogica, Base):
     __tablename__ = "produtores"
+    # Chave primeiro: é ela que discrimina, o tipo quase nunca. Parcial: o
+    # documento de um produtor excluído, à espera da purga, pode ser recadastrado
+    __table_args__ = (
+        Index(
+            "uq_produtores_documento", "documento_chave", "documento_tipo", unique=True,
+            postgresql_where=text("excluido_em IS NULL"), sqlite_where=text("excluido_em IS NULL"),
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    cpf_cnpj = Column(String(18), unique=True, nullable=False, index=True)
+    documento_tipo = Column(SmallInteger, nullable=False)
+    documento_chave = Column(BigInteger, nullable=False)
+    cpf_cnpj = composite(DocumentoFiscal.from_chave, documento_tipo, documento_chave)
     nome = Column(String(100), nullable=False)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    # O ORM confere e incrementa a versão em todo UPDATE feito pelo flush
+    __mapper_args__ = {"version_id_col": versao}
     propriedades = relationship("Propriedade", back_populates="produtor", lazy="selectin") 
\ No newline at end of file
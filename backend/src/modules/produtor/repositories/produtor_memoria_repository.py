@@ -0,0 +1,25 @@
+from typing import List, Optional
+from modules.produtor.entities.produtor import Produtor
+from shared.database.memoria import MemoriaRepository, relacionar
+from shared.utils.documento_fiscal import DocumentoFiscal
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class ProdutorMemoriaRepository(MemoriaRepository):
+    tabela = "produtores"
+
+    def carregar(self, produtor: Produtor) -> Produtor:
+        # O equivalente ao selectin: as propriedades pelo índice de produtor_id
+        relacionar(produtor, "propriedades", self.banco["propriedades"].buscar("produtor_id", produtor.id))
+        return produtor
+
+    async def get_by_cpf_cnpj(self, cpf_cnpj: str) -> Optional[Produtor]:
+        try:
+            documento = DocumentoFiscal.parse(cpf_cnpj)
+        except ValueError:
+            return None
+        return self.linhas.buscar_unico("uq_produtores_documento", (documento.chave, documento.tipo))
+
+    async def get_by_documentos(self, documentos: list[DocumentoFiscal]) -> List[Produtor]:
+        encontrados = (self.linhas.buscar_unico("uq_produtores_documento", (d.chave, d.tipo)) for d in documentos)
+        return [produtor for produtor in encontrados if produtor is not None]
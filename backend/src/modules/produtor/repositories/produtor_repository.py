@@ -1,10 +1,22 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import tuple_
 from sqlalchemy.future import select
 from sqlalchemy.exc import NoResultFound
 from modules.produtor.entities.produtor import Produtor
+from shared.database.batch_loader import ids_em, na_ordem
+from shared.database.counts import Contagem, count_rows
+from shared.database.exclusao import Exclusao
+from modules.jobs.services.purga import excluir
+from modules.changes.services.change_service import registrar_alteracao
+from shared.database.versioning import versioned_update
+from shared.exceptions import ConflitoDeVersao
+from shared.utils.documento_fiscal import DocumentoFiscal
+from sqlalchemy.orm.exc import StaleDataError
 from typing import List, Optional
 from sqlalchemy.orm import selectinload
+from shared.utils.instrumentation import instrumentado
 
+@instrumentado
 class ProdutorRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -21,10 +33,33 @@ class ProdutorRepository:
         )
         return result.scalars().first()
 
+    async def get_by_ids(self, ids: list[int]) -> List[Produtor]:
+        result = await self.session.execute(
+            select(Produtor).options(selectinload(Produtor.propriedades)).where(ids_em(self.session, Produtor.id, ids))
+        )
+        return na_ordem(ids, result.scalars().all())
+
     async def get_by_cpf_cnpj(self, cpf_cnpj: str) -> Optional[Produtor]:
-        result = await self.session.execute(select(Produtor).where(Produtor.cpf_cnpj == cpf_cnpj))
+        try:
+            documento = DocumentoFiscal.parse(cpf_cnpj)
+        except ValueError:
+            return None
+        result = await self.session.execute(select(Produtor).where(Produtor.cpf_cnpj == documento))
         return result.scalars().first()
 
+    async def get_by_documentos(self, documentos: list[DocumentoFiscal]) -> List[Produtor]:
+        # Uma busca só no índice único (chave, tipo) para o lote inteiro
+        pares = [(documento.chave, documento.tipo) for documento in documentos]
+        if not pares:
+            return []
+        result = await self.session.execute(
+            select(Produtor).where(tuple_(Produtor.documento_chave, Produtor.documento_tipo).in_(pares))
+        )
+        return list(result.scalars().all())
+
+    async def count(self, exato: bool = True) -> Contagem:
+        return await count_rows(self.session, Produtor, exato)
+
     async def create(self, produtor: Produtor) -> Produtor:
         self.session.add(produtor)
         await self.session.commit()
@@ -32,10 +67,23 @@ class ProdutorRepository:
         return produtor
 
     async def update(self, produtor: Produtor) -> Produtor:
-        await self.session.commit()
+        try:
+            await self.session.commit()
+        except StaleDataError:
+            await self.session.rollback()
+            raise ConflitoDeVersao()
         await self.session.refresh(produtor)
         return produtor
 
-    async def delete(self, produtor: Produtor):
-        await self.session.delete(produtor)
-        await self.session.commit() 
\ No newline at end of file
+    async def patch(self, produtor_id: int, versao: int, valores: dict) -> Optional[Produtor]:
+        result = await self.session.execute(versioned_update(Produtor, produtor_id, versao, valores))
+        produtor = result.scalars().first()
+        if produtor is None:
+            await self.session.rollback()
+            return None
+        await registrar_alteracao(self.session, produtor, "alteracao")
+        await self.session.commit()
+        return produtor
+
+    async def delete(self, produtor_id: int) -> Optional[Exclusao]:
+        return await excluir(self.session, Produtor, produtor_id) 
\ No newline at end of file
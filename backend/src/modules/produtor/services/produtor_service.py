@@ -1,23 +1,24 @@
 from modules.produtor.repositories.produtor_repository import ProdutorRepository
 from modules.produtor.entities.produtor import Produtor
-from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO, ProdutorUpdateDTO
-from shared.utils.validators import validar_cpf, validar_cnpj
+from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO, ProdutorPatchDTO, ProdutorReadDTO, ProdutorUpdateDTO
+from shared.database.entity_cache import EntityCache, SemCache, cache_padrao, chave, registrar_entidade
+from shared.exceptions import ConflitoDeVersao
+from shared.utils.documento_fiscal import DocumentoFiscal
 from sqlalchemy.exc import IntegrityError
+from shared.utils.instrumentation import instrumentado
 
+# O DTO do produtor traz as propriedades: escrever numa delas o invalida
+registrar_entidade("produtor", ProdutorReadDTO, lambda produtor: [chave("propriedade", p.id) for p in produtor.propriedades or ()])
+
+@instrumentado
 class ProdutorService:
-    def __init__(self, repository: ProdutorRepository):
+    def __init__(self, repository: ProdutorRepository, cache: EntityCache | SemCache | None = None):
         self.repository = repository
+        self.cache = cache_padrao() if cache is None else cache
 
     async def create_produtor(self, dto: ProdutorCreateDTO) -> Produtor:
-        if len(dto.cpf_cnpj) == 11:
-            if not validar_cpf(dto.cpf_cnpj):
-                raise ValueError("CPF inválido")
-        elif len(dto.cpf_cnpj) == 14:
-            if not validar_cnpj(dto.cpf_cnpj):
-                raise ValueError("CNPJ inválido")
-        else:
-            raise ValueError("CPF ou CNPJ deve ter 11 ou 14 dígitos")
-        produtor = Produtor(cpf_cnpj=dto.cpf_cnpj, nome=dto.nome)
+        documento = DocumentoFiscal.parse(dto.cpf_cnpj)
+        produtor = Produtor(cpf_cnpj=documento, nome=dto.nome)
         try:
             return await self.repository.create(produtor)
         except IntegrityError:
@@ -26,8 +27,14 @@ class ProdutorService:
     async def get_all_produtores(self):
         return await self.repository.get_all()
 
+    async def count_produtores(self, exato: bool = True):
+        return await self.repository.count(exato)
+
     async def get_produtor_by_id(self, produtor_id: int):
-        return await self.repository.get_by_id(produtor_id)
+        return await self.cache.obter("produtor", produtor_id, lambda: self.repository.get_by_id(produtor_id), self.repository.session)
+
+    async def get_produtores_by_ids(self, ids: list[int]):
+        return await self.repository.get_by_ids(ids)
 
     async def update_produtor(self, produtor_id: int, dto: ProdutorUpdateDTO):
         produtor = await self.repository.get_by_id(produtor_id)
@@ -35,10 +42,23 @@ class ProdutorService:
             raise ValueError("Produtor não encontrado")
         produtor.nome = dto.nome
         # Não permitir alteração do CPF/CNPJ
-        return await self.repository.update(produtor)
+        produtor = await self.repository.update(produtor)
+        await self.cache.invalidar(chave("produtor", produtor_id))
+        return produtor
+
+    async def patch_produtor(self, produtor_id: int, dto: ProdutorPatchDTO):
+        valores = dto.model_dump(exclude_none=True, exclude={"versao"})
+        produtor = await self.repository.patch(produtor_id, dto.versao, valores)
+        if produtor is None and await self.repository.get_by_id(produtor_id):
+            # Só no caminho de erro: a linha existe, então a versão mudou
+            raise ConflitoDeVersao()
+        if produtor is not None:
+            await self.cache.invalidar(chave("produtor", produtor_id))
+        return produtor
 
     async def delete_produtor(self, produtor_id: int):
-        produtor = await self.repository.get_by_id(produtor_id)
-        if not produtor:
+        exclusao = await self.repository.delete(produtor_id)
+        if exclusao is None:
             raise ValueError("Produtor não encontrado")
-        await self.repository.delete(produtor) 
\ No newline at end of file
+        await self.cache.invalidar(chave("produtor", produtor_id))
+        return exclusao
\ No newline at end of file
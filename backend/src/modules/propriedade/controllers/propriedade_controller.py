@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from shared.database.session import get_db
-from modules.propriedade.dtos.propriedade_dto import PropriedadeCreateDTO, PropriedadeUpdateDTO, PropriedadeReadDTO
+from shared.database.memoria import usar_memoria
+from shared.database.session import get_db, get_read_db
+from shared.exceptions import ConflitoDeVersao
+from shared.database.counts import Contagem
+from shared.utils.count_headers import set_count_headers
+from shared.utils.multi_get import parse_ids
+from modules.propriedade.dtos.propriedade_dto import PropriedadeCreateDTO, PropriedadePatchDTO, PropriedadeUpdateDTO, PropriedadeReadDTO
 from modules.propriedade.repositories.propriedade_repository import PropriedadeRepository
+from modules.propriedade.repositories.propriedade_memoria_repository import PropriedadeMemoriaRepository
 from modules.propriedade.services.propriedade_service import PropriedadeService
+from shared.utils.tracing import RotaInstrumentada
 
-router = APIRouter(prefix="/propriedades", tags=["Propriedades"])
+router = APIRouter(prefix="/propriedades", tags=["Propriedades"], route_class=RotaInstrumentada)
+
+def get_repository(db: AsyncSession):
+    if usar_memoria():
+        return PropriedadeMemoriaRepository()
+    return PropriedadeRepository(db)
 
 @router.post("/", response_model=PropriedadeReadDTO, status_code=status.HTTP_201_CREATED)
 async def create_propriedade(dto: PropriedadeCreateDTO, db: AsyncSession = Depends(get_db)):
-    service = PropriedadeService(PropriedadeRepository(db))
+    service = PropriedadeService(get_repository(db))
     try:
         propriedade = await service.create_propriedade(dto)
         return propriedade
@@ -17,13 +30,26 @@ async def create_propriedade(dto: PropriedadeCreateDTO, db: AsyncSession = Depen
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=list[PropriedadeReadDTO])
-async def list_propriedades(db: AsyncSession = Depends(get_db)):
-    service = PropriedadeService(PropriedadeRepository(db))
+async def list_propriedades(response: Response, exato: Optional[bool] = None, ids: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
+    service = PropriedadeService(get_repository(db))
+    if ids is not None:
+        # Multi-get: ?ids=1,2,3 numa consulta, na ordem pedida; ids inexistentes ficam de fora
+        try:
+            lista = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        entidades = await service.get_propriedades_by_ids(lista)
+        if exato is not None:
+            # O total de um multi-get é o que foi encontrado, sempre exato
+            set_count_headers(response, Contagem(len(entidades)))
+        return entidades
+    if exato is not None:
+        set_count_headers(response, await service.count_propriedades(exato))
     return await service.get_all_propriedades()
 
 @router.get("/{propriedade_id}", response_model=PropriedadeReadDTO)
-async def get_propriedade(propriedade_id: int, db: AsyncSession = Depends(get_db)):
-    service = PropriedadeService(PropriedadeRepository(db))
+async def get_propriedade(propriedade_id: int, db: AsyncSession = Depends(get_read_db)):
+    service = PropriedadeService(get_repository(db))
     propriedade = await service.get_propriedade_by_id(propriedade_id)
     if not propriedade:
         raise HTTPException(status_code=404, detail="Propriedade não encontrada")
@@ -31,16 +57,34 @@ async def get_propriedade(propriedade_id: int, db: AsyncSession = Depends(get_db
 
 @router.put("/{propriedade_id}", response_model=PropriedadeReadDTO)
 async def update_propriedade(propriedade_id: int, dto: PropriedadeUpdateDTO, db: AsyncSession = Depends(get_db)):
-    service = PropriedadeService(PropriedadeRepository(db))
+    service = PropriedadeService(get_repository(db))
     try:
         return await service.update_propriedade(propriedade_id, dto)
+    except ConflitoDeVersao as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.patch("/{propriedade_id}", response_model=PropriedadeReadDTO)
+async def patch_propriedade(propriedade_id: int, dto: PropriedadePatchDTO, db: AsyncSession = Depends(get_db)):
+    service = PropriedadeService(get_repository(db))
+    try:
+        propriedade = await service.patch_propriedade(propriedade_id, dto)
+    except ConflitoDeVersao as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not propriedade:
+        raise HTTPException(status_code=404, detail="Propriedade não encontrada")
+    return propriedade
+
 @router.delete("/{propriedade_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_propriedade(propriedade_id: int, db: AsyncSession = Depends(get_db)):
-    service = PropriedadeService(PropriedadeRepository(db))
+async def delete_propriedade(propriedade_id: int, response: Response, db: AsyncSession = Depends(get_db)):
+    service = PropriedadeService(get_repository(db))
     try:
-        await service.delete_propriedade(propriedade_id)
+        exclusao = await service.delete_propriedade(propriedade_id)
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+    if exclusao.purga is not None:
+        # A purga das dependentes segue em /jobs/{id}
+        response.headers["X-Purge-Job"] = str(exclusao.purga)
@@ -23,6 +23,16 @@ class PropriedadeCreateDTO(PropriedadeBaseDTO):
 class PropriedadeUpdateDTO(PropriedadeBaseDTO):
     pass
 
+class PropriedadePatchDTO(BaseModel):
+    nome: Optional[str] = None
+    cidade: Optional[str] = None
+    estado: Optional[str] = None
+    area_total: Optional[float] = None
+    area_agricultavel: Optional[float] = None
+    area_vegetacao: Optional[float] = None
+    produtor_id: Optional[int] = None
+    versao: int
+
 class PropriedadeReadDTO(BaseModel):
     id: int
     nome: str
@@ -31,6 +41,7 @@ class PropriedadeReadDTO(BaseModel):
     area_total: float
     area_agricultavel: float
     area_vegetacao: float
+    versao: int
     produtor: Optional[ProdutorReadDTO]
 
     class Config:
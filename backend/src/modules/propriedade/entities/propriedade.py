@@ -1,8 +1,9 @@
 from sqlalchemy import Column, String, Integer, Float, ForeignKey
 from sqlalchemy.orm import relationship
 from shared.database.base import Base
+from shared.database.exclusao import ExclusaoLogica
 
-class Propriedade(Base):
+class Propriedade(ExclusaoLogica, Base):
     __tablename__ = "propriedades"
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(100), nullable=False)
@@ -12,6 +13,8 @@ class Propriedade(Base):
     area_agricultavel = Column(Float, nullable=False)
     area_vegetacao = Column(Float, nullable=False)
     produtor_id = Column(Integer, ForeignKey("produtores.id"), nullable=False)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": versao}
     produtor = relationship("Produtor", back_populates="propriedades")
     safras = relationship("Safra", back_populates="propriedade")
     culturas = relationship("Cultura", back_populates="propriedade") 
\ No newline at end of file
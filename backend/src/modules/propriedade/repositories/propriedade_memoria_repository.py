@@ -0,0 +1,11 @@
+from modules.propriedade.entities.propriedade import Propriedade
+from shared.database.memoria import MemoriaRepository, relacionar
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class PropriedadeMemoriaRepository(MemoriaRepository):
+    tabela = "propriedades"
+
+    def carregar(self, propriedade: Propriedade) -> Propriedade:
+        relacionar(propriedade, "produtor", self.banco["produtores"].get(propriedade.produtor_id))
+        return propriedade
@@ -1,31 +1,84 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 from modules.propriedade.entities.propriedade import Propriedade
+from shared.database.batch_loader import batch_loader, ids_em, na_ordem
+from shared.database.counts import Contagem, count_rows
+from shared.database.exclusao import Exclusao, travar_pais
+from modules.jobs.services.purga import excluir
+from modules.changes.services.change_service import registrar_alteracao
+from shared.database.versioning import versioned_update
+from shared.exceptions import ConflitoDeVersao
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from typing import List, Optional
+from shared.utils.instrumentation import instrumentado
 
+@instrumentado
 class PropriedadeRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def get_all(self) -> List[Propriedade]:
         result = await self.session.execute(select(Propriedade))
-        return result.scalars().all()
+        return await self.com_produtor(result.scalars().all())
 
     async def get_by_id(self, propriedade_id: int) -> Optional[Propriedade]:
         result = await self.session.execute(select(Propriedade).where(Propriedade.id == propriedade_id))
-        return result.scalars().first()
+        propriedade = result.scalars().first()
+        if propriedade is not None:
+            await self.com_produtor([propriedade])
+        return propriedade
+
+    async def get_by_ids(self, ids: list[int]) -> List[Propriedade]:
+        result = await self.session.execute(select(Propriedade).where(ids_em(self.session, Propriedade.id, ids)))
+        return await self.com_produtor(na_ordem(ids, result.scalars().all()))
+
+    async def com_produtor(self, propriedades: list[Propriedade]) -> list[Propriedade]:
+        # Os produtores de todas as linhas num lote, no lugar de um lazy load por linha
+        await batch_loader(self.session).relacionar(propriedades, Propriedade.produtor)
+        return propriedades
+
+    async def count(self, exato: bool = True) -> Contagem:
+        return await count_rows(self.session, Propriedade, exato)
 
     async def create(self, propriedade: Propriedade) -> Propriedade:
+        await travar_pais(self.session, Propriedade, [propriedade])
         self.session.add(propriedade)
         await self.session.commit()
         await self.session.refresh(propriedade)
         return propriedade
 
     async def update(self, propriedade: Propriedade) -> Propriedade:
-        await self.session.commit()
+        try:
+            await travar_pais(self.session, Propriedade, [propriedade])
+            await self.session.commit()
+        except StaleDataError:
+            await self.session.rollback()
+            raise ConflitoDeVersao()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
         await self.session.refresh(propriedade)
         return propriedade
 
-    async def delete(self, propriedade: Propriedade):
-        await self.session.delete(propriedade)
-        await self.session.commit() 
\ No newline at end of file
+    async def patch(self, propriedade_id: int, versao: int, valores: dict, *criterios) -> Optional[Propriedade]:
+        try:
+            await travar_pais(self.session, Propriedade, [valores])
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+        result = await self.session.execute(
+            versioned_update(Propriedade, propriedade_id, versao, valores, *criterios)
+            .options(selectinload(Propriedade.produtor))
+        )
+        propriedade = result.scalars().first()
+        if propriedade is None:
+            await self.session.rollback()
+            return None
+        await registrar_alteracao(self.session, propriedade, "alteracao")
+        await self.session.commit()
+        return propriedade
+
+    async def delete(self, propriedade_id: int) -> Optional[Exclusao]:
+        return await excluir(self.session, Propriedade, propriedade_id) 
\ No newline at end of file
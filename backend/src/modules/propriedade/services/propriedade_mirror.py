@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from sqlalchemy import select
+from modules.propriedade.entities.propriedade import Propriedade
+
+logger = logging.getLogger(__name__)
+
+# Só o que o dashboard e os filtros usam
+COLUNAS = (
+    Propriedade.id,
+    Propriedade.estado,
+    Propriedade.area_total,
+    Propriedade.area_agricultavel,
+    Propriedade.area_vegetacao,
+    Propriedade.produtor_id,
+)
+
+class ColunasPropriedade:
+    """Arrays paralelos com uma posição por propriedade.
+
+    ``posicao`` leva do id à linha; a exclusão move a última linha para o
+    buraco, então inserir, alterar e excluir são O(1). O estado é guardado
+    como código inteiro para que os agrupamentos por UF sejam um bincount.
+    """
+
+    def __init__(self, capacidade: int = 1024):
+        self.tamanho = 0
+        self.posicao = {}
+        self.estados = []
+        self._codigos = {}
+        self.ids = np.zeros(capacidade, np.int64)
+        self.estado = np.zeros(capacidade, np.int16)
+        self.area_total = np.zeros(capacidade, np.float64)
+        self.area_agricultavel = np.zeros(capacidade, np.float64)
+        self.area_vegetacao = np.zeros(capacidade, np.float64)
+        self.produtor_id = np.zeros(capacidade, np.int64)
+
+    @classmethod
+    def from_rows(cls, rows) -> "ColunasPropriedade":
+        colunas = cls(max(len(rows) * 2, 1024))
+        n = len(rows)
+        if n:
+            ids, estados, total, agricultavel, vegetacao, produtores = zip(*rows)
+            colunas.estados, codigos = np.unique(np.array(estados, dtype=object), return_inverse=True)
+            colunas.estados = list(colunas.estados)
+            colunas._codigos = {estado: i for i, estado in enumerate(colunas.estados)}
+            colunas.ids[:n] = ids
+            colunas.estado[:n] = codigos
+            colunas.area_total[:n] = total
+            colunas.area_agricultavel[:n] = agricultavel
+            colunas.area_vegetacao[:n] = vegetacao
+            colunas.produtor_id[:n] = produtores
+            colunas.posicao = dict(zip(ids, range(n)))
+            colunas.tamanho = n
+        return colunas
+
+    def _arrays(self):
+        return (self.ids, self.estado, self.area_total, self.area_agricultavel, self.area_vegetacao, self.produtor_id)
+
+    def _codigo_estado(self, estado: str) -> int:
+        codigo = self._codigos.get(estado)
+        if codigo is None:
+            codigo = self._codigos[estado] = len(self.estados)
+            self.estados.append(estado)
+        return codigo
+
+    def _crescer(self):
+        for nome in ("ids", "estado", "area_total", "area_agricultavel", "area_vegetacao", "produtor_id"):
+            atual = getattr(self, nome)
+            novo = np.zeros(len(atual) * 2, atual.dtype)
+            novo[:self.tamanho] = atual[:self.tamanho]
+            setattr(self, nome, novo)
+
+    def upsert(self, id: int, estado: str, area_total: float, area_agricultavel: float, area_vegetacao: float, produtor_id: int):
+        i = self.posicao.get(id)
+        if i is None:
+            if self.tamanho == len(self.ids):
+                self._crescer()
+            i = self.posicao[id] = self.tamanho
+            self.tamanho += 1
+        self.ids[i] = id
+        self.estado[i] = self._codigo_estado(estado)
+        self.area_total[i] = area_total
+        self.area_agricultavel[i] = area_agricultavel
+        self.area_vegetacao[i] = area_vegetacao
+        self.produtor_id[i] = produtor_id
+
+    def remove(self, id: int):
+        i = self.posicao.pop(id, None)
+        if i is None:
+            return
+        ultima = self.tamanho - 1
+        if i != ultima:
+            for array in self._arrays():
+                array[i] = array[ultima]
+            self.posicao[int(self.ids[i])] = i
+        self.tamanho = ultima
+
+    def soma(self, coluna: str) -> float:
+        return float(getattr(self, coluna)[:self.tamanho].sum())
+
+    def por_estado(self, coluna: str | None = None) -> dict[str, float]:
+        """Contagem (sem coluna) ou soma da coluna por UF, só das UFs com
+        alguma propriedade."""
+        codigos = self.estado[:self.tamanho]
+        contagens = np.bincount(codigos, minlength=len(self.estados))
+        valores = contagens if coluna is None else np.bincount(
+            codigos, weights=getattr(self, coluna)[:self.tamanho], minlength=len(self.estados)
+        )
+        return {
+            self.estados[codigo]: (int(valores[codigo]) if coluna is None else float(valores[codigo]))
+            for codigo in np.flatnonzero(contagens)
+        }
+
+class PropriedadeMirror:
+    """Espelho colunar de Propriedade mantido por processo.
+
+    O PropriedadeService aplica aqui cada escrita feita pelo processo; as
+    feitas por outros workers chegam na reconciliação periódica, que relê
+    as colunas do banco e troca os arrays de uma vez. Escritas que
+    acontecem durante a releitura são reaplicadas sobre o resultado.
+    """
+
+    def __init__(self):
+        self.colunas = None
+        self.reconciliado_em = None
+        self._pendentes = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def carregado(self) -> bool:
+        return self.colunas is not None
+
+    def _aplicar(self, operacao: str, *args):
+        if self._pendentes is not None:
+            self._pendentes.append((operacao, args))
+        if self.colunas is not None:
+            getattr(self.colunas, operacao)(*args)
+
+    def aplicar(self, propriedade: Propriedade):
+        self._aplicar(
+            "upsert",
+            propriedade.id,
+            propriedade.estado,
+            propriedade.area_total,
+            propriedade.area_agricultavel,
+            propriedade.area_vegetacao,
+            propriedade.produtor_id,
+        )
+
+    def remover(self, propriedade_id: int):
+        self._aplicar("remove", propriedade_id)
+
+    async def reconcile(self, session_factory) -> int:
+        async with self._lock:
+            self._pendentes = []
+            try:
+                async with session_factory() as session:
+                    # No primário: a réplica atrasada desfaria escritas recentes
+                    result = await session.execute(select(*COLUNAS), bind_arguments={"primary": True})
+                    rows = result.all()
+                colunas = await asyncio.to_thread(ColunasPropriedade.from_rows, rows)
+                for operacao, args in self._pendentes:
+                    getattr(colunas, operacao)(*args)
+                self.colunas = colunas
+                self.reconciliado_em = time.time()
+            finally:
+                self._pendentes = None
+            return colunas.tamanho
+
+async def run_reconciliation(mirror: PropriedadeMirror, session_factory, intervalo_s: float):
+    while True:
+        try:
+            total = await mirror.reconcile(session_factory)
+            logger.info("Espelho de propriedades reconciliado: %s linhas", total)
+        except Exception:
+            logger.exception("Falha ao reconciliar o espelho de propriedades")
+        await asyncio.sleep(intervalo_s)
+
+propriedade_mirror = PropriedadeMirror()
@@ -1,15 +1,35 @@
 from modules.propriedade.repositories.propriedade_repository import PropriedadeRepository
 from modules.propriedade.entities.propriedade import Propriedade
-from modules.propriedade.dtos.propriedade_dto import PropriedadeCreateDTO, PropriedadeUpdateDTO
+from modules.propriedade.dtos.propriedade_dto import PropriedadeCreateDTO, PropriedadePatchDTO, PropriedadeReadDTO, PropriedadeUpdateDTO
+from shared.database.entity_cache import EntityCache, SemCache, cache_padrao, chave, registrar_entidade
+from modules.propriedade.services.propriedade_mirror import PropriedadeMirror, propriedade_mirror
+from shared.exceptions import ConflitoDeVersao
+from shared.utils import change_events
+from sqlalchemy import literal
 from sqlalchemy.exc import IntegrityError
+from shared.utils.instrumentation import instrumentado
 
+AREAS_INVALIDAS = "A soma das áreas agricultável e de vegetação não pode exceder a área total da fazenda."
+
+def areas_validas(valores: dict):
+    """Regra das áreas como critério do UPDATE, usando o valor gravado
+    para os campos que o PATCH não trouxe."""
+    def area(campo):
+        return literal(valores[campo]) if campo in valores else getattr(Propriedade, campo)
+    return area("area_agricultavel") + area("area_vegetacao") <= area("area_total")
+
+registrar_entidade("propriedade", PropriedadeReadDTO, lambda p: [chave("produtor", p.produtor.id)] if p.produtor else [])
+
+@instrumentado
 class PropriedadeService:
-    def __init__(self, repository: PropriedadeRepository):
+    def __init__(self, repository: PropriedadeRepository, mirror: PropriedadeMirror | None = None, cache: EntityCache | SemCache | None = None):
         self.repository = repository
+        self.mirror = propriedade_mirror if mirror is None else mirror
+        self.cache = cache_padrao() if cache is None else cache
 
     async def create_propriedade(self, dto: PropriedadeCreateDTO) -> Propriedade:
         if dto.area_agricultavel + dto.area_vegetacao > dto.area_total:
-            raise ValueError("A soma das áreas agricultável e de vegetação não pode exceder a área total da fazenda.")
+            raise ValueError(AREAS_INVALIDAS)
         propriedade = Propriedade(
             nome=dto.nome,
             cidade=dto.cidade,
@@ -20,22 +40,33 @@ class PropriedadeService:
             produtor_id=dto.produtor_id
         )
         try:
-            return await self.repository.create(propriedade)
+            propriedade = await self.repository.create(propriedade)
         except IntegrityError:
             raise ValueError("Erro ao cadastrar propriedade.")
+        self.mirror.aplicar(propriedade)
+        # A lista de propriedades do produtor mudou
+        await self.cache.invalidar(chave("produtor", propriedade.produtor_id))
+        change_events.publish("propriedade", "criacao", propriedade.id)
+        return propriedade
 
     async def get_all_propriedades(self):
         return await self.repository.get_all()
 
+    async def count_propriedades(self, exato: bool = True):
+        return await self.repository.count(exato)
+
     async def get_propriedade_by_id(self, propriedade_id: int):
-        return await self.repository.get_by_id(propriedade_id)
+        return await self.cache.obter("propriedade", propriedade_id, lambda: self.repository.get_by_id(propriedade_id), self.repository.session)
+
+    async def get_propriedades_by_ids(self, ids: list[int]):
+        return await self.repository.get_by_ids(ids)
 
     async def update_propriedade(self, propriedade_id: int, dto: PropriedadeUpdateDTO):
         propriedade = await self.repository.get_by_id(propriedade_id)
         if not propriedade:
             raise ValueError("Propriedade não encontrada")
         if dto.area_agricultavel + dto.area_vegetacao > dto.area_total:
-            raise ValueError("A soma das áreas agricultável e de vegetação não pode exceder a área total da fazenda.")
+            raise ValueError(AREAS_INVALIDAS)
         propriedade.nome = dto.nome
         propriedade.cidade = dto.cidade
         propriedade.estado = dto.estado
@@ -43,10 +74,44 @@ class PropriedadeService:
         propriedade.area_agricultavel = dto.area_agricultavel
         propriedade.area_vegetacao = dto.area_vegetacao
         propriedade.produtor_id = dto.produtor_id
-        return await self.repository.update(propriedade)
+        try:
+            propriedade = await self.repository.update(propriedade)
+        except IntegrityError:
+            raise ValueError("Erro ao alterar propriedade.")
+        self.mirror.aplicar(propriedade)
+        # O produtor anterior cai junto, por embutir a propriedade
+        await self.cache.invalidar(chave("propriedade", propriedade_id), chave("produtor", dto.produtor_id))
+        change_events.publish("propriedade", "alteracao", propriedade.id)
+        return propriedade
+
+    async def patch_propriedade(self, propriedade_id: int, dto: PropriedadePatchDTO):
+        valores = dto.model_dump(exclude_none=True, exclude={"versao"})
+        try:
+            propriedade = await self.repository.patch(propriedade_id, dto.versao, valores, areas_validas(valores))
+        except IntegrityError:
+            raise ValueError("Erro ao alterar propriedade.")
+        if propriedade is None:
+            # Só no caminho de erro: descobre qual condição do UPDATE falhou
+            atual = await self.repository.get_by_id(propriedade_id)
+            if atual is None:
+                return None
+            if atual.versao != dto.versao:
+                raise ConflitoDeVersao()
+            raise ValueError(AREAS_INVALIDAS)
+        self.mirror.aplicar(propriedade)
+        # O produtor anterior cai por embutir a propriedade; o novo, só se mudou
+        chaves = [chave("propriedade", propriedade_id)]
+        if dto.produtor_id is not None:
+            chaves.append(chave("produtor", dto.produtor_id))
+        await self.cache.invalidar(*chaves)
+        change_events.publish("propriedade", "alteracao", propriedade.id)
+        return propriedade
 
     async def delete_propriedade(self, propriedade_id: int):
-        propriedade = await self.repository.get_by_id(propriedade_id)
-        if not propriedade:
+        exclusao = await self.repository.delete(propriedade_id)
+        if exclusao is None:
             raise ValueError("Propriedade não encontrada")
-        await self.repository.delete(propriedade) 
\ No newline at end of file
+        self.mirror.remover(propriedade_id)
+        await self.cache.invalidar(chave("propriedade", propriedade_id))
+        change_events.publish("propriedade", "exclusao", propriedade_id)
+        return exclusao
\ No newline at end of file
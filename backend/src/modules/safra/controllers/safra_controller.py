@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from shared.database.session import get_db
-from modules.safra.dtos.safra_dto import SafraCreateDTO, SafraUpdateDTO, SafraReadDTO
+from shared.database.memoria import usar_memoria
+from shared.database.session import get_db, get_read_db
+from shared.exceptions import ConflitoDeVersao
+from shared.database.counts import Contagem
+from shared.utils.count_headers import set_count_headers
+from shared.utils.multi_get import parse_ids
+from modules.safra.dtos.safra_dto import SafraCreateDTO, SafraPatchDTO, SafraUpdateDTO, SafraReadDTO
 from modules.safra.repositories.safra_repository import SafraRepository
+from modules.safra.repositories.safra_memoria_repository import SafraMemoriaRepository
 from modules.safra.services.safra_service import SafraService
+from shared.utils.tracing import RotaInstrumentada
 
-router = APIRouter(prefix="/safras", tags=["Safras"])
+router = APIRouter(prefix="/safras", tags=["Safras"], route_class=RotaInstrumentada)
+
+def get_repository(db: AsyncSession):
+    if usar_memoria():
+        return SafraMemoriaRepository()
+    return SafraRepository(db)
 
 @router.post("/", response_model=SafraReadDTO, status_code=status.HTTP_201_CREATED)
 async def create_safra(dto: SafraCreateDTO, db: AsyncSession = Depends(get_db)):
-    service = SafraService(SafraRepository(db))
+    service = SafraService(get_repository(db))
     try:
         safra = await service.create_safra(dto)
         return safra
@@ -17,30 +30,61 @@ async def create_safra(dto: SafraCreateDTO, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=list[SafraReadDTO])
-async def list_safras(db: AsyncSession = Depends(get_db)):
-    service = SafraService(SafraRepository(db))
-    return await service.get_all_safras()
+async def list_safras(response: Response, ano: Optional[int] = None, exato: Optional[bool] = None, ids: Optional[str] = None, db: AsyncSession = Depends(get_read_db)):
+    service = SafraService(get_repository(db))
+    if ids is not None:
+        # Multi-get: ?ids=1,2,3 numa consulta, na ordem pedida; ids inexistentes ficam de fora
+        try:
+            lista = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        entidades = await service.get_safras_by_ids(lista, ano)
+        if exato is not None:
+            # O total de um multi-get é o que foi encontrado, sempre exato
+            set_count_headers(response, Contagem(len(entidades)))
+        return entidades
+    if exato is not None:
+        set_count_headers(response, await service.count_safras(exato))
+    return await service.get_all_safras(ano)
 
 @router.get("/{safra_id}", response_model=SafraReadDTO)
-async def get_safra(safra_id: int, db: AsyncSession = Depends(get_db)):
-    service = SafraService(SafraRepository(db))
-    safra = await service.get_safra_by_id(safra_id)
+async def get_safra(safra_id: int, ano: Optional[int] = None, db: AsyncSession = Depends(get_read_db)):
+    service = SafraService(get_repository(db))
+    safra = await service.get_safra_by_id(safra_id, ano)
     if not safra:
         raise HTTPException(status_code=404, detail="Safra não encontrada")
     return safra
 
 @router.put("/{safra_id}", response_model=SafraReadDTO)
 async def update_safra(safra_id: int, dto: SafraUpdateDTO, db: AsyncSession = Depends(get_db)):
-    service = SafraService(SafraRepository(db))
+    service = SafraService(get_repository(db))
     try:
         return await service.update_safra(safra_id, dto)
+    except ConflitoDeVersao as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.patch("/{safra_id}", response_model=SafraReadDTO)
+async def patch_safra(safra_id: int, dto: SafraPatchDTO, db: AsyncSession = Depends(get_db)):
+    service = SafraService(get_repository(db))
+    try:
+        safra = await service.patch_safra(safra_id, dto)
+    except ConflitoDeVersao as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not safra:
+        raise HTTPException(status_code=404, detail="Safra não encontrada")
+    return safra
+
 @router.delete("/{safra_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_safra(safra_id: int, db: AsyncSession = Depends(get_db)):
-    service = SafraService(SafraRepository(db))
+async def delete_safra(safra_id: int, response: Response, db: AsyncSession = Depends(get_db)):
+    service = SafraService(get_repository(db))
     try:
-        await service.delete_safra(safra_id)
+        exclusao = await service.delete_safra(safra_id)
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+    if exclusao.purga is not None:
+        # A purga das dependentes segue em /jobs/{id}
+        response.headers["X-Purge-Job"] = str(exclusao.purga)
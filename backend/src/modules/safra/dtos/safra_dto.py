@@ -20,10 +20,16 @@ class SafraCreateDTO(SafraBaseDTO):
 class SafraUpdateDTO(SafraBaseDTO):
     pass
 
+class SafraPatchDTO(BaseModel):
+    ano: Optional[int] = None
+    propriedade_id: Optional[int] = None
+    versao: int
+
 class SafraReadDTO(BaseModel):
     id: int
     ano: int
     propriedade_id: int
+    versao: int
     culturas: Optional[List[CulturaReadDTO]] = None
 
     class Config:
@@ -1,11 +1,16 @@
 from sqlalchemy import Column, Integer, ForeignKey
 from sqlalchemy.orm import relationship
 from shared.database.base import Base
+from shared.database.exclusao import ExclusaoLogica
 
-class Safra(Base):
+class Safra(ExclusaoLogica, Base):
     __tablename__ = "safras"
-    id = Column(Integer, primary_key=True, index=True)
-    ano = Column(Integer, nullable=False)
+    # Particionada por ano; a chave de partição precisa fazer parte da PK
+    __table_args__ = {"postgresql_partition_by": "RANGE (ano)"}
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    ano = Column(Integer, primary_key=True, nullable=False)
     propriedade_id = Column(Integer, ForeignKey("propriedades.id"), nullable=False)
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
+    __mapper_args__ = {"version_id_col": versao}
     propriedade = relationship("Propriedade", back_populates="safras")
-    culturas = relationship("Cultura", back_populates="safra") 
\ No newline at end of file
+    culturas = relationship("Cultura", back_populates="safra")
@@ -0,0 +1,45 @@
+from typing import Optional
+from modules.safra.entities.safra import Safra
+from shared.database.memoria import MemoriaRepository, relacionar
+from shared.utils.instrumentation import instrumentado
+
+@instrumentado
+class SafraMemoriaRepository(MemoriaRepository):
+    tabela = "safras"
+
+    async def get_all(self, ano: Optional[int] = None) -> list[Safra]:
+        safras = self.linhas.todas() if ano is None else self.linhas.buscar("ano", ano)
+        return [self.carregar(safra) for safra in safras]
+
+    async def get_by_id(self, safra_id: int, ano: Optional[int] = None) -> Optional[Safra]:
+        safra = self.linhas.get(safra_id)
+        if safra is None or (ano is not None and safra.ano != ano):
+            return None
+        return self.carregar(safra)
+
+    def carregar(self, safra: Safra) -> Safra:
+        relacionar(safra, "culturas", self.banco["culturas"].buscar("safra_id", safra.id))
+        return safra
+
+    async def update(self, safra: Safra) -> Safra:
+        safra = await super().update(safra)
+        self.cascatear_ano(safra)
+        return safra
+
+    async def patch(self, safra_id: int, versao: int, valores: dict) -> Optional[Safra]:
+        safra = await super().patch(safra_id, versao, valores)
+        if safra is not None:
+            self.cascatear_ano(safra)
+        return safra
+
+    def cascatear_ano(self, safra: Safra):
+        # O ON UPDATE CASCADE da FK (safra_id, ano) das culturas
+        culturas = self.banco["culturas"]
+        for cultura in safra.culturas:
+            if cultura.ano != safra.ano:
+                cultura.ano = safra.ano
+                culturas.atualizar(cultura, versao=False)
+
+    async def get_by_ids(self, ids: list[int], ano: Optional[int] = None) -> list[Safra]:
+        safras = await super().get_by_ids(ids)
+        return safras if ano is None else [safra for safra in safras if safra.ano == ano]
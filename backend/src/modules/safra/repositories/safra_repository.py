@@ -1,31 +1,134 @@
+from sqlalchemy import inspect, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 from modules.safra.entities.safra import Safra
+from modules.cultura.entities.cultura import Cultura
+from shared.database.batch_loader import batch_loader, ids_em, na_ordem
+from shared.database.counts import Contagem, count_rows
+from shared.database.exclusao import Exclusao, travar_pais
+from shared.database.group_commit import group_commit, usar_group_commit
+from modules.jobs.services.purga import excluir
+from modules.changes.services.change_service import registrar_alteracao, registrar_alteracoes
+from shared.database.versioning import versioned_update
+from shared.exceptions import ConflitoDeVersao
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from typing import List, Optional
+from shared.utils.instrumentation import instrumentado
 
+@instrumentado
 class SafraRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
 
-    async def get_all(self) -> list[Safra]:
-        result = await self.session.execute(select(Safra))
-        return list(result.scalars().all())
+    async def get_all(self, ano: Optional[int] = None) -> list[Safra]:
+        # Com o ano o Postgres varre só a partição daquela safra
+        query = select(Safra)
+        if ano is not None:
+            query = query.where(Safra.ano == ano)
+        result = await self.session.execute(query)
+        return await self.com_culturas(list(result.scalars().all()))
 
-    async def get_by_id(self, safra_id: int) -> Optional[Safra]:
-        result = await self.session.execute(select(Safra).where(Safra.id == safra_id))
-        return result.scalars().first()
+    async def get_by_id(self, safra_id: int, ano: Optional[int] = None) -> Optional[Safra]:
+        # Sem o ano a busca pelo id consulta o índice de cada partição
+        query = select(Safra).where(Safra.id == safra_id)
+        if ano is not None:
+            query = query.where(Safra.ano == ano)
+        result = await self.session.execute(query)
+        safra = result.scalars().first()
+        if safra is not None:
+            await self.com_culturas([safra])
+        return safra
+
+    async def get_by_ids(self, ids: list[int], ano: Optional[int] = None) -> list[Safra]:
+        query = select(Safra).where(ids_em(self.session, Safra.id, ids))
+        if ano is not None:
+            query = query.where(Safra.ano == ano)
+        result = await self.session.execute(query)
+        return await self.com_culturas(na_ordem(ids, result.scalars().all()))
+
+    async def com_culturas(self, safras: list[Safra]) -> list[Safra]:
+        # As culturas de todas as safras numa consulta só
+        await batch_loader(self.session).relacionar(safras, Safra.culturas)
+        return safras
+
+    async def count(self, exato: bool = True) -> Contagem:
+        return await count_rows(self.session, Safra, exato)
 
     async def create(self, safra: Safra) -> Safra:
+        if usar_group_commit():
+            # Sai da sessão: vai no INSERT de várias linhas do group commit
+            return await group_commit(self.session.bind).inserir(safra)
+        await travar_pais(self.session, Safra, [safra])
         self.session.add(safra)
         await self.session.commit()
         await self.session.refresh(safra)
         return safra
 
+    async def acompanhar_ano(self, safra_id: int, ano: int) -> list[Cultura]:
+        """Registra as culturas que o ON UPDATE CASCADE levou para o novo ano.
+
+        O cascade acontece no banco, fora do flush: sem isso as culturas não
+        teriam entrada no changelog e um If-Match antigo continuaria valendo.
+        """
+        result = await self.session.execute(
+            update(Cultura)
+            .where(Cultura.safra_id == safra_id, Cultura.ano == ano)
+            .values(versao=Cultura.versao + 1)
+            .returning(Cultura)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        )
+        culturas = list(result.scalars())
+        await registrar_alteracoes(self.session, culturas, "alteracao")
+        return culturas
+
     async def update(self, safra: Safra) -> Safra:
-        await self.session.commit()
+        # Antes de qualquer consulta: o autoflush limparia o histórico
+        mudou_ano = inspect(safra).attrs.ano.history.has_changes()
+        if mudou_ano:
+            # O flush copiaria o ano novo para as culturas carregadas e o
+            # after_flush as registraria sem a versão nova; quem as registra
+            # é o acompanhar_ano
+            for cultura in inspect(safra).dict.get("culturas", ()):
+                self.session.expunge(cultura)
+        try:
+            await travar_pais(self.session, Safra, [safra])
+            await self.session.flush()
+            if mudou_ano:
+                await self.acompanhar_ano(safra.id, safra.ano)
+            await self.session.commit()
+        except StaleDataError:
+            await self.session.rollback()
+            raise ConflitoDeVersao()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
         await self.session.refresh(safra)
         return safra
 
-    async def delete(self, safra: Safra):
-        await self.session.delete(safra)
-        await self.session.commit() 
\ No newline at end of file
+    async def patch(self, safra_id: int, versao: int, valores: dict) -> Optional[Safra]:
+        try:
+            await travar_pais(self.session, Safra, [valores])
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+        ano_anterior = None
+        if "ano" in valores:
+            ano_anterior = (await self.session.execute(select(Safra.ano).where(Safra.id == safra_id))).scalar()
+        result = await self.session.execute(
+            versioned_update(Safra, safra_id, versao, valores)
+            .options(selectinload(Safra.culturas))
+        )
+        safra = result.scalars().first()
+        if safra is None:
+            await self.session.rollback()
+            return None
+        await registrar_alteracao(self.session, safra, "alteracao")
+        if ano_anterior is not None and ano_anterior != safra.ano:
+            await self.acompanhar_ano(safra.id, safra.ano)
+        await self.session.commit()
+        return safra
+
+    async def delete(self, safra_id: int) -> Optional[Exclusao]:
+        return await excluir(self.session, Safra, safra_id) 
\ No newline at end of file
@@ -1,11 +1,18 @@
 from modules.safra.repositories.safra_repository import SafraRepository
 from modules.safra.entities.safra import Safra
-from modules.safra.dtos.safra_dto import SafraCreateDTO, SafraUpdateDTO
+from modules.safra.dtos.safra_dto import SafraCreateDTO, SafraPatchDTO, SafraReadDTO, SafraUpdateDTO
+from shared.database.entity_cache import EntityCache, SemCache, cache_padrao, chave, registrar_entidade
+from shared.exceptions import ConflitoDeVersao
 from sqlalchemy.exc import IntegrityError
+from shared.utils.instrumentation import instrumentado
 
+registrar_entidade("safra", SafraReadDTO, lambda safra: [chave("cultura", c.id) for c in safra.culturas or ()])
+
+@instrumentado
 class SafraService:
-    def __init__(self, repository: SafraRepository):
+    def __init__(self, repository: SafraRepository, cache: EntityCache | SemCache | None = None):
         self.repository = repository
+        self.cache = cache_padrao() if cache is None else cache
 
     async def create_safra(self, dto: SafraCreateDTO) -> Safra:
         safra = Safra(ano=dto.ano, propriedade_id=dto.propriedade_id)
@@ -14,22 +21,54 @@ class SafraService:
         except IntegrityError:
             raise ValueError("Erro ao cadastrar safra.")
 
-    async def get_all_safras(self):
-        return await self.repository.get_all()
+    async def get_all_safras(self, ano: int | None = None):
+        return await self.repository.get_all(ano)
+
+    async def count_safras(self, exato: bool = True):
+        return await self.repository.count(exato)
+
+    async def get_safra_by_id(self, safra_id: int, ano: int | None = None):
+        safra = await self.cache.obter("safra", safra_id, lambda: self.repository.get_by_id(safra_id, ano), self.repository.session)
+        # O cache guarda pelo id; o ano só restringe a busca à partição
+        if safra is not None and ano is not None and safra.ano != ano:
+            return None
+        return safra
 
-    async def get_safra_by_id(self, safra_id: int):
-        return await self.repository.get_by_id(safra_id)
+    async def get_safras_by_ids(self, ids: list[int], ano: int | None = None):
+        return await self.repository.get_by_ids(ids, ano)
 
     async def update_safra(self, safra_id: int, dto: SafraUpdateDTO):
         safra = await self.repository.get_by_id(safra_id)
         if not safra:
             raise ValueError("Safra não encontrada")
+        # Mudar o ano leva as culturas junto, e elas também saem do cache
+        culturas = [chave("cultura", c.id) for c in safra.culturas or ()] if safra.ano != dto.ano else []
         safra.ano = dto.ano
         safra.propriedade_id = dto.propriedade_id
-        return await self.repository.update(safra)
+        try:
+            safra = await self.repository.update(safra)
+        except IntegrityError:
+            raise ValueError("Erro ao alterar safra.")
+        await self.cache.invalidar(chave("safra", safra_id), *culturas)
+        return safra
+
+    async def patch_safra(self, safra_id: int, dto: SafraPatchDTO):
+        valores = dto.model_dump(exclude_none=True, exclude={"versao"})
+        try:
+            safra = await self.repository.patch(safra_id, dto.versao, valores)
+        except IntegrityError:
+            raise ValueError("Erro ao alterar safra.")
+        if safra is None and await self.repository.get_by_id(safra_id):
+            # Só no caminho de erro: a linha existe, então a versão mudou
+            raise ConflitoDeVersao()
+        if safra is not None:
+            culturas = [chave("cultura", c.id) for c in safra.culturas or ()] if "ano" in valores else []
+            await self.cache.invalidar(chave("safra", safra_id), *culturas)
+        return safra
 
     async def delete_safra(self, safra_id: int):
-        safra = await self.repository.get_by_id(safra_id)
-        if not safra:
+        exclusao = await self.repository.delete(safra_id)
+        if exclusao is None:
             raise ValueError("Safra não encontrada")
-        await self.repository.delete(safra) 
\ No newline at end of file
+        await self.cache.invalidar(chave("safra", safra_id))
+        return exclusao
\ No newline at end of file
@@ -0,0 +1,102 @@
+import asyncio
+from collections import defaultdict
+from sqlalchemy import any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import lazyload
+from sqlalchemy.orm.attributes import set_committed_value
+
+def ids_em(session: AsyncSession, coluna, ids):
+    """``coluna = ANY(:ids)`` no Postgres: um parâmetro só, e o mesmo
+    statement preparado para qualquer quantidade de ids; IN nos outros."""
+    ids = list(ids)
+    if session.bind.dialect.name == "postgresql":
+        return coluna == any_(bindparam("ids", ids, type_=ARRAY(coluna.type), unique=True))
+    return coluna.in_(ids)
+
+def na_ordem(ids, entidades) -> list:
+    """As entidades na ordem dos ids pedidos, sem repetir e sem as ausentes."""
+    por_id = {entidade.id: entidade for entidade in entidades}
+    return [por_id[_id] for _id in dict.fromkeys(ids) if _id in por_id]
+
+class BatchLoader:
+    """Carregador por requisição, no estilo DataLoader.
+
+    ``load`` não consulta na hora: os ids pedidos por todas as corrotinas
+    na mesma volta do event loop são buscados juntos, num único
+    ``WHERE id = ANY(:ids)`` por entidade. O resultado fica em cache até o
+    fim da requisição, então N buscas custam uma ida ao banco.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._cache = {}
+        self._pendentes = defaultdict(dict)
+        self._despacho = None
+
+    async def load(self, model, _id):
+        chave = (model, _id)
+        if chave in self._cache:
+            return self._cache[chave]
+        futuro = self._pendentes[model].get(_id)
+        if futuro is None:
+            futuro = self._pendentes[model][_id] = asyncio.get_running_loop().create_future()
+            if self._despacho is None:
+                # Roda depois das corrotinas já prontas, que entram no mesmo lote
+                self._despacho = asyncio.ensure_future(self._despachar())
+        return await futuro
+
+    async def load_many(self, model, ids) -> list:
+        """Uma entidade (ou None) por id, na ordem pedida."""
+        return list(await asyncio.gather(*(self.load(model, _id) for _id in ids)))
+
+    async def _despachar(self):
+        lotes, self._pendentes, self._despacho = self._pendentes, defaultdict(dict), None
+        for model, futuros in lotes.items():
+            try:
+                # Só as linhas: eager loads padrão (o selectin das propriedades
+                # do produtor) ficam para quem pedir, via ``relacionar``
+                query = select(model).options(lazyload("*")).where(ids_em(self.session, model.id, futuros))
+                result = await self.session.execute(query)
+                encontrados = {entidade.id: entidade for entidade in result.scalars()}
+            except BaseException as exc:
+                for futuro in futuros.values():
+                    if not futuro.done():
+                        futuro.set_exception(exc)
+                continue
+            for _id, futuro in futuros.items():
+                self._cache[(model, _id)] = encontrados.get(_id)
+                if not futuro.done():
+                    futuro.set_result(encontrados.get(_id))
+
+    async def relacionar(self, entidades: list, relacionamento):
+        """Carrega ``relacionamento`` (ex.: ``Propriedade.produtor``) de todas
+        as entidades de uma vez, no lugar de um lazy load por linha."""
+        if not entidades:
+            return
+        prop = relacionamento.property
+        pares = prop.local_remote_pairs
+        if not prop.uselist:
+            # Muitos-para-um pela chave estrangeira: passa pelo lote e pelo cache
+            [(local, _)] = pares
+            alvos = await self.load_many(prop.mapper.class_, [getattr(entidade, local.key) for entidade in entidades])
+            for entidade, alvo in zip(entidades, alvos):
+                set_committed_value(entidade, prop.key, alvo)
+            return
+        # Um-para-muitos: os filhos de todas as entidades numa consulta, agrupados
+        # pela chave inteira (as culturas seguem a safra por id e ano). Filtrar
+        # cada coluna da chave deixa o planner podar as partições pelo ano
+        filtros = [ids_em(self.session, remoto, {getattr(entidade, local.key) for entidade in entidades}) for local, remoto in pares]
+        result = await self.session.execute(select(prop.mapper.class_).where(*filtros))
+        grupos = defaultdict(list)
+        for filho in result.scalars():
+            grupos[tuple(getattr(filho, remoto.key) for _, remoto in pares)].append(filho)
+        for entidade in entidades:
+            set_committed_value(entidade, prop.key, grupos[tuple(getattr(entidade, local.key) for local, _ in pares)])
+
+def batch_loader(session: AsyncSession) -> BatchLoader:
+    """O carregador da sessão; como a sessão, dura uma requisição."""
+    loader = session.info.get("batch_loader")
+    if loader is None:
+        loader = session.info["batch_loader"] = BatchLoader(session)
+    return loader
@@ -0,0 +1,63 @@
+from typing import NamedTuple
+from sqlalchemy import and_, cast, column, func, select, table
+from sqlalchemy.dialects.postgresql import OID
+from sqlalchemy.ext.asyncio import AsyncSession
+from shared.config.settings import settings
+
+class Contagem(NamedTuple):
+    total: int
+    estimado: bool = False
+    # Linhas modificadas desde o último ANALYZE: idade das estatísticas, não limite do erro
+    modificadas: int = 0
+
+pg_class = table("pg_class", column("oid"), column("relkind"), column("reltuples"))
+pg_inherits = table("pg_inherits", column("inhrelid"), column("inhparent"))
+pg_stat_user_tables = table("pg_stat_user_tables", column("relid"), column("n_mod_since_analyze"))
+
+def _relacoes(tabela: str):
+    """A tabela e, se for particionada, todas as partições abaixo dela."""
+    raiz = select(cast(func.to_regclass(tabela), OID).label("oid")).cte("relacoes", recursive=True)
+    return raiz.union_all(select(pg_inherits.c.inhrelid).where(pg_inherits.c.inhparent == raiz.c.oid))
+
+async def estimate_rows(session: AsyncSession, tabela: str) -> Contagem | None:
+    """Estimativa do planner (reltuples) e as linhas modificadas desde o
+    último ANALYZE.
+
+    reltuples vem de uma amostra do ANALYZE (ou VACUUM), então nem ele é
+    exato e não há limite do erro a derivar; as modificações só dizem quão
+    velha a estimativa está, e acima de uma fração do total contamos exato. Tabela particionada não tem reltuples próprio: somamos o das
+    partições, achadas pelo pg_inherits. As estatísticas de atividade são
+    locais de cada servidor, por isso a consulta vai sempre para o primário.
+    """
+    relacoes = _relacoes(tabela)
+    folha = pg_class.c.relkind != "p"
+    result = await session.execute(
+        select(
+            func.sum(pg_class.c.reltuples).filter(folha),
+            func.sum(pg_stat_user_tables.c.n_mod_since_analyze).filter(folha),
+            # Partição nunca analisada tem reltuples -1 e estraga a soma
+            func.bool_or(and_(folha, pg_class.c.reltuples < 0)),
+        )
+        .select_from(
+            relacoes.join(pg_class, pg_class.c.oid == relacoes.c.oid)
+            .outerjoin(pg_stat_user_tables, pg_stat_user_tables.c.relid == pg_class.c.oid)
+        ),
+        bind_arguments={"primary": True},
+    )
+    row = result.first()
+    if row is None or row[0] is None or row[0] < 0 or row[2]:
+        return None
+    estimativa, modificadas = int(row[0]), int(row[1] or 0)
+    if estimativa < settings.count_exact_threshold:
+        return None
+    if modificadas > estimativa * settings.count_estimate_max_modified:
+        return None
+    return Contagem(estimativa, True, modificadas)
+
+async def count_rows(session: AsyncSession, model, exato: bool = True) -> Contagem:
+    if not exato and session.bind.dialect.name == "postgresql":
+        estimativa = await estimate_rows(session, model.__tablename__)
+        if estimativa is not None:
+            return estimativa
+    result = await session.execute(select(func.count()).select_from(model))
+    return Contagem(result.scalar_one())
@@ -0,0 +1,204 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple
+from shared.config.settings import settings
+from shared.database.session import no_primario
+from shared.utils.metrics import registrar_consulta_ao_cache
+
+try:
+    from redis import asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+class EntidadeEmCache(NamedTuple):
+    dto: type
+    # Chaves das outras entidades embutidas no DTO: escrever nelas invalida esta
+    dependencias: Callable[[object], list[str]]
+
+_entidades: dict[str, EntidadeEmCache] = {}
+
+def registrar_entidade(nome: str, dto: type, dependencias: Callable[[object], list[str]] = lambda dto: []):
+    _entidades[nome] = EntidadeEmCache(dto, dependencias)
+
+def chave(entidade: str, entidade_id: int) -> str:
+    return f"{entidade}:{entidade_id}"
+
+# Resultado de quem carregava e foi cancelado: quem esperava carrega de novo
+_CANCELADA = object()
+
+class _Entrada(NamedTuple):
+    valor: object
+    expira: float
+    dependencias: list[str]
+
+class CacheCompartilhado:
+    """Segundo nível no Redis, dividido entre os processos da API.
+
+    Cada entrada expira em ``ttl`` segundos; para cada dependência há um
+    SET com as chaves que a embutem, que o ``invalidar`` apaga junto.
+    """
+
+    PREFIXO = "entidades:"
+
+    def __init__(self, url: str, ttl: float):
+        if redis_asyncio is None:
+            raise RuntimeError("redis não está instalado")
+        self.cliente = redis_asyncio.from_url(url)
+        self.ttl = int(ttl)
+
+    async def get(self, chave: str) -> bytes | None:
+        return await self.cliente.get(self.PREFIXO + chave)
+
+    async def set(self, chave: str, valor: str, dependencias: list[str]):
+        async with self.cliente.pipeline(transaction=False) as pipe:
+            pipe.set(self.PREFIXO + chave, valor, ex=self.ttl)
+            for dependencia in dependencias:
+                pipe.sadd(f"{self.PREFIXO}dep:{dependencia}", chave)
+                pipe.expire(f"{self.PREFIXO}dep:{dependencia}", self.ttl)
+            await pipe.execute()
+
+    async def invalidar(self, chaves: list[str]):
+        apagar = set(chaves)
+        for chave in chaves:
+            apagar.update(membro.decode() for membro in await self.cliente.smembers(f"{self.PREFIXO}dep:{chave}"))
+        await self.cliente.delete(*(self.PREFIXO + c for c in apagar), *(f"{self.PREFIXO}dep:{c}" for c in chaves))
+
+class EntityCache:
+    """Cache read-through dos ``get_by_id``, guardando o DTO de leitura.
+
+    LRU no processo, com TTL curto, na frente de um ``CacheCompartilhado``
+    opcional. Buscas concorrentes pela mesma chave fazem uma consulta só
+    (as outras esperam o resultado da primeira). Os services invalidam as
+    chaves que escrevem, e a invalidação leva junto as entradas que as
+    embutem (o produtor com a lista de propriedades, a safra com as
+    culturas). Uma carga que cruzou com uma invalidação devolve o que leu,
+    mas não guarda: o valor pode ser de antes da escrita. Pelo mesmo
+    motivo o miss lê no primário: uma réplica atrasada devolveria a linha
+    de antes de uma escrita já invalidada, e ela ficaria o TTL inteiro.
+    """
+
+    def __init__(self, capacidade: int, ttl: float, compartilhado: CacheCompartilhado | None = None):
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.compartilhado = compartilhado
+        self._entradas = OrderedDict()
+        # chave de uma dependência -> chaves das entradas que a embutem
+        self._dependentes = {}
+        self._carregando = {}
+        self._geracao = 0
+
+    async def obter(self, entidade: str, entidade_id: int, carregar: Callable[[], Awaitable], session=None):
+        """O DTO da entidade, ou None; ``carregar`` só roda num miss, no
+        primário de ``session``."""
+        c = chave(entidade, entidade_id)
+        entrada = self._entradas.get(c)
+        if entrada is not None and entrada.expira > time.monotonic():
+            self._entradas.move_to_end(c)
+            registrar_consulta_ao_cache(f"entidades_{entidade}", True)
+            return entrada.valor
+        carregando = self._carregando.get(c)
+        if carregando is not None:
+            # Stampede: quem chega durante a carga espera a mesma consulta.
+            # None não é repassado: a carga pode ter filtrado (o ano da safra)
+            valor = await asyncio.shield(carregando)
+            if valor is _CANCELADA:
+                # Cliente desconectado ou deadline de quem carregava, não deste
+                return await self.obter(entidade, entidade_id, carregar, session)
+            if valor is not None:
+                registrar_consulta_ao_cache(f"entidades_{entidade}", True)
+                return valor
+            registrar_consulta_ao_cache(f"entidades_{entidade}", False)
+            return await carregar()
+        registrar_consulta_ao_cache(f"entidades_{entidade}", False)
+        futuro = self._carregando[c] = asyncio.get_running_loop().create_future()
+        try:
+            valor = await self._carregar(entidade, c, carregar, session)
+        except asyncio.CancelledError:
+            futuro.set_result(_CANCELADA)
+            raise
+        except BaseException as exc:
+            futuro.set_exception(exc)
+            # Sem ninguém esperando, o erro já chega a quem carregou
+            futuro.exception()
+            raise
+        finally:
+            self._carregando.pop(c, None)
+        futuro.set_result(valor)
+        return valor
+
+    async def _carregar(self, entidade: str, c: str, carregar, session):
+        config = _entidades[entidade]
+        geracao = self._geracao
+        if self.compartilhado is not None:
+            bruto = await self.compartilhado.get(c)
+            registrar_consulta_ao_cache("entidades_compartilhado", bruto is not None)
+            if bruto is not None:
+                valor = config.dto.model_validate_json(bruto)
+                if geracao == self._geracao:
+                    self._guardar(c, valor, config.dependencias(valor))
+                return valor
+        with no_primario(session):
+            lido = await carregar()
+        if lido is None:
+            return None
+        valor = config.dto.model_validate(lido)
+        if geracao == self._geracao:
+            dependencias = config.dependencias(valor)
+            self._guardar(c, valor, dependencias)
+            if self.compartilhado is not None:
+                await self.compartilhado.set(c, valor.model_dump_json(), dependencias)
+        return valor
+
+    def _guardar(self, c: str, valor, dependencias: list[str]):
+        self._remover(c)
+        self._entradas[c] = _Entrada(valor, time.monotonic() + self.ttl, dependencias)
+        for dependencia in dependencias:
+            self._dependentes.setdefault(dependencia, set()).add(c)
+        while len(self._entradas) > self.capacidade:
+            self._remover(next(iter(self._entradas)))
+
+    def _remover(self, c: str):
+        entrada = self._entradas.pop(c, None)
+        if entrada is None:
+            return
+        for dependencia in entrada.dependencias:
+            dependentes = self._dependentes.get(dependencia)
+            if dependentes is not None:
+                dependentes.discard(c)
+                if not dependentes:
+                    del self._dependentes[dependencia]
+
+    async def invalidar(self, *chaves: str):
+        """Chamado depois do commit de cada escrita nas entidades."""
+        self._geracao += 1
+        for c in chaves:
+            self._remover(c)
+            for dependente in self._dependentes.pop(c, ()):
+                self._remover(dependente)
+        if self.compartilhado is not None and chaves:
+            await self.compartilhado.invalidar(list(chaves))
+
+    def clear(self):
+        self._entradas.clear()
+        self._dependentes.clear()
+        self._geracao += 1
+
+class SemCache:
+    """No lugar do ``EntityCache`` quando o cache está desligado."""
+
+    async def obter(self, entidade: str, entidade_id: int, carregar: Callable[[], Awaitable], session=None):
+        return await carregar()
+
+    async def invalidar(self, *chaves: str):
+        pass
+
+entity_cache = EntityCache(
+    settings.entity_cache_size,
+    settings.entity_cache_local_ttl_seconds,
+    CacheCompartilhado(settings.entity_cache_url, settings.entity_cache_ttl_seconds) if settings.entity_cache_url else None,
+)
+sem_cache = SemCache()
+
+def cache_padrao() -> EntityCache | SemCache:
+    return entity_cache if settings.entity_cache_enabled else sem_cache
@@ -0,0 +1,97 @@
+from collections.abc import Mapping
+from typing import NamedTuple
+from sqlalchemy import Column, DateTime, event, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, with_loader_criteria
+
+# Execution option para quem precisa enxergar as linhas já excluídas (o purgador)
+INCLUIR_EXCLUIDAS = "incluir_excluidas"
+
+class Exclusao(NamedTuple):
+    id: int
+    # Job que apaga as dependentes; None quando não há o que purgar depois
+    purga: int | None = None
+
+class ExclusaoLogica:
+    """Mixin das entidades com exclusão lógica.
+
+    ``excluido_em`` preenchido esconde a linha de toda leitura feita pelo
+    ORM (consultas, contagens, relacionamentos e UPDATEs condicionais) até
+    o purgador apagá-la de vez.
+    """
+
+    excluido_em = Column(DateTime, nullable=True)
+
+@event.listens_for(Session, "do_orm_execute")
+def _esconder_excluidas(execute_state):
+    if not (execute_state.is_select or execute_state.is_update):
+        return
+    # Cargas de coluna e de relacionamento herdam o critério da consulta que as originou
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    if execute_state.execution_options.get(INCLUIR_EXCLUIDAS):
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(ExclusaoLogica, lambda cls: cls.excluido_em.is_(None), include_aliases=True)
+    )
+
+def marcar_excluida(model, entidade_id: int):
+    """UPDATE que exclui logicamente a linha: O(1), sem tocar nas dependentes.
+
+    Incrementa a versão, então um PATCH concorrente com a versão antiga
+    falha em vez de ressuscitar a linha.
+    """
+    return (
+        update(model)
+        .where(model.id == entidade_id)
+        .values(excluido_em=func.now(), versao=model.versao + 1)
+    )
+
+class PaiNaoEncontrado(IntegrityError):
+    """O pai não existe ou foi excluído logicamente: tratado como a
+    violação de FK que o banco daria se a linha já tivesse sido purgada."""
+
+    def __init__(self, tabela: str, ids: list[int]):
+        super().__init__(None, None, LookupError(f"{tabela}: {ids} não encontrado(s)"))
+
+def pais(model) -> list[tuple[str, type]]:
+    """(coluna, model) das FKs do model para entidades com exclusão lógica."""
+    models = {mapper.local_table: mapper.class_ for mapper in model.registry.mappers}
+    resultado = []
+    for fk in model.__table__.foreign_key_constraints:
+        pai = models.get(fk.referred_table)
+        if pai is None or not issubclass(pai, ExclusaoLogica):
+            continue
+        # Na FK composta (safra_id, ano) basta o id
+        coluna = next(elemento.parent.key for elemento in fk.elements if elemento.column.key == "id")
+        resultado.append((coluna, pai))
+    return resultado
+
+def _valor(linha, coluna: str):
+    return linha.get(coluna) if isinstance(linha, Mapping) else getattr(linha, coluna, None)
+
+async def travar_pais(conexao, model, linhas: list):
+    """Confere que os pais (e os pais deles) referidos nas linhas estão
+    vivos, com SELECT ... FOR SHARE até o fim da transação.
+
+    A FK não basta: a linha excluída logicamente continua lá até a purga.
+    O FOR SHARE conflita com o UPDATE do ``marcar_excluida``: uma exclusão
+    concorrente espera este commit, e a purga dela já enxerga a linha nova;
+    ou esta escrita espera a exclusão, e aí não acha o pai.
+    ``conexao`` é uma sessão ou uma conexão, dentro da transação da escrita.
+    """
+    for coluna, pai in pais(model):
+        ids = {valor for valor in (_valor(linha, coluna) for linha in linhas) if valor is not None}
+        if not ids:
+            continue
+        avos = [pai.__table__.c[coluna_do_pai] for coluna_do_pai, _ in pais(pai)]
+        query = (
+            select(pai.__table__.c.id, *avos)
+            .where(pai.__table__.c.id.in_(ids), pai.__table__.c.excluido_em.is_(None))
+            .with_for_update(read=True)
+        )
+        vivos = (await conexao.execute(query)).mappings().all()
+        faltando = ids - {vivo["id"] for vivo in vivos}
+        if faltando:
+            raise PaiNaoEncontrado(pai.__tablename__, sorted(faltando))
+        await travar_pais(conexao, pai, vivos)
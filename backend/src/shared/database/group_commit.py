@@ -0,0 +1,160 @@
+import asyncio
+from collections import defaultdict
+from typing import NamedTuple
+from sqlalchemy import insert, inspect
+from sqlalchemy.exc import DBAPIError, OperationalError, StatementError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from modules.changes.services.change_service import gravar_alteracoes, linha_de_alteracao
+from shared.database.exclusao import travar_pais
+from shared.config.settings import settings
+from shared.exceptions import DeadlineExceeded
+from shared.utils.deadline import current_deadline, remaining_ms
+from shared.utils.metrics import Histograma
+
+group_commit_lote = Histograma(
+    "group_commit_batch_size", "Linhas por INSERT do group commit, por tabela", ("tabela",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+
+class _Pendente(NamedTuple):
+    entidade: object
+    futuro: asyncio.Future
+    # Deadline da requisição que pediu o insert (DeadlineMiddleware)
+    deadline: float | None
+
+class GroupCommit:
+    """Junta os inserts concorrentes de uma tabela num INSERT de várias
+    linhas, numa transação e num commit só.
+
+    O primeiro insert abre uma janela de ``atraso_ms``; o que chegar nela
+    vai junto, e uma janela que enche ``tamanho_lote`` é gravada na hora.
+    Cada chamador recebe a sua entidade com o id ou o seu próprio erro:
+    se o lote falha por uma linha ruim (FK, unique, valor fora do tipo),
+    as linhas são regravadas uma a uma, cada uma na sua transação.
+
+    A transação do lote não passa pelo ``after_begin`` da RoutingSession;
+    o statement_timeout dela é o menor tempo restante entre as requisições
+    do lote, e a que já estourou o seu falha sozinha antes do INSERT.
+    """
+
+    def __init__(self, engine: AsyncEngine, atraso_ms: float, tamanho_lote: int):
+        self.engine = engine
+        self.atraso = atraso_ms / 1000
+        self.tamanho_lote = tamanho_lote
+        self._pendentes = defaultdict(list)
+        self._janelas = {}
+        # Referências fortes: o event loop só guarda referências fracas às tasks
+        self._tarefas = set()
+
+    async def inserir(self, entidade):
+        """Grava a entidade (transiente) e a devolve com id e defaults."""
+        model = type(entidade)
+        futuro = asyncio.get_running_loop().create_future()
+        fila = self._pendentes[model]
+        fila.append(_Pendente(entidade, futuro, current_deadline()))
+        if len(fila) >= self.tamanho_lote:
+            janela = self._janelas.pop(model, None)
+            if janela is not None:
+                janela.cancel()
+            self._disparar(self._gravar(model, self._pendentes.pop(model)))
+        elif model not in self._janelas:
+            self._janelas[model] = self._disparar(self._esperar(model))
+        return await futuro
+
+    def _disparar(self, corrotina) -> asyncio.Task:
+        tarefa = asyncio.ensure_future(corrotina)
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+        return tarefa
+
+    async def _esperar(self, model):
+        await asyncio.sleep(self.atraso)
+        self._janelas.pop(model, None)
+        lote = self._pendentes.pop(model, [])
+        if lote:
+            await self._gravar(model, lote)
+
+    async def _gravar(self, model, lote: list):
+        vivos, prazos = [], []
+        for item in lote:
+            restante = remaining_ms(item.deadline)
+            if restante is not None and restante <= 0:
+                # Estourou o deadline esperando a janela: falha sozinho
+                _falhar([item], DeadlineExceeded())
+                continue
+            vivos.append(item)
+            if restante is not None:
+                prazos.append(restante)
+        lote = vivos
+        if not lote:
+            return
+        try:
+            linhas = await self._inserir(model, [item.entidade for item in lote], min(prazos, default=None))
+        except StatementError as exc:
+            if len(lote) == 1 or not _culpa_da_linha(exc):
+                _falhar(lote, exc)
+                return
+            # Uma linha ruim derruba o lote inteiro; sozinhas, só ela falha
+            for item in lote:
+                await self._gravar(model, [item])
+            return
+        except BaseException as exc:
+            # Banco fora, cancelamento no shutdown: ninguém fica esperando
+            _falhar(lote, exc)
+            if not isinstance(exc, Exception):
+                raise
+            return
+        for item, linha in zip(lote, linhas):
+            for chave, valor in linha.items():
+                setattr(item.entidade, chave, valor)
+            if not item.futuro.done():
+                item.futuro.set_result(item.entidade)
+
+    async def _inserir(self, model, entidades: list, statement_timeout: int | None = None) -> list[dict]:
+        tabela = model.__table__
+        # Só as colunas que o service preencheu, iguais em todas as linhas;
+        # id e defaults vêm do banco
+        colunas = [
+            atributo.key for atributo in inspect(model).column_attrs
+            if any(getattr(entidade, atributo.key) is not None for entidade in entidades)
+        ]
+        valores = [{coluna: getattr(entidade, coluna) for coluna in colunas} for entidade in entidades]
+        query = insert(model).returning(*tabela.columns, sort_by_parameter_order=True)
+        async with self.engine.begin() as conn:
+            if statement_timeout is not None and conn.dialect.name == "postgresql":
+                await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {statement_timeout}")
+            # Pai excluído é IntegrityError: o lote cai no regravar uma a uma
+            await travar_pais(conn, model, valores)
+            result = await conn.execute(query, valores)
+            linhas = [dict(linha) for linha in result.mappings()]
+            criadas = [model(**linha) for linha in linhas]
+            # O changelog vai na mesma transação, como no after_flush do ORM
+            await conn.run_sync(gravar_alteracoes, [linha_de_alteracao(criada, "criacao") for criada in criadas])
+        group_commit_lote.observar(len(entidades), tabela.name)
+        return linhas
+
+def _culpa_da_linha(exc: StatementError) -> bool:
+    """Erro que pode ser de uma linha só (FK, unique, pai excluído, int
+    fora do int4, valor que o driver recusa). Conexão perdida, timeout e
+    cancelamento (OperationalError) derrubariam cada linha de novo."""
+    if isinstance(exc, DBAPIError) and exc.connection_invalidated:
+        return False
+    return not isinstance(exc, OperationalError)
+
+def _falhar(lote: list, exc: BaseException):
+    for item in lote:
+        if not item.futuro.done():
+            item.futuro.set_exception(exc)
+
+_escritores = {}
+
+def group_commit(engine: AsyncEngine) -> GroupCommit:
+    """O escritor do engine, criado na primeira escrita com a configuração
+    do momento."""
+    escritor = _escritores.get(engine)
+    if escritor is None:
+        escritor = _escritores[engine] = GroupCommit(engine, settings.group_commit_max_delay_ms, settings.group_commit_max_batch)
+    return escritor
+
+def usar_group_commit() -> bool:
+    return settings.group_commit_enabled
@@ -0,0 +1,21 @@
+import asyncio
+from shared.database.base import Base
+from shared.database.session import engine
+from shared.database.migrate import migrate
+from modules.produtor.entities.produtor import Produtor  # noqa: F401
+from modules.propriedade.entities.propriedade import Propriedade  # noqa: F401
+from modules.safra.entities.safra import Safra  # noqa: F401
+from modules.cultura.entities.cultura import Cultura  # noqa: F401
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura  # noqa: F401
+from modules.jobs.entities.job import Job  # noqa: F401
+from modules.changes.entities.alteracao import Alteracao  # noqa: F401
+
+
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await migrate(engine)
+
+
+if __name__ == "__main__":
+    asyncio.run(init_db())
@@ -0,0 +1,244 @@
+from collections import defaultdict
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, ColumnElement, Grouping
+from shared.config.settings import settings
+from shared.database.counts import Contagem
+from shared.database.exclusao import Exclusao
+
+def violacao(tabela: str, restricao: str) -> IntegrityError:
+    """O mesmo erro que o banco levantaria, para os services tratarem igual."""
+    return IntegrityError(f"-- {tabela}", None, Exception(restricao))
+
+def avaliar(criterio, entidade):
+    """Avalia em Python um critério extra de patch (colunas, literais,
+    aritmética e comparações), como o ``areas_validas`` das propriedades."""
+    if isinstance(criterio, Grouping):
+        return avaliar(criterio.element, entidade)
+    if isinstance(criterio, BindParameter):
+        return criterio.effective_value
+    if isinstance(criterio, BinaryExpression):
+        # Os operadores do SQLAlchemy são os próprios operator.add, operator.le...
+        return criterio.operator(avaliar(criterio.left, entidade), avaliar(criterio.right, entidade))
+    if isinstance(criterio, ColumnElement) and getattr(criterio, "table", None) is not None:
+        return getattr(entidade, criterio.key)
+    raise TypeError(f"Critério não suportado em memória: {criterio}")
+
+def valores_gravados(entidade) -> dict:
+    """Colunas (e o composite do documento) da linha, para desfazer uma
+    escrita que falhou."""
+    mapper = inspect(type(entidade))
+    return {atributo.key: getattr(entidade, atributo.key) for atributo in (*mapper.column_attrs, *mapper.composites)}
+
+class Tabela:
+    """Linhas de uma entidade em dicionários.
+
+    Índice hash pelo id, índices únicos por tupla de colunas e índices
+    secundários (valor -> ids) nas chaves estrangeiras. Os valores indexados
+    de cada linha ficam guardados para que um ``atualizar`` depois de o
+    service alterar a entidade saiba de onde tirá-la, e os valores gravados
+    para que um ``atualizar`` que falha a devolva como estava, como o
+    rollback do banco.
+    """
+
+    def __init__(self, nome: str, indices: tuple = (), unicos: dict | None = None, referencias: dict | None = None):
+        self.nome = nome
+        self.linhas = {}
+        self.proximo_id = 1
+        self.indices = {coluna: defaultdict(set) for coluna in indices}
+        # nome da restrição -> colunas; cada uma com seu dicionário chave -> id
+        self.unicos = unicos or {}
+        self._unicos = {restricao: {} for restricao in self.unicos}
+        # coluna -> tabela referenciada, conferida em toda escrita
+        self.referencias = referencias or {}
+        self._indexados = {}
+        self._gravadas = {}
+        self.banco = None
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def get(self, _id):
+        return self.linhas.get(_id)
+
+    def todas(self) -> list:
+        return list(self.linhas.values())
+
+    def buscar(self, coluna: str, valor) -> list:
+        ids = self.indices[coluna].get(valor, ())
+        return [self.linhas[_id] for _id in sorted(ids)]
+
+    def buscar_unico(self, restricao: str, chave: tuple):
+        _id = self._unicos[restricao].get(chave)
+        return None if _id is None else self.linhas[_id]
+
+    def _conferir(self, entidade, _id):
+        for coluna, referida in self.referencias.items():
+            if getattr(entidade, coluna) not in self.banco.tabelas[referida].linhas:
+                raise violacao(self.nome, f"fk_{self.nome}_{coluna}")
+        for restricao, colunas in self.unicos.items():
+            dono = self._unicos[restricao].get(tuple(getattr(entidade, coluna) for coluna in colunas))
+            if dono is not None and dono != _id:
+                raise violacao(self.nome, restricao)
+
+    def _indexar(self, entidade):
+        valores = {coluna: getattr(entidade, coluna) for coluna in self.indices}
+        for coluna, valor in valores.items():
+            self.indices[coluna][valor].add(entidade.id)
+        for restricao, colunas in self.unicos.items():
+            chave = tuple(getattr(entidade, coluna) for coluna in colunas)
+            self._unicos[restricao][chave] = entidade.id
+            valores[restricao] = chave
+        self._indexados[entidade.id] = valores
+
+    def _desindexar(self, _id):
+        valores = self._indexados.pop(_id)
+        for coluna in self.indices:
+            ids = self.indices[coluna][valores[coluna]]
+            ids.discard(_id)
+            if not ids:
+                del self.indices[coluna][valores[coluna]]
+        for restricao in self.unicos:
+            del self._unicos[restricao][valores[restricao]]
+
+    def inserir(self, entidade):
+        self._conferir(entidade, None)
+        if entidade.id is None:
+            entidade.id = self.proximo_id
+        self.proximo_id = max(self.proximo_id, entidade.id + 1)
+        if hasattr(entidade, "versao"):
+            entidade.versao = 1
+        self.linhas[entidade.id] = entidade
+        self._indexar(entidade)
+        self._gravadas[entidade.id] = valores_gravados(entidade)
+        return entidade
+
+    def atualizar(self, entidade, versao: bool = True):
+        try:
+            self._conferir(entidade, entidade.id)
+        except IntegrityError:
+            for campo, valor in self._gravadas[entidade.id].items():
+                setattr(entidade, campo, valor)
+            raise
+        self._desindexar(entidade.id)
+        self._indexar(entidade)
+        if versao:
+            entidade.versao += 1
+        self._gravadas[entidade.id] = valores_gravados(entidade)
+        return entidade
+
+    def remover(self, entidade):
+        # As linhas que a referenciam vão junto, como faz a purga no banco
+        for tabela in self.banco.tabelas.values():
+            for coluna, referida in tabela.referencias.items():
+                if referida == self.nome:
+                    for dependente in tabela.buscar(coluna, entidade.id):
+                        if dependente.id in tabela.linhas:
+                            tabela.remover(dependente)
+        self._desindexar(entidade.id)
+        del self._gravadas[entidade.id]
+        del self.linhas[entidade.id]
+
+class BancoEmMemoria:
+    """As tabelas do domínio em memória, com os índices das consultas que
+    os repositórios fazem: id, documento do produtor, ano e as chaves
+    estrangeiras."""
+
+    def __init__(self):
+        self.tabelas = {}
+        for tabela in (
+            Tabela("produtores", unicos={"uq_produtores_documento": ("documento_chave", "documento_tipo")}),
+            Tabela("propriedades", indices=("produtor_id",), referencias={"produtor_id": "produtores"}),
+            Tabela("safras", indices=("propriedade_id", "ano"), referencias={"propriedade_id": "propriedades"}),
+            Tabela(
+                "culturas",
+                indices=("safra_id", "propriedade_id", "ano"),
+                referencias={"safra_id": "safras", "propriedade_id": "propriedades", "catalogo_id": "catalogo_culturas"},
+            ),
+            Tabela("catalogo_culturas", unicos={"uq_catalogo_culturas_nome": ("nome_normalizado",)}),
+        ):
+            tabela.banco = self
+            self.tabelas[tabela.nome] = tabela
+
+    def __getitem__(self, nome: str) -> Tabela:
+        return self.tabelas[nome]
+
+    def clear(self):
+        self.__init__()
+
+banco_em_memoria = BancoEmMemoria()
+
+def usar_memoria() -> bool:
+    return settings.repository_backend == "memoria"
+
+class MemoriaRepository:
+    """Base dos repositórios em memória: mesma interface dos repositórios
+    SQL, sem sessão nem I/O, para medir só a CPU dos services.
+
+    As entidades devolvidas são as próprias linhas guardadas, como os
+    objetos do identity map de uma sessão: o service altera e chama
+    ``update``.
+    """
+
+    tabela: str
+    # Sem sessão (nem réplica): o cache de entidades lê direto
+    session = None
+
+    def __init__(self, banco: BancoEmMemoria | None = None):
+        self.banco = banco_em_memoria if banco is None else banco
+        self.linhas = self.banco[self.tabela]
+
+    def carregar(self, entidade):
+        """Preenche os relacionamentos que a resposta serializa."""
+        return entidade
+
+    def _carregar(self, entidade):
+        return None if entidade is None else self.carregar(entidade)
+
+    async def get_all(self) -> list:
+        return [self.carregar(entidade) for entidade in self.linhas.todas()]
+
+    async def get_by_id(self, _id: int):
+        return self._carregar(self.linhas.get(_id))
+
+    async def get_by_ids(self, ids: list[int]) -> list:
+        entidades = (self.linhas.get(_id) for _id in dict.fromkeys(ids))
+        return [self.carregar(entidade) for entidade in entidades if entidade is not None]
+
+    async def count(self, exato: bool = True) -> Contagem:
+        return Contagem(len(self.linhas))
+
+    async def create(self, entidade):
+        return self.carregar(self.linhas.inserir(entidade))
+
+    async def update(self, entidade):
+        return self.carregar(self.linhas.atualizar(entidade))
+
+    async def patch(self, _id: int, versao: int, valores: dict, *criterios):
+        entidade = self.linhas.get(_id)
+        if entidade is None or entidade.versao != versao:
+            return None
+        anteriores = {campo: getattr(entidade, campo) for campo in valores}
+        for campo, valor in valores.items():
+            setattr(entidade, campo, valor)
+        if not all(avaliar(criterio, entidade) for criterio in criterios):
+            # Como o UPDATE que não casa linha nenhuma: nada muda
+            for campo, valor in anteriores.items():
+                setattr(entidade, campo, valor)
+            return None
+        # Numa violação o atualizar já devolve a linha ao que estava gravado
+        self.linhas.atualizar(entidade)
+        return self.carregar(entidade)
+
+    async def delete(self, _id: int) -> Exclusao | None:
+        """Sem purga em segundo plano: as dependentes somem na hora."""
+        entidade = self.linhas.get(_id)
+        if entidade is None:
+            return None
+        self.linhas.remover(entidade)
+        return Exclusao(_id)
+
+def relacionar(entidade, relacionamento: str, valor):
+    """Atribui o relacionamento sem disparar eventos do ORM (backrefs)."""
+    set_committed_value(entidade, relacionamento, valor)
@@ -0,0 +1,37 @@
+import time
+from shared.database.statement_hooks import por_statement
+from shared.utils.instrumentation import operacao_atual
+from shared.utils.metrics import Contador, Histograma, Medidor
+
+db_consultas = Contador("db_queries_total", "Statements executados, por método de repositório", ("operacao",))
+db_duracao = Histograma("db_query_duration_seconds", "Duração dos statements, por método de repositório", ("operacao",))
+
+_pools = {}
+
+def _uso_dos_pools() -> dict:
+    valores = {}
+    for nome, pool in _pools.items():
+        valores[(nome, "em_uso")] = pool.checkedout()
+        valores[(nome, "ociosas")] = pool.checkedin()
+        valores[(nome, "overflow")] = max(pool.overflow(), 0)
+        valores[(nome, "tamanho")] = pool.size()
+    return valores
+
+db_pool = Medidor("db_pool_connections", "Conexões do pool por engine e estado", ("engine", "estado"), coletar=_uso_dos_pools)
+
+def _antes(conn, statement, parameters, executemany):
+    return time.perf_counter()
+
+def _depois(conn, inicio, cursor, statement, parameters, executemany):
+    duracao = time.perf_counter() - inicio
+    # Statements fora de repositórios (migrações, warmup, changelog) ficam juntos
+    operacao = operacao_atual.get() or "outros"
+    db_consultas.inc(operacao)
+    db_duracao.observar(duracao, operacao)
+
+def instrumentar(engine, nome: str):
+    sync_engine = getattr(engine, "sync_engine", engine)
+    por_statement(sync_engine, "metrics_inicio", _antes, _depois)
+    # Pools sem contagem (NullPool, StaticPool) não entram no gauge
+    if hasattr(sync_engine.pool, "checkedout"):
+        _pools[nome] = sync_engine.pool
@@ -0,0 +1,33 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from shared.database.migrations import m001_catalogo_culturas, m002_particionar_safras, m003_alteracoes, m004_versao, m005_documento_fiscal, m006_exclusao_logica, m007_documento_excluido
+
+# Em ordem de aplicação. Cada migração precisa ser idempotente, porque o
+# create_all do init_db pode já ter criado parte do schema novo.
+MIGRATIONS = [
+    m001_catalogo_culturas,
+    m002_particionar_safras,
+    m003_alteracoes,
+    m004_versao,
+    m005_documento_fiscal,
+    m006_exclusao_logica,
+    m007_documento_excluido,
+]
+
+async def migrate(engine: AsyncEngine) -> list[str]:
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " versao VARCHAR(100) PRIMARY KEY,"
+            " aplicada_em TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        aplicadas = set((await conn.execute(text("SELECT versao FROM schema_migrations"))).scalars())
+    novas = []
+    for migration in MIGRATIONS:
+        if migration.VERSION in aplicadas:
+            continue
+        async with engine.begin() as conn:
+            await migration.upgrade(conn)
+            await conn.execute(text("INSERT INTO schema_migrations (versao) VALUES (:versao)"), {"versao": migration.VERSION})
+        novas.append(migration.VERSION)
+    return novas
@@ -0,0 +1,49 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from modules.cultura.services.catalogo_cultura_service import normalizar_nome
+
+VERSION = "001_catalogo_culturas"
+
+async def has_column(conn: AsyncConnection, tabela: str, coluna: str) -> bool:
+    result = await conn.execute(
+        text("SELECT 1 FROM information_schema.columns WHERE table_name = :tabela AND column_name = :coluna"),
+        {"tabela": tabela, "coluna": coluna},
+    )
+    return result.first() is not None
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS catalogo_culturas ("
+        " id SMALLSERIAL PRIMARY KEY,"
+        " nome VARCHAR(100) NOT NULL,"
+        " nome_normalizado VARCHAR(100) NOT NULL UNIQUE)"
+    ))
+    if not await has_column(conn, "culturas", "nome"):
+        # Banco criado já no formato novo pelo create_all
+        return
+    await conn.execute(text(
+        "ALTER TABLE culturas ADD COLUMN IF NOT EXISTS catalogo_id SMALLINT REFERENCES catalogo_culturas(id)"
+    ))
+
+    # Variantes como "Soja", "soja " e "SOJA" viram uma entrada só; o nome
+    # exibido é a grafia mais frequente
+    result = await conn.execute(text("SELECT nome, count(*) FROM culturas GROUP BY nome ORDER BY count(*) DESC, nome"))
+    variantes = {}
+    for nome, _ in result:
+        variantes.setdefault(normalizar_nome(nome), []).append(nome)
+    for nome_normalizado, nomes in variantes.items():
+        catalogo_id = (await conn.execute(
+            text(
+                "INSERT INTO catalogo_culturas (nome, nome_normalizado) VALUES (:nome, :nome_normalizado) "
+                "ON CONFLICT (nome_normalizado) DO UPDATE SET nome = catalogo_culturas.nome RETURNING id"
+            ),
+            {"nome": " ".join(nomes[0].split()), "nome_normalizado": nome_normalizado},
+        )).scalar_one()
+        await conn.execute(
+            text("UPDATE culturas SET catalogo_id = :catalogo_id WHERE nome = ANY(:nomes)"),
+            {"catalogo_id": catalogo_id, "nomes": nomes},
+        )
+
+    await conn.execute(text("ALTER TABLE culturas ALTER COLUMN catalogo_id SET NOT NULL"))
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_culturas_catalogo_id ON culturas (catalogo_id)"))
+    await conn.execute(text("ALTER TABLE culturas DROP COLUMN nome"))
@@ -0,0 +1,71 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from shared.database.partitions import ensure_default_partitions, ensure_partitions, is_partitioned
+
+VERSION = "002_particionar_safras"
+
+# Objetos das tabelas antigas cujos nomes as novas vão reutilizar
+LEGACY_RENAMES = (
+    "ALTER TABLE culturas RENAME TO culturas_legado",
+    "ALTER TABLE safras RENAME TO safras_legado",
+    "ALTER SEQUENCE IF EXISTS culturas_id_seq RENAME TO culturas_legado_id_seq",
+    "ALTER SEQUENCE IF EXISTS safras_id_seq RENAME TO safras_legado_id_seq",
+    "ALTER INDEX IF EXISTS culturas_pkey RENAME TO culturas_legado_pkey",
+    "ALTER INDEX IF EXISTS safras_pkey RENAME TO safras_legado_pkey",
+    "ALTER INDEX IF EXISTS ix_culturas_id RENAME TO ix_culturas_legado_id",
+    "ALTER INDEX IF EXISTS ix_culturas_catalogo_id RENAME TO ix_culturas_legado_catalogo_id",
+    "ALTER INDEX IF EXISTS ix_safras_id RENAME TO ix_safras_legado_id",
+)
+
+# Esquema desta revisão, congelado: as colunas que entraram depois (versao,
+# documento, exclusão lógica) chegam pelas migrações seguintes
+CREATE_TABLES = (
+    "CREATE TABLE safras ("
+    " id SERIAL NOT NULL,"
+    " ano INTEGER NOT NULL,"
+    " propriedade_id INTEGER NOT NULL REFERENCES propriedades (id),"
+    " PRIMARY KEY (id, ano))"
+    " PARTITION BY RANGE (ano)",
+    "CREATE INDEX ix_safras_id ON safras (id)",
+    "CREATE TABLE culturas ("
+    " id SERIAL NOT NULL,"
+    " ano INTEGER NOT NULL,"
+    " catalogo_id SMALLINT NOT NULL REFERENCES catalogo_culturas (id),"
+    " safra_id INTEGER NOT NULL,"
+    " propriedade_id INTEGER NOT NULL REFERENCES propriedades (id),"
+    " PRIMARY KEY (id, ano),"
+    " FOREIGN KEY (safra_id, ano) REFERENCES safras (id, ano) ON UPDATE CASCADE)"
+    " PARTITION BY RANGE (ano)",
+    "CREATE INDEX ix_culturas_id ON culturas (id)",
+    "CREATE INDEX ix_culturas_catalogo_id ON culturas (catalogo_id)",
+)
+
+async def upgrade(conn: AsyncConnection):
+    if await is_partitioned(conn, "safras"):
+        # Banco criado já particionado pelo create_all; falta só a default
+        await ensure_default_partitions(conn)
+        return
+
+    for statement in LEGACY_RENAMES:
+        await conn.execute(text(statement))
+    for statement in CREATE_TABLES:
+        await conn.execute(text(statement))
+    await ensure_default_partitions(conn)
+
+    anos = (await conn.execute(text("SELECT DISTINCT ano FROM safras_legado ORDER BY ano"))).scalars().all()
+    await ensure_partitions(conn, anos)
+
+    await conn.execute(text(
+        "INSERT INTO safras (id, ano, propriedade_id) SELECT id, ano, propriedade_id FROM safras_legado"
+    ))
+    await conn.execute(text(
+        "INSERT INTO culturas (id, ano, catalogo_id, safra_id, propriedade_id) "
+        "SELECT c.id, s.ano, c.catalogo_id, c.safra_id, c.propriedade_id "
+        "FROM culturas_legado c JOIN safras_legado s ON s.id = c.safra_id"
+    ))
+    for tabela in ("safras", "culturas"):
+        await conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), COALESCE(max(id), 0) + 1, false) FROM {tabela}"
+        ))
+    await conn.execute(text("DROP TABLE culturas_legado"))
+    await conn.execute(text("DROP TABLE safras_legado"))
@@ -0,0 +1,31 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = "003_alteracoes"
+
+# Entidade do changelog -> tabela
+TABELAS = {
+    "produtor": "produtores",
+    "propriedade": "propriedades",
+    "safra": "safras",
+    "cultura": "culturas",
+}
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS alteracoes ("
+        " seq BIGSERIAL PRIMARY KEY,"
+        " entidade VARCHAR(30) NOT NULL,"
+        " entidade_id INTEGER NOT NULL,"
+        " operacao VARCHAR(10) NOT NULL,"
+        " dados JSON,"
+        " criado_em TIMESTAMP NOT NULL DEFAULT now())"
+    ))
+    if (await conn.execute(text("SELECT 1 FROM alteracoes LIMIT 1"))).first() is not None:
+        return
+    # O que já existia entra como criação, para que since=0 traga a base toda
+    for entidade, tabela in TABELAS.items():
+        await conn.execute(text(
+            f"INSERT INTO alteracoes (entidade, entidade_id, operacao, dados) "
+            f"SELECT '{entidade}', t.id, 'criacao', row_to_json(t) FROM {tabela} t ORDER BY t.id"
+        ))
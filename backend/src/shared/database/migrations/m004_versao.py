@@ -0,0 +1,9 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = "004_versao"
+
+async def upgrade(conn: AsyncConnection):
+    # Em tabela particionada o ALTER na mãe chega a todas as partições
+    for tabela in ("produtores", "propriedades", "safras", "culturas"):
+        await conn.execute(text(f"ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS versao INTEGER NOT NULL DEFAULT 1"))
@@ -0,0 +1,43 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from shared.database.migrations.m001_catalogo_culturas import has_column
+from shared.utils.documento_fiscal import DocumentoFiscal
+
+VERSION = "005_documento_fiscal"
+
+async def upgrade(conn: AsyncConnection):
+    if not await has_column(conn, "produtores", "cpf_cnpj"):
+        # Banco criado já no formato novo pelo create_all
+        return
+    await conn.execute(text("ALTER TABLE produtores ADD COLUMN IF NOT EXISTS documento_tipo SMALLINT"))
+    await conn.execute(text("ALTER TABLE produtores ADD COLUMN IF NOT EXISTS documento_chave BIGINT"))
+
+    invalidos, vistos, duplicados, linhas = [], {}, [], []
+    for produtor_id, cpf_cnpj in await conn.execute(text("SELECT id, cpf_cnpj FROM produtores ORDER BY id")):
+        try:
+            documento = DocumentoFiscal.parse(cpf_cnpj)
+        except ValueError:
+            invalidos.append(produtor_id)
+            continue
+        if documento in vistos:
+            duplicados.append((vistos[documento], produtor_id))
+        vistos.setdefault(documento, produtor_id)
+        linhas.append({"id": produtor_id, "tipo": documento.tipo, "chave": documento.chave})
+    if invalidos or duplicados:
+        # Corrigir à mão: não há como escolher automaticamente qual cadastro vale
+        raise RuntimeError(
+            f"Produtores com documento inválido: {invalidos}; "
+            f"mesmo documento em formatos diferentes (id original, duplicado): {duplicados}"
+        )
+
+    if linhas:
+        await conn.execute(
+            text("UPDATE produtores SET documento_tipo = :tipo, documento_chave = :chave WHERE id = :id"),
+            linhas,
+        )
+    await conn.execute(text("ALTER TABLE produtores ALTER COLUMN documento_tipo SET NOT NULL"))
+    await conn.execute(text("ALTER TABLE produtores ALTER COLUMN documento_chave SET NOT NULL"))
+    await conn.execute(text(
+        "ALTER TABLE produtores ADD CONSTRAINT uq_produtores_documento UNIQUE (documento_chave, documento_tipo)"
+    ))
+    await conn.execute(text("ALTER TABLE produtores DROP COLUMN cpf_cnpj"))
@@ -0,0 +1,13 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = "006_exclusao_logica"
+
+async def upgrade(conn: AsyncConnection):
+    for tabela in ("produtores", "propriedades", "safras", "culturas"):
+        # Em tabela particionada o ALTER e o índice na mãe chegam a todas as partições
+        await conn.execute(text(f"ALTER TABLE {tabela} ADD COLUMN IF NOT EXISTS excluido_em TIMESTAMP"))
+        # Parcial: só as linhas à espera do purgador, que a varredura procura
+        await conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{tabela}_excluido_em ON {tabela} (excluido_em) WHERE excluido_em IS NOT NULL"
+        ))
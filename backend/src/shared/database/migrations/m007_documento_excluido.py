@@ -0,0 +1,13 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+VERSION = "007_documento_excluido"
+
+async def upgrade(conn: AsyncConnection):
+    # A unicidade do documento passa a valer só entre os produtores vivos;
+    # no banco criado pelo create_all o índice já é o parcial
+    await conn.execute(text("ALTER TABLE produtores DROP CONSTRAINT IF EXISTS uq_produtores_documento"))
+    await conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_produtores_documento"
+        " ON produtores (documento_chave, documento_tipo) WHERE excluido_em IS NULL"
+    ))
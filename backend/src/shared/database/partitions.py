@@ -0,0 +1,104 @@
+import logging
+from datetime import date
+from typing import Iterable
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Particionadas por RANGE (ano). A ordem importa ao arquivar: culturas
+# referencia safras, então sai primeiro.
+PARTITIONED_TABLES = ("culturas", "safras")
+
+def partition_name(tabela: str, ano: int) -> str:
+    return f"{tabela}_{ano}"
+
+def partition_window(hoje: date, anos_antes: int, anos_depois: int) -> range:
+    return range(hoje.year - anos_antes, hoje.year + anos_depois + 1)
+
+async def is_partitioned(conn: AsyncConnection, tabela: str) -> bool:
+    result = await conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:tabela)"),
+        {"tabela": tabela},
+    )
+    return result.scalar() == "p"
+
+async def list_partitions(conn: AsyncConnection, tabela: str) -> list[str]:
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:tabela) ORDER BY c.relname"
+        ),
+        {"tabela": tabela},
+    )
+    return list(result.scalars())
+
+async def ensure_default_partitions(conn: AsyncConnection):
+    # Recebe anos sem partição própria (importações históricas, digitação
+    # errada) para que o insert nunca falhe por falta de partição
+    for tabela in PARTITIONED_TABLES:
+        await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {tabela}_default PARTITION OF {tabela} DEFAULT"))
+
+async def ensure_partitions(conn: AsyncConnection, anos: Iterable[int]) -> list[str]:
+    """Cria as partições anuais que faltam. Devolve os nomes criados."""
+    criadas = []
+    for tabela in PARTITIONED_TABLES:
+        existentes = set(await list_partitions(conn, tabela))
+        for ano in anos:
+            nome = partition_name(tabela, ano)
+            if nome in existentes:
+                continue
+            # O Postgres recusa criar a partição se a default já tiver linhas
+            # do mesmo ano; nesse caso elas ficam onde estão
+            ocupada = await conn.execute(
+                text(f"SELECT 1 FROM {tabela}_default WHERE ano = :ano LIMIT 1"), {"ano": ano}
+            )
+            if ocupada.first() is not None:
+                logger.warning("Partição %s não criada: %s_default já tem linhas de %s", nome, tabela, ano)
+                continue
+            await conn.execute(text(
+                f"CREATE TABLE {nome} PARTITION OF {tabela} FOR VALUES FROM ({int(ano)}) TO ({int(ano) + 1})"
+            ))
+            criadas.append(nome)
+    return criadas
+
+async def ensure_partition_window(engine: AsyncEngine, anos: Iterable[int]) -> list[str]:
+    """Chamada no startup: garante as partições dos próximos anos antes que
+    a primeira safra deles seja cadastrada."""
+    try:
+        async with engine.begin() as conn:
+            if not await is_partitioned(conn, "safras"):
+                return []
+            return await ensure_partitions(conn, anos)
+    except Exception as e:
+        logger.warning("Falha ao criar partições anuais: %s", e)
+        return []
+
+async def archive_partitions(conn: AsyncConnection, ate_ano: int, schema: str) -> list[str]:
+    """Desanexa as partições anuais até ``ate_ano`` (inclusive) e as move
+    para ``schema``. As tabelas continuam consultáveis, fora das consultas
+    do dia a dia."""
+    if not schema.isidentifier():
+        raise ValueError(f"Schema inválido: {schema!r}")
+    await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+    arquivadas = []
+    for tabela in PARTITIONED_TABLES:
+        for nome in await list_partitions(conn, tabela):
+            sufixo = nome.rsplit("_", 1)[-1]
+            if not sufixo.isdigit() or int(sufixo) > ate_ano:
+                continue
+            await conn.execute(text(f"ALTER TABLE {tabela} DETACH PARTITION {nome}"))
+            # Ao desanexar, a FK herdada vira uma FK própria apontando para
+            # safras, o que impediria desanexar a partição de safras depois
+            fks = await conn.execute(
+                text(
+                    "SELECT conname FROM pg_constraint "
+                    "WHERE conrelid = to_regclass(:nome) AND contype = 'f' AND confrelid = to_regclass('safras')"
+                ),
+                {"nome": nome},
+            )
+            for conname in fks.scalars().all():
+                await conn.execute(text(f'ALTER TABLE {nome} DROP CONSTRAINT "{conname}"'))
+            await conn.execute(text(f"ALTER TABLE {nome} SET SCHEMA {schema}"))
+            arquivadas.append(f"{schema}.{nome}")
+    return arquivadas
@@ -0,0 +1,117 @@
+from contextlib import contextmanager
+from sqlalchemy import Select, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from shared.config.settings import settings
+from shared.database import metrics as db_metrics
+from shared.database import tracing as db_tracing
+from shared.database.slow_queries import slow_query_log
+from shared.exceptions import DeadlineExceeded
+from shared.utils.deadline import current_deadline, remaining_ms
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        echo=settings.db_echo,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_pre_ping=True,
+    )
+
+
+engine = _create_engine(settings.database_url)
+read_engine = (
+    engine
+    if settings.read_database_url == settings.database_url
+    else _create_engine(settings.read_database_url)
+)
+if settings.slow_query_enabled:
+    for _engine in {engine, read_engine}:
+        slow_query_log.instrumentar(_engine)
+if settings.metrics_enabled:
+    db_metrics.instrumentar(engine, "primario")
+    if read_engine is not engine:
+        db_metrics.instrumentar(read_engine, "leitura")
+if settings.tracing_exporter:
+    for _engine in {engine, read_engine}:
+        db_tracing.instrumentar(_engine)
+
+
+class RoutingSession(Session):
+    """Envia SELECTs para a réplica e todo o resto para o primário.
+
+    Depois da primeira escrita a sessão fica presa ao primário, garantindo
+    read-your-writes até o fim da requisição.
+    """
+
+    def __init__(self, *args, primary=None, replica=None, **kw):
+        super().__init__(*args, **kw)
+        self.primary = primary if primary is not None else engine.sync_engine
+        self.replica = replica if replica is not None else read_engine.sync_engine
+
+    def get_bind(self, mapper=None, clause=None, primary=False, **kw):
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self.info["wrote"] = True
+            return self.primary
+        # bind_arguments={"primary": True} força uma leitura no primário
+        if primary or self.info.get("primary") or self.info.get("wrote"):
+            return self.primary
+        return self.replica
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _apply_statement_timeout(session, transaction, connection):
+    restante = remaining_ms(session.info.get("deadline"))
+    if restante is None or connection.dialect.name != "postgresql":
+        return
+    if restante <= 0:
+        raise DeadlineExceeded()
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {restante}")
+
+
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+)
+
+
+def use_primary(session: AsyncSession) -> AsyncSession:
+    session.info["primary"] = True
+    return session
+
+
+@contextmanager
+def no_primario(session: AsyncSession | None):
+    """Leituras do bloco vão para o primário, mesmo numa sessão de leitura."""
+    if session is None:
+        yield
+        return
+    anterior = session.info.get("primary")
+    session.info["primary"] = True
+    try:
+        yield
+    finally:
+        session.info["primary"] = anterior
+
+
+def bind_deadline(session: AsyncSession) -> AsyncSession:
+    session.info["deadline"] = current_deadline()
+    return session
+
+
+async def get_db():
+    async with SessionLocal() as session:
+        use_primary(bind_deadline(session))
+        yield session
+
+
+async def get_read_db():
+    async with SessionLocal() as session:
+        bind_deadline(session)
+        yield session
+
+
+get_session = get_db
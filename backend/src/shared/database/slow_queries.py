@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import random
+import re
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy.ext.asyncio import AsyncEngine
+from shared.config.settings import settings
+from shared.database.statement_hooks import por_statement
+
+try:
+    import greenlet
+except ImportError:  # pragma: no cover - o SQLAlchemy assíncrono depende dele
+    greenlet = None
+
+logger = logging.getLogger(__name__)
+
+# Conexões marcadas com essa opção (o próprio EXPLAIN) não são registradas
+IGNORAR = "slow_query_log_ignore"
+_CAMADAS = (".repositories.", ".services.")
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\$\d+|\?|(?<![\w.])\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACOS = re.compile(r"\s+")
+_FROM = re.compile(r"\bFROM\b", re.IGNORECASE)
+_TRAVAS = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE|KEY\s+SHARE)\b", re.IGNORECASE)
+_VOLATEIS = re.compile(r"\b(?:nextval|setval|set_config|pg_(?:try_)?advisory\w*|pg_notify|pg_sleep\w*)\s*\(", re.IGNORECASE)
+
+def normalizar_sql(sql: str) -> str:
+    """Troca literais e placeholders por "?" e colapsa listas de IN."""
+    sql = _LITERAIS.sub("?", sql)
+    sql = _LISTAS.sub("(?, ...)", sql)
+    return _ESPACOS.sub(" ", sql).strip()
+
+def _tipo(valor) -> str:
+    return type(valor).__name__
+
+def formato_dos_parametros(parametros, executemany: bool):
+    """Tipos dos parâmetros, sem os valores."""
+    if executemany:
+        linhas = list(parametros or [])
+        return {"linhas": len(linhas), "tipos": formato_dos_parametros(linhas[0], False) if linhas else None}
+    if isinstance(parametros, dict):
+        return {chave: _tipo(valor) for chave, valor in parametros.items()}
+    return [_tipo(valor) for valor in parametros or ()]
+
+def _frames():
+    # A execução síncrona do SQLAlchemy roda num greenlet; o pai guarda as
+    # corrotinas da requisição que esperavam por ela
+    frame = sys._getframe(1)
+    atual = greenlet.getcurrent() if greenlet else None
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+        if frame is None and atual is not None and atual.parent is not None:
+            atual = atual.parent
+            frame = atual.gr_frame
+
+def chamador() -> str | None:
+    """Método de repositório (ou de service, como o DashboardService) que emitiu a consulta."""
+    for frame in _frames():
+        modulo = frame.f_globals.get("__name__", "")
+        if any(camada in f".{modulo}." for camada in _CAMADAS):
+            codigo = frame.f_code
+            return f"{modulo}:{getattr(codigo, 'co_qualname', codigo.co_name)}"
+    return None
+
+def explicavel(sql: str) -> bool:
+    # ANALYZE executa de novo o statement: só leituras sem efeito colateral.
+    # SELECT sem FROM é chamada de função (advisory lock, setval) e não tem
+    # plano que valha a pena; com FOR UPDATE/SHARE ele travaria linhas
+    if not sql.lstrip().upper().startswith("SELECT"):
+        return False
+    sql = _LITERAIS.sub("?", sql)
+    return bool(_FROM.search(sql)) and not _TRAVAS.search(sql) and not _VOLATEIS.search(sql)
+
+class SlowQueryLog:
+    """Consultas acima de SLOW_QUERY_THRESHOLD_MS, com plano opcional.
+
+    Cada engine instrumentada cronometra todos os statements; os lentos vão
+    para um buffer circular com o SQL normalizado, os tipos dos parâmetros e
+    o método que os emitiu. Uma amostra deles (SLOW_QUERY_EXPLAIN_SAMPLE %)
+    é repetida com EXPLAIN (ANALYZE, BUFFERS) numa conexão separada, fora do
+    caminho da requisição e um plano por vez.
+    """
+
+    def __init__(self, limite_ms: float | None = None, amostra_explain: float | None = None, max_registros: int | None = None):
+        self.limite_ms = settings.slow_query_threshold_ms if limite_ms is None else limite_ms
+        self.amostra_explain = settings.slow_query_explain_sample if amostra_explain is None else amostra_explain
+        self.registros = deque(maxlen=settings.slow_query_max_entries if max_registros is None else max_registros)
+        self.total = 0
+        self._explicando = None
+
+    def instrumentar(self, engine):
+        por_statement(engine, "slow_query_inicio", self._antes, self._depois)
+
+    def _antes(self, conn, statement, parameters, executemany):
+        return time.perf_counter()
+
+    def _depois(self, conn, inicio, cursor, statement, parameters, executemany):
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        if duracao_ms < self.limite_ms or conn.get_execution_options().get(IGNORAR):
+            return
+        registro = {
+            "quando": datetime.now(timezone.utc).isoformat(),
+            "duracao_ms": round(duracao_ms, 2),
+            "sql": normalizar_sql(statement),
+            "parametros": formato_dos_parametros(parameters, executemany),
+            "chamador": chamador(),
+            "plano": None,
+        }
+        self.registros.append(registro)
+        self.total += 1
+        if (
+            conn.dialect.name == "postgresql"
+            and not executemany
+            and explicavel(statement)
+            and self._explicando is None
+            and random.random() * 100 < self.amostra_explain
+        ):
+            self._agendar_explain(conn.engine, statement, parameters, registro)
+
+    def _agendar_explain(self, sync_engine, statement, parameters, registro):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._explicando = loop.create_task(self._explicar(AsyncEngine(sync_engine), statement, parameters, registro))
+        self._explicando.add_done_callback(self._fim_do_explain)
+
+    def _fim_do_explain(self, tarefa):
+        self._explicando = None
+
+    async def _explicar(self, engine, statement, parameters, registro):
+        try:
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(**{IGNORAR: True})
+                resultado = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+                registro["plano"] = "\n".join(linha[0] for linha in resultado)
+                await conn.rollback()
+        except Exception:
+            logger.warning("Falha ao capturar o plano de uma consulta lenta", exc_info=True)
+
+    def snapshot(self) -> dict:
+        return {
+            "limite_ms": self.limite_ms,
+            "amostra_explain": self.amostra_explain,
+            "total": self.total,
+            "consultas": list(reversed(self.registros)),
+        }
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,34 @@
+from sqlalchemy import event
+
+def por_statement(engine, chave: str, abrir, fechar, falhar=None):
+    """Liga um par abrir/fechar aos hooks de cursor da engine.
+
+    ``abrir(conn, statement, parameters, executemany)`` roda antes de cada
+    statement e o que devolve é empilhado em ``conn.info[chave]`` (None pula
+    o statement). O valor volta para ``fechar(conn, valor, cursor, statement,
+    parameters, executemany)`` quando ele termina ou, se falhar, para
+    ``falhar(conn, valor, exc)``; nos dois casos sai da pilha, que não cresce
+    com os erros de uma conexão reaproveitada pelo pool.
+    """
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        valor = abrir(conn, statement, parameters, executemany)
+        if valor is not None:
+            conn.info.setdefault(chave, []).append(valor)
+
+    def depois(conn, cursor, statement, parameters, context, executemany):
+        pilha = conn.info.get(chave)
+        if pilha:
+            fechar(conn, pilha.pop(), cursor, statement, parameters, executemany)
+
+    def erro(contexto):
+        pilha = contexto.connection.info.get(chave) if contexto.connection is not None else None
+        if pilha:
+            valor = pilha.pop()
+            if falhar is not None:
+                falhar(contexto.connection, valor, contexto.original_exception)
+
+    event.listen(sync_engine, "before_cursor_execute", antes)
+    event.listen(sync_engine, "after_cursor_execute", depois)
+    event.listen(sync_engine, "handle_error", erro)
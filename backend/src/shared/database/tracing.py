@@ -0,0 +1,31 @@
+from shared.database.statement_hooks import por_statement
+from shared.utils.tracing import tracer
+
+def linhas(cursor) -> int | None:
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        return cursor.rowcount
+    # Os adaptadores assíncronos do SQLAlchemy já trouxeram as linhas do
+    # SELECT para o cursor; rowcount fica -1 nesse caso
+    prontas = getattr(cursor, "_rows", None)
+    return len(prontas) if prontas is not None else None
+
+def _antes(conn, statement, parameters, executemany):
+    if not tracer.ativo:
+        return None
+    return tracer.abrir("db.query", "db", {
+        "db.system": conn.dialect.name,
+        "db.statement": statement,
+        "db.executemany": executemany,
+    })
+
+def _depois(conn, span, cursor, statement, parameters, executemany):
+    quantidade = linhas(cursor)
+    if quantidade is not None:
+        span.atributos["db.rows"] = quantidade
+    tracer.fechar(span)
+
+def _erro(conn, span, exc):
+    tracer.fechar(span, exc)
+
+def instrumentar(engine):
+    por_statement(engine, "tracing_spans", _antes, _depois, _erro)
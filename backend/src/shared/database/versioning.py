@@ -0,0 +1,14 @@
+from sqlalchemy import update
+
+def versioned_update(model, entidade_id: int, versao: int, valores: dict, *criterios):
+    """UPDATE condicional na versão lida pelo cliente, devolvendo a linha nova.
+
+    Não volta linha nenhuma se o id não existe, se a versão mudou ou se um
+    dos critérios extras falhou; quem chama descobre qual foi o caso.
+    """
+    return (
+        update(model)
+        .where(model.id == entidade_id, model.versao == versao, *criterios)
+        .values(**valores, versao=model.versao + 1)
+        .returning(model)
+    )
@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncEngine
+from modules.produtor.entities.produtor import Produtor
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.safra.entities.safra import Safra
+from modules.cultura.entities.cultura import Cultura
+from shared.utils.documento_fiscal import TIPO_CPF, DocumentoFiscal
+
+logger = logging.getLogger(__name__)
+
+# Mesmo formato das consultas quentes dos repositórios e do dashboard, para
+# que o cache de compilação do SQLAlchemy e os prepared statements do asyncpg
+# já estejam prontos na primeira requisição.
+WARMUP_STATEMENTS = [
+    select(Produtor).where(Produtor.id == 0),
+    select(Produtor).where(Produtor.cpf_cnpj == DocumentoFiscal.from_chave(TIPO_CPF, 0)),
+    select(Propriedade).where(Propriedade.id == 0),
+    select(Safra).where(Safra.id == 0),
+    select(Cultura).where(Cultura.id == 0),
+    select(func.count(Propriedade.id)),
+    select(Propriedade.estado, func.count(Propriedade.id)).group_by(Propriedade.estado),
+]
+
+async def _warm_connection(engine: AsyncEngine):
+    async with engine.connect() as conn:
+        for statement in WARMUP_STATEMENTS:
+            await conn.execute(statement)
+
+async def warm_up(engine: AsyncEngine, connections: int) -> int:
+    if connections <= 0:
+        return 0
+    results = await asyncio.gather(
+        *(_warm_connection(engine) for _ in range(connections)), return_exceptions=True
+    )
+    falhas = [r for r in results if isinstance(r, Exception)]
+    for falha in falhas[:1]:
+        logger.warning("Falha ao aquecer conexões de %s: %s", engine.url.render_as_string(hide_password=True), falha)
+    return connections - len(falhas)
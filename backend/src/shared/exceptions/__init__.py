@@ -1 +1,8 @@
- 
\ No newline at end of file
+class DeadlineExceeded(Exception):
+    """O orçamento de tempo da requisição acabou."""
+
+class ConflitoDeVersao(Exception):
+    """A linha mudou desde a versão que o cliente leu."""
+
+    def __init__(self, mensagem: str = "Registro alterado por outra requisição; recarregue e tente de novo"):
+        super().__init__(mensagem)
@@ -0,0 +1,114 @@
+import asyncio
+from starlette.responses import JSONResponse
+from shared.config.settings import settings
+from shared.utils.route_rules import parse_route_rules, route_matches
+
+class RouteLimiter:
+    def __init__(self, pattern: str, limite: int, fila_max: int):
+        self.pattern = pattern
+        self.limite = limite
+        self.fila_max = fila_max
+        self.em_execucao = 0
+        self.na_fila = 0
+        self.rejeitadas = 0
+        self.expiradas = 0
+        self._semaphore = asyncio.Semaphore(limite)
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.em_execucao < self.limite and self.na_fila == 0:
+            await self._semaphore.acquire()
+            self.em_execucao += 1
+            return True
+        if self.na_fila >= self.fila_max:
+            self.rejeitadas += 1
+            return False
+        self.na_fila += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.expiradas += 1
+            return False
+        finally:
+            self.na_fila -= 1
+        self.em_execucao += 1
+        return True
+
+    def release(self):
+        self.em_execucao -= 1
+        self._semaphore.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "rota": self.pattern,
+            "limite": self.limite,
+            "fila_max": self.fila_max,
+            "em_execucao": self.em_execucao,
+            "na_fila": self.na_fila,
+            "rejeitadas": self.rejeitadas,
+            "expiradas": self.expiradas,
+        }
+
+def parse_limits(spec: str) -> list[RouteLimiter]:
+    limiters = []
+    for rota, valores in parse_route_rules(spec):
+        limite, _, fila = valores.partition(":")
+        try:
+            limiters.append(RouteLimiter(rota, int(limite), int(fila or 0)))
+        except ValueError:
+            raise ValueError(f"Limite de admissão inválido: {rota}={valores}")
+    return limiters
+
+class AdmissionController:
+    def __init__(self, limiters: list[RouteLimiter], queue_timeout_s: float, retry_after_s: int):
+        self.limiters = limiters
+        self.queue_timeout_s = queue_timeout_s
+        self.retry_after_s = retry_after_s
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        return cls(
+            parse_limits(settings.admission_limits),
+            settings.admission_queue_timeout_ms / 1000,
+            settings.admission_retry_after_s,
+        )
+
+    def match(self, method: str, path: str) -> RouteLimiter | None:
+        for limiter in self.limiters:
+            if route_matches(limiter.pattern, method, path):
+                # Limite 0 libera a rota, mesmo que uma regra mais ampla a pegasse
+                return limiter if limiter.limite > 0 else None
+        return None
+
+    def snapshot(self) -> list[dict]:
+        return [limiter.snapshot() for limiter in self.limiters]
+
+admission_controller = AdmissionController.from_settings()
+
+class AdmissionControlMiddleware:
+    """Limita requisições simultâneas por rota, com fila de espera limitada.
+
+    Quando a fila está cheia ou a espera estoura o timeout a requisição é
+    descartada com 503 e Retry-After, sem chegar a pegar conexão do pool.
+    """
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        limiter = self.controller.match(scope["method"], scope["path"])
+        if limiter is None:
+            return await self.app(scope, receive, send)
+        if not await limiter.acquire(self.controller.queue_timeout_s):
+            response = JSONResponse(
+                {"detail": "Servidor sobrecarregado, tente novamente"},
+                status_code=503,
+                headers={"Retry-After": str(self.controller.retry_after_s)},
+            )
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,108 @@
+from shared.config.settings import settings
+from shared.utils.compression import ENCODERS, negotiate, parse_levels
+from shared.utils.route_rules import parse_route_rules, route_matches
+
+class CompressionMiddleware:
+    """Comprime respostas com gzip, brotli ou zstd conforme o Accept-Encoding.
+
+    Respostas comuns abaixo de min_size saem sem compressão. Respostas em
+    streaming são comprimidas chunk a chunk, com flush a cada envio para o
+    cliente não ficar esperando o buffer do compressor encher.
+    """
+
+    def __init__(self, app, min_size: int | None = None, default_levels: dict[str, int] | None = None, route_levels: list[tuple[str, dict[str, int]]] | None = None):
+        self.app = app
+        self.min_size = settings.compression_min_size if min_size is None else min_size
+        self.default_levels = default_levels or parse_levels(settings.compression_levels)
+        if route_levels is None:
+            route_levels = [(rota, parse_levels(niveis)) for rota, niveis in parse_route_rules(settings.compression_route_levels)]
+        self.route_levels = route_levels
+
+    def levels_for(self, scope) -> dict[str, int]:
+        for pattern, niveis in self.route_levels:
+            if route_matches(pattern, scope["method"], scope["path"]):
+                return {**self.default_levels, **niveis}
+        return self.default_levels
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate(accept) if accept else None
+        if encoding is None:
+            return await self.app(scope, receive, send)
+        level = self.levels_for(scope).get(encoding)
+        responder = _CompressingResponder(send, encoding, level, self.min_size)
+        await self.app(scope, receive, responder.send)
+
+class _CompressingResponder:
+    def __init__(self, send, encoding: str, level: int | None, min_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.min_size = min_size
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    def _headers(self, message, content_length: int | None = None):
+        headers, vary = [], []
+        for name, value in message.get("headers", []):
+            if name.lower() == b"content-length":
+                continue
+            if name.lower() == b"vary":
+                vary.append(value)
+                continue
+            headers.append((name, value))
+        if not any(b"accept-encoding" in value.lower() for value in vary):
+            vary.append(b"Accept-Encoding")
+        headers.append((b"vary", b", ".join(vary)))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        return {**message, "headers": headers}
+
+    def _make_encoder(self):
+        cls = ENCODERS[self.encoding]
+        return cls(cls.default_level if self.level is None else self.level)
+
+    async def send(self, message):
+        tipo = message["type"]
+        if tipo == "http.response.start":
+            headers = dict((name.lower(), value) for name, value in message.get("headers", []))
+            self.start_message = message
+            self.passthrough = b"content-encoding" in headers
+            if self.passthrough:
+                await self._send(message)
+            return
+        if tipo != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            if not more_body:
+                if len(body) < self.min_size:
+                    await self._send(start)
+                    await self._send(message)
+                    self.passthrough = True
+                    return
+                encoder = self._make_encoder()
+                compressed = encoder.compress(body) + encoder.finish()
+                await self._send(self._headers(start, content_length=len(compressed)))
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            self.encoder = self._make_encoder()
+            await self._send(self._headers(start))
+
+        if more_body:
+            data = self.encoder.compress(body) + self.encoder.flush()
+        else:
+            data = self.encoder.compress(body) + self.encoder.finish()
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from sqlalchemy.exc import DBAPIError
+from starlette.responses import JSONResponse
+from shared.config.settings import settings
+from shared.exceptions import DeadlineExceeded
+from shared.utils.deadline import reset_deadline, set_deadline
+from shared.utils.route_rules import parse_route_rules, route_matches
+
+TIMEOUT_HEADER = b"x-request-timeout-ms"
+QUERY_CANCELED = "57014"
+# Folga para o Postgres cancelar o statement antes de cancelarmos a task
+CANCEL_GRACE_S = 0.25
+
+def is_query_canceled(exc: DBAPIError) -> bool:
+    orig = exc.orig
+    return QUERY_CANCELED in (getattr(orig, "sqlstate", None), getattr(orig, "pgcode", None))
+
+class DeadlineMiddleware:
+    """Define um prazo para cada requisição e responde 504 quando ele estoura.
+
+    O prazo vem da regra da rota (DEADLINE_ROUTES) e pode ser encurtado pelo
+    cliente com o header X-Request-Timeout-Ms. As sessões abertas por get_db
+    aplicam o tempo restante como statement_timeout.
+    """
+
+    def __init__(self, app, rules: list[tuple[str, int]] | None = None, default_ms: int | None = None):
+        self.app = app
+        if rules is None:
+            rules = [(rota, int(ms)) for rota, ms in parse_route_rules(settings.deadline_routes)]
+        self.rules = rules
+        self.default_ms = settings.deadline_default_ms if default_ms is None else default_ms
+
+    def budget_ms(self, scope) -> int | None:
+        """Prazo da requisição; None para rotas sem prazo (regra =0)."""
+        budget = self.default_ms
+        for pattern, ms in self.rules:
+            if route_matches(pattern, scope["method"], scope["path"]):
+                budget = ms
+                break
+        if budget == 0:
+            return None
+        for name, value in scope["headers"]:
+            if name == TIMEOUT_HEADER:
+                try:
+                    budget = min(budget, max(int(value), 0))
+                except ValueError:
+                    pass
+                break
+        return budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        budget_ms = self.budget_ms(scope)
+        if budget_ms is None:
+            return await self.app(scope, receive, send)
+        budget_s = budget_ms / 1000
+        token = set_deadline(time.monotonic() + budget_s)
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await asyncio.wait_for(self.app(scope, receive, send_wrapper), budget_s + CANCEL_GRACE_S)
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            if not started:
+                await self._timeout(scope, receive, send)
+        except DBAPIError as exc:
+            if not is_query_canceled(exc) or started:
+                raise
+            await self._timeout(scope, receive, send)
+        finally:
+            reset_deadline(token)
+
+    async def _timeout(self, scope, receive, send):
+        response = JSONResponse({"detail": "Tempo limite da requisição excedido"}, status_code=504)
+        await response(scope, receive, send)
@@ -0,0 +1,51 @@
+import time
+from shared.utils.metrics import BUCKETS_BYTES, Histograma, Medidor
+
+# Sem rota casada (404) os caminhos iriam direto para os rótulos
+SEM_ROTA = "<sem_rota>"
+
+http_duracao = Histograma(
+    "http_request_duration_seconds", "Latência das requisições por rota", ("metodo", "rota", "status")
+)
+http_tamanho = Histograma(
+    "http_response_size_bytes", "Tamanho do corpo das respostas por rota (após compressão)", ("metodo", "rota"), buckets=BUCKETS_BYTES
+)
+http_em_andamento = Medidor("http_requests_in_flight", "Requisições em andamento")
+
+def rota(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or SEM_ROTA
+
+class MetricsMiddleware:
+    """Latência, tamanho da resposta e requisições em andamento.
+
+    Fica por fora dos demais middlewares, para contar também as rejeições
+    da admissão e os 504 de prazo; a rota vem do template casado pelo router.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        inicio = time.perf_counter()
+        status = 500
+        tamanho = 0
+
+        async def send_wrapper(message):
+            nonlocal status, tamanho
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                tamanho += len(message.get("body", b""))
+            await send(message)
+
+        http_em_andamento.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_em_andamento.dec()
+            metodo, template = scope["method"], rota(scope)
+            http_duracao.observar(time.perf_counter() - inicio, metodo, template, status)
+            http_tamanho.observar(tamanho, metodo, template)
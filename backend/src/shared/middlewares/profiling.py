@@ -0,0 +1,233 @@
+import asyncio
+import itertools
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from shared.config.settings import settings
+from shared.utils.debug_auth import DEBUG_TOKEN_HEADER, token_valido
+from shared.utils.route_rules import parse_route_rules, route_matches
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+# Folha das pilhas de tasks suspensas em I/O (banco, rede, sleep)
+AGUARDANDO = ("<aguardando>", "")
+
+CAMADAS = ("controller", "service", "repository", "serializacao", "outros")
+_PACOTES_DE_CAMADA = (("repository", ".repositories."), ("service", ".services."), ("controller", ".controllers."))
+_MODULOS_DE_SERIALIZACAO = ("pydantic", "fastapi.encoders", "starlette.responses")
+_FUNCOES_DE_SERIALIZACAO = ("serialize_response", "_prepare_response_content")
+
+def rotulo(frame) -> tuple[str, str]:
+    codigo = frame.f_code
+    return frame.f_globals.get("__name__", "?"), getattr(codigo, "co_qualname", codigo.co_name)
+
+def classificar(pilha: tuple[tuple[str, str], ...]) -> str:
+    """Camada da amostra: a do frame da aplicação mais interno."""
+    for modulo, funcao in reversed(pilha):
+        if modulo.startswith(_MODULOS_DE_SERIALIZACAO) or funcao in _FUNCOES_DE_SERIALIZACAO:
+            return "serializacao"
+        for camada, pacote in _PACOTES_DE_CAMADA:
+            if pacote in f".{modulo}.":
+                return camada
+    return "outros"
+
+def pilha_suspensa(coro) -> list[tuple[str, str]]:
+    """Segue a cadeia de awaits de uma corrotina parada até o que ela espera."""
+    pilha = []
+    while True:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            # Future, Event, leitura de socket: tempo esperando, não executando
+            pilha.append(AGUARDANDO)
+            return pilha
+        pilha.append(rotulo(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+
+def pilha_em_execucao(frame, coro) -> list[tuple[str, str]]:
+    """Pilha da thread do loop, cortada a partir da corrotina da task."""
+    raiz = getattr(coro, "cr_frame", None)
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        if frame is raiz:
+            break
+        frame = frame.f_back
+    return [rotulo(f) for f in reversed(frames)]
+
+class Perfil:
+    def __init__(self, id: int, metodo: str, rota: str, intervalo_ms: float, motivo: str):
+        self.id = id
+        self.metodo = metodo
+        self.rota = rota
+        self.intervalo_ms = intervalo_ms
+        self.motivo = motivo
+        self.inicio = datetime.now(timezone.utc)
+        self.duracao_ms = None
+        self.status = None
+        self.pilhas = Counter()
+        self.camadas = Counter()
+
+    def registrar(self, pilha: list[tuple[str, str]]):
+        if not pilha:
+            return
+        pilha = tuple(pilha)
+        self.pilhas[pilha] += 1
+        self.camadas[classificar(pilha)] += 1
+
+    @property
+    def amostras(self) -> int:
+        return sum(self.pilhas.values())
+
+    def resumo(self) -> dict:
+        return {
+            "id": self.id,
+            "metodo": self.metodo,
+            "rota": self.rota,
+            "motivo": self.motivo,
+            "inicio": self.inicio.isoformat(),
+            "duracao_ms": self.duracao_ms,
+            "status": self.status,
+            "amostras": self.amostras,
+        }
+
+    def detalhe(self) -> dict:
+        amostras = self.amostras or 1
+        return {
+            **self.resumo(),
+            "intervalo_ms": self.intervalo_ms,
+            "camadas": {
+                camada: {
+                    "amostras": self.camadas[camada],
+                    "ms": round(self.camadas[camada] * self.intervalo_ms, 1),
+                    "percentual": round(100 * self.camadas[camada] / amostras, 1),
+                }
+                for camada in CAMADAS
+            },
+        }
+
+    def folded(self) -> str:
+        """Formato "a;b;c contagem" aceito por flamegraph.pl e speedscope."""
+        linhas = []
+        for pilha, contagem in self.pilhas.most_common():
+            quadros = ";".join(f"{modulo}:{funcao}" if funcao else modulo for modulo, funcao in pilha)
+            linhas.append(f"{quadros} {contagem}")
+        return "\n".join(linhas) + "\n" if linhas else ""
+
+class Amostrador:
+    """Amostra periodicamente as pilhas das tasks sendo perfiladas.
+
+    Roda numa thread própria que só existe enquanto há requisição perfilada,
+    então o custo fora delas é zero. A task em execução no momento é lida da
+    pilha da thread do loop; as suspensas, da cadeia de awaits.
+    """
+
+    def __init__(self, intervalo_ms: float):
+        self.intervalo_ms = intervalo_ms
+        self._ativos = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def iniciar(self, perfil: Perfil) -> asyncio.Task:
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._ativos[task] = (perfil, loop, threading.get_ident())
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, name="profiler", daemon=True)
+                self._thread.start()
+        return task
+
+    def parar(self, task: asyncio.Task):
+        # Com o lock, nenhuma amostra chega depois que o perfil foi fechado
+        with self._lock:
+            self._ativos.pop(task, None)
+
+    def amostrar(self):
+        frames = sys._current_frames()
+        for task, (perfil, loop, thread_id) in self._ativos.items():
+            coro = task.get_coro()
+            if asyncio.current_task(loop) is task and thread_id in frames:
+                perfil.registrar(pilha_em_execucao(frames[thread_id], coro))
+            else:
+                perfil.registrar(pilha_suspensa(coro))
+
+    def _executar(self):
+        while True:
+            time.sleep(self.intervalo_ms / 1000)
+            with self._lock:
+                if not self._ativos:
+                    self._thread = None
+                    return
+                self.amostrar()
+
+class ProfileStore:
+    """Últimos perfis do processo, em memória."""
+
+    def __init__(self, max_perfis: int):
+        self.perfis = deque(maxlen=max_perfis)
+        self._ids = itertools.count(1)
+
+    def novo(self, metodo: str, rota: str, intervalo_ms: float, motivo: str) -> Perfil:
+        return Perfil(next(self._ids), metodo, rota, intervalo_ms, motivo)
+
+    def adicionar(self, perfil: Perfil):
+        self.perfis.append(perfil)
+
+    def listar(self) -> list[dict]:
+        return [perfil.resumo() for perfil in reversed(self.perfis)]
+
+    def obter(self, perfil_id: int) -> Perfil | None:
+        return next((perfil for perfil in self.perfis if perfil.id == perfil_id), None)
+
+class ProfilingMiddleware:
+    """Perfila requisições escolhidas por taxa de amostragem ou por header.
+
+    PROFILING_ROUTES define a porcentagem de requisições perfiladas por rota;
+    o header X-Profile: 1 força o perfil de uma requisição, desde que venha
+    com o X-Debug-Token válido. O id do perfil volta em X-Profile-Id.
+    """
+
+    def __init__(self, app, rules: list[tuple[str, float]] | None = None, store: ProfileStore | None = None, amostrador: Amostrador | None = None):
+        self.app = app
+        if rules is None:
+            rules = [(rota, float(taxa)) for rota, taxa in parse_route_rules(settings.profiling_routes)]
+        self.rules = rules
+        self.store = profile_store if store is None else store
+        self.amostrador = amostrador or Amostrador(settings.profiling_interval_ms)
+
+    def motivo(self, scope) -> str | None:
+        headers = dict(scope["headers"])
+        if headers.get(PROFILE_HEADER) == b"1" and token_valido(headers.get(DEBUG_TOKEN_HEADER, b"").decode("latin-1")):
+            return "header"
+        for pattern, taxa in self.rules:
+            if route_matches(pattern, scope["method"], scope["path"]):
+                return "amostragem" if random.random() * 100 < taxa else None
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        motivo = self.motivo(scope)
+        if motivo is None:
+            return await self.app(scope, receive, send)
+        perfil = self.store.novo(scope["method"], scope["path"], self.amostrador.intervalo_ms, motivo)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                perfil.status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, str(perfil.id).encode())]
+            await send(message)
+
+        task = self.amostrador.iniciar(perfil)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.amostrador.parar(task)
+            perfil.duracao_ms = round((time.perf_counter() - inicio) * 1000, 1)
+            self.store.adicionar(perfil)
+
+profile_store = ProfileStore(settings.profiling_max_profiles)
@@ -0,0 +1,49 @@
+from shared.middlewares.metrics import rota
+from shared.utils.tracing import formatar_traceparent, ler_traceparent, span_atual, tracer
+
+TRACEPARENT_HEADER = b"traceparent"
+TRACESTATE_HEADER = b"tracestate"
+# Trace Context nível 2: devolve ao cliente o trace em que a requisição entrou
+TRACERESPONSE_HEADER = b"traceresponse"
+
+class TracingMiddleware:
+    """Abre o span raiz de cada requisição.
+
+    Continua o trace de um ``traceparent`` recebido (W3C Trace Context) ou
+    começa um novo; os spans de handler, service, repositório e SQL ficam
+    pendurados nele pelo contexto da task.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.ativo:
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        remoto = ler_traceparent(headers.get(TRACEPARENT_HEADER, b"").decode("latin-1"))
+        atributos = {"http.method": scope["method"], "http.target": scope["path"]}
+        if remoto and TRACESTATE_HEADER in headers:
+            atributos["tracestate"] = headers[TRACESTATE_HEADER].decode("latin-1")
+        span = tracer.abrir(scope["method"], "http", atributos, remoto=remoto)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.atributos["http.status_code"] = message["status"]
+                valor = formatar_traceparent(span.trace_id, span.span_id).encode()
+                message["headers"] = [*message.get("headers", []), (TRACERESPONSE_HEADER, valor)]
+            await send(message)
+
+        token = span_atual.set(span)
+        erro = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            erro = exc
+            raise
+        finally:
+            span_atual.reset(token)
+            template = rota(scope)
+            span.nome = f"{scope['method']} {template}"
+            span.atributos["http.route"] = template
+            tracer.fechar(span, erro)
@@ -0,0 +1,52 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from shared.snapshots.exporter import MANIFEST, load_manifest
+from shared.snapshots.reader import read_snapshot
+
+logger = logging.getLogger(__name__)
+
+class SnapshotCache:
+    """Mantém em memória as tabelas de um snapshot Parquet.
+
+    O manifesto é conferido no máximo a cada ``refresh_s`` segundos; as
+    tabelas só são relidas quando uma nova exportação o reescreve.
+    """
+
+    def __init__(self, destino: str | Path, tabelas: tuple[str, ...], refresh_s: float):
+        self.destino = Path(destino)
+        self.nomes = tabelas
+        self.refresh_s = refresh_s
+        self.tabelas = {}
+        self.execucao = None
+        self._mtime = None
+        self._verificado_em = None
+        self._lock = asyncio.Lock()
+
+    def _fresco(self) -> bool:
+        return self._verificado_em is not None and time.monotonic() - self._verificado_em < self.refresh_s
+
+    async def load(self) -> bool:
+        """Recarrega se preciso. Devolve False se não houver snapshot."""
+        if self._fresco():
+            return bool(self.tabelas)
+        async with self._lock:
+            if self._fresco():
+                return bool(self.tabelas)
+            self._verificado_em = time.monotonic()
+            manifesto = self.destino / MANIFEST
+            if not manifesto.exists():
+                logger.warning("Snapshot indisponível em %s", self.destino)
+                return bool(self.tabelas)
+            mtime = manifesto.stat().st_mtime_ns
+            if mtime != self._mtime:
+                # Leitura do Parquet bloqueia; fica fora do event loop
+                self.tabelas = await asyncio.to_thread(self._read)
+                self.execucao = load_manifest(self.destino)["execucoes"][-1]["id"]
+                self._mtime = mtime
+                logger.info("Snapshot %s carregado de %s", self.execucao, self.destino)
+            return bool(self.tabelas)
+
+    def _read(self) -> dict:
+        return {nome: read_snapshot(self.destino, nome) for nome in self.nomes}
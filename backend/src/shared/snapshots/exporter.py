@@ -0,0 +1,173 @@
+import json
+import logging
+import shutil
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import quote
+from sqlalchemy import BigInteger, DateTime, Float, Integer, SmallInteger, Table, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from modules.produtor.entities.produtor import Produtor
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.safra.entities.safra import Safra
+from modules.cultura.entities.cultura import Cultura
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
+
+try:
+    import pyarrow
+    import pyarrow.parquet as parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "_snapshot.json"
+VERSION_COLUMN = "_versao"
+XID_EPOCH = 1 << 32
+
+class SnapshotTable(NamedTuple):
+    tabela: Table
+    particao: str | None = None
+
+# Particionadas no estilo hive (ano=2025/, estado=MT/), que DuckDB, Arrow e
+# Spark leem direto. O catálogo vai junto para dar nome às culturas.
+SNAPSHOT_TABLES = {
+    "produtores": SnapshotTable(Produtor.__table__),
+    "propriedades": SnapshotTable(Propriedade.__table__, "estado"),
+    "safras": SnapshotTable(Safra.__table__, "ano"),
+    "culturas": SnapshotTable(Cultura.__table__, "ano"),
+    "catalogo_culturas": SnapshotTable(CatalogoCultura.__table__),
+}
+
+def arrow_type(coluna):
+    if isinstance(coluna.type, SmallInteger):
+        return pyarrow.int16()
+    if isinstance(coluna.type, BigInteger):
+        return pyarrow.int64()
+    if isinstance(coluna.type, Integer):
+        return pyarrow.int32()
+    if isinstance(coluna.type, Float):
+        return pyarrow.float64()
+    if isinstance(coluna.type, DateTime):
+        return pyarrow.timestamp("us")
+    return pyarrow.string()
+
+def arrow_schema(spec: SnapshotTable):
+    campos = [pyarrow.field(c.name, arrow_type(c), c.nullable) for c in spec.tabela.columns if c.name != spec.particao]
+    return pyarrow.schema(campos + [pyarrow.field(VERSION_COLUMN, pyarrow.int64(), False)])
+
+def version_expression(xmax: int):
+    """xmin da linha estendido para 64 bits usando a época do snapshot atual.
+
+    O xmin muda a cada insert/update, então serve de marca d'água sem
+    precisar de coluna nova nem de trigger nas tabelas.
+    """
+    base = int(xmax) - int(xmax) % XID_EPOCH
+    xid = "xmin::text::bigint"
+    return literal_column(
+        f"CASE WHEN {base} + {xid} > {int(xmax)} THEN {base - XID_EPOCH} + {xid} ELSE {base} + {xid} END"
+    )
+
+def load_manifest(destino: Path) -> dict:
+    caminho = destino / MANIFEST
+    if not caminho.exists():
+        return {"tabelas": {}, "execucoes": []}
+    return json.loads(caminho.read_text())
+
+class SnapshotExporter:
+    """Exporta as tabelas para Parquet lendo em lotes por cursor no servidor.
+
+    Todas as tabelas saem do mesmo snapshot REPEATABLE READ. Cada execução
+    guarda no manifesto o xmin do snapshot; a próxima execução incremental
+    exporta só as linhas com versão a partir dele. Linhas repetidas entre
+    execuções são resolvidas na leitura pela maior ``_versao``. Exclusões
+    lógicas chegam nas incrementais pelo ``excluido_em``, e a leitura já
+    descarta essas linhas; a linha purgada só some dos arquivos numa
+    execução completa.
+    """
+
+    def __init__(self, engine: AsyncEngine, destino: str | Path, batch_size: int = 10000):
+        if pyarrow is None:
+            raise RuntimeError("pyarrow não está instalado")
+        self.engine = engine
+        self.destino = Path(destino)
+        self.batch_size = batch_size
+
+    async def export(self, completo: bool = False) -> dict:
+        self.destino.mkdir(parents=True, exist_ok=True)
+        manifesto = load_manifest(self.destino)
+        completo = completo or not manifesto["execucoes"]
+        execucao = datetime.utcnow().strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+        temporario = self.destino / f".tmp-{execucao}"
+        linhas = {}
+        try:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="REPEATABLE READ")
+                async with conn.begin():
+                    xmin, xmax = (await conn.execute(text(
+                        "SELECT pg_snapshot_xmin(s)::text::bigint, pg_snapshot_xmax(s)::text::bigint "
+                        "FROM pg_current_snapshot() s"
+                    ))).one()
+                    for nome, spec in SNAPSHOT_TABLES.items():
+                        marca = None if completo else manifesto["tabelas"].get(nome, {}).get("marca")
+                        linhas[nome] = await self.export_table(conn, spec, temporario / nome, marca, xmax, execucao)
+            self.publish(temporario, completo)
+        finally:
+            shutil.rmtree(temporario, ignore_errors=True)
+
+        for nome in linhas:
+            # Linhas de transações ainda abertas no snapshot têm xid >= xmin
+            manifesto["tabelas"][nome] = {"marca": xmin}
+        if completo:
+            manifesto["execucoes"] = []
+        resumo = {"id": execucao, "completo": completo, "linhas": linhas}
+        manifesto["execucoes"].append(resumo)
+        (self.destino / MANIFEST).write_text(json.dumps(manifesto, indent=2))
+        logger.info("Snapshot %s exportado: %s", execucao, linhas)
+        return resumo
+
+    async def export_table(self, conn: AsyncConnection, spec: SnapshotTable, pasta: Path, marca: int | None, xmax: int, execucao: str) -> int:
+        versao = version_expression(xmax)
+        query = select(*spec.tabela.columns, versao.label(VERSION_COLUMN))
+        if marca is not None:
+            query = query.where(versao >= marca)
+        schema = arrow_schema(spec)
+        writers = {}
+        total = 0
+        result = await conn.stream(query.execution_options(yield_per=self.batch_size))
+        try:
+            async for lote in result.mappings().partitions(self.batch_size):
+                grupos = {}
+                for row in lote:
+                    linha = dict(row)
+                    valor = linha.pop(spec.particao) if spec.particao else None
+                    grupos.setdefault(valor, []).append(linha)
+                for valor, grupo in grupos.items():
+                    writer = writers.get(valor)
+                    if writer is None:
+                        subpasta = pasta / f"{spec.particao}={quote(str(valor), safe='')}" if spec.particao else pasta
+                        subpasta.mkdir(parents=True, exist_ok=True)
+                        writer = writers[valor] = parquet.ParquetWriter(subpasta / f"part-{execucao}.parquet", schema)
+                    writer.write_table(pyarrow.Table.from_pylist(grupo, schema=schema))
+                total += len(lote)
+        finally:
+            for writer in writers.values():
+                writer.close()
+        return total
+
+    def publish(self, temporario: Path, completo: bool):
+        """Move os arquivos da execução para o destino só depois que todas
+        as tabelas foram lidas, para que uma falha não deixe meio snapshot."""
+        for nome in SNAPSHOT_TABLES:
+            origem = temporario / nome
+            alvo = self.destino / nome
+            if completo:
+                shutil.rmtree(alvo, ignore_errors=True)
+                if origem.exists():
+                    origem.rename(alvo)
+                continue
+            for arquivo in origem.rglob("*.parquet"):
+                final = alvo / arquivo.relative_to(origem)
+                final.parent.mkdir(parents=True, exist_ok=True)
+                arquivo.rename(final)
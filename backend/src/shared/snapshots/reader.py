@@ -0,0 +1,44 @@
+from pathlib import Path
+from shared.snapshots.exporter import SNAPSHOT_TABLES, VERSION_COLUMN, arrow_schema, arrow_type
+
+try:
+    import pyarrow
+    import pyarrow.compute as compute
+    import pyarrow.dataset as dataset
+except ImportError:
+    pyarrow = None
+
+def read_snapshot(destino: str | Path, nome: str):
+    """Lê uma tabela exportada como ``pyarrow.Table``, já com a coluna de
+    partição de volta, só a versão mais recente de cada id e sem as linhas
+    excluídas logicamente."""
+    if pyarrow is None:
+        raise RuntimeError("pyarrow não está instalado")
+    spec = SNAPSHOT_TABLES[nome]
+    schema = arrow_schema(spec)
+    particionamento = None
+    if spec.particao:
+        campo = pyarrow.field(spec.particao, arrow_type(spec.tabela.columns[spec.particao]))
+        schema = schema.append(campo)
+        particionamento = dataset.partitioning(pyarrow.schema([campo]), flavor="hive")
+    pasta = Path(destino) / nome
+    if not pasta.exists():
+        return schema.empty_table()
+    tabela = dataset.dataset(pasta, format="parquet", partitioning=particionamento).to_table()
+    return sem_excluidas(latest_versions(tabela))
+
+def latest_versions(tabela):
+    """Execuções incrementais podem repetir um id; fica a maior ``_versao``."""
+    if tabela.num_rows == 0:
+        return tabela
+    tabela = tabela.sort_by([("id", "ascending"), (VERSION_COLUMN, "descending")])
+    ids = tabela.column("id").combine_chunks()
+    novos = compute.not_equal(ids.slice(1), ids.slice(0, len(ids) - 1))
+    return tabela.filter(pyarrow.concat_arrays([pyarrow.array([True]), novos]))
+
+def sem_excluidas(tabela):
+    """A exclusão lógica chega como uma versão nova com ``excluido_em``; a
+    linha some do snapshot já aí, sem esperar a purga e a execução completa."""
+    if "excluido_em" not in tabela.schema.names:
+        return tabela
+    return tabela.filter(compute.is_null(tabela.column("excluido_em")))
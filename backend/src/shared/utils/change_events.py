@@ -0,0 +1,19 @@
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Ouvintes por entidade ("propriedade", "cultura", ...), chamados depois do
+# commit de cada escrita feita por este processo
+_listeners: dict[str, list[Callable[[str, str, int], None]]] = {}
+
+def subscribe(entidade: str, callback: Callable[[str, str, int], None]):
+    _listeners.setdefault(entidade, []).append(callback)
+
+def publish(entidade: str, operacao: str, entidade_id: int):
+    for callback in _listeners.get(entidade, ()):
+        try:
+            callback(entidade, operacao, entidade_id)
+        except Exception:
+            # Um ouvinte com problema não pode desfazer a resposta da escrita
+            logger.exception("Falha no ouvinte de %s", entidade)
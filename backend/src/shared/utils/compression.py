@@ -0,0 +1,105 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class GzipEncoder:
+    name = "gzip"
+    default_level = 6
+
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+class BrotliEncoder:
+    name = "br"
+    default_level = 4
+
+    def __init__(self, level: int):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+class ZstdEncoder:
+    name = "zstd"
+    default_level = 3
+
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+# Em ordem de preferência do servidor quando o cliente aceita mais de um
+ENCODERS = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+ENCODERS["gzip"] = GzipEncoder
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    aceitos = {}
+    for item in header.split(","):
+        nome, _, params = item.strip().partition(";")
+        if not nome:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            chave, _, valor = param.strip().partition("=")
+            if chave == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        aceitos[nome.strip().lower()] = q
+    return aceitos
+
+def negotiate(header: str, disponiveis=ENCODERS) -> str | None:
+    aceitos = parse_accept_encoding(header)
+    coringa = aceitos.get("*", 0.0)
+    melhor, melhor_q = None, 0.0
+    for nome in disponiveis:
+        q = aceitos.get(nome, coringa)
+        if q > melhor_q:
+            melhor, melhor_q = nome, q
+    return melhor
+
+def parse_levels(spec: str) -> dict[str, int]:
+    """Lê níveis no formato "gzip:6,br:4,zstd:3"."""
+    niveis = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        nome, _, nivel = item.partition(":")
+        try:
+            niveis[nome.strip()] = int(nivel)
+        except ValueError:
+            raise ValueError(f"Nível de compressão inválido: {item!r}")
+    return niveis
@@ -0,0 +1,9 @@
+from fastapi import Response
+from shared.database.counts import Contagem
+
+def set_count_headers(response: Response, contagem: Contagem):
+    if contagem.estimado:
+        response.headers["X-Total-Count-Estimate"] = str(contagem.total)
+        response.headers["X-Total-Count-Modified"] = str(contagem.modificadas)
+    else:
+        response.headers["X-Total-Count"] = str(contagem.total)
@@ -0,0 +1,18 @@
+import time
+from contextvars import ContextVar
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+def set_deadline(deadline: float | None):
+    return _deadline.set(deadline)
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+def current_deadline() -> float | None:
+    return _deadline.get()
+
+def remaining_ms(deadline: float | None) -> int | None:
+    if deadline is None:
+        return None
+    return int((deadline - time.monotonic()) * 1000)
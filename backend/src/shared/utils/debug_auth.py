@@ -0,0 +1,15 @@
+import secrets
+from fastapi import Header, HTTPException
+from shared.config.settings import settings
+
+DEBUG_TOKEN_HEADER = b"x-debug-token"
+
+def token_valido(token: str | None) -> bool:
+    # Sem DEBUG_TOKEN configurado nada é liberado
+    if not settings.debug_token or not token:
+        return False
+    return secrets.compare_digest(token.encode(), settings.debug_token.encode())
+
+def require_debug_token(x_debug_token: str | None = Header(None)):
+    if not token_valido(x_debug_token):
+        raise HTTPException(status_code=403, detail="Token de debug ausente ou inválido")
@@ -0,0 +1,66 @@
+import re
+from shared.utils.validators import digitos_cnpj, digitos_cpf, validar_cnpj, validar_cpf
+
+TIPO_CPF = 1
+TIPO_CNPJ = 2
+
+_PONTUACAO = re.compile(r"[.\-/\s]")
+_BASE36 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+def _base36(valor: int, largura: int) -> str:
+    caracteres = []
+    for _ in range(largura):
+        valor, resto = divmod(valor, 36)
+        caracteres.append(_BASE36[resto])
+    return "".join(reversed(caracteres))
+
+class DocumentoFiscal(str):
+    """CPF ou CNPJ na forma canônica: maiúsculas, sem pontuação.
+
+    No banco vira o par (tipo, chave). A chave é o documento sem os
+    dígitos verificadores, que se recalculam a partir dela: os 9 números
+    do CPF como inteiro, ou os 12 caracteres do CNPJ (numérico ou
+    alfanumérico) em base 36 — nos dois casos cabe num BIGINT.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, valor: str) -> "DocumentoFiscal":
+        canonico = _PONTUACAO.sub("", valor).upper()
+        if len(canonico) == 11:
+            if not canonico.isdigit() or not validar_cpf(canonico):
+                raise ValueError("CPF inválido")
+        elif len(canonico) == 14:
+            if not validar_cnpj(canonico):
+                raise ValueError("CNPJ inválido")
+        else:
+            raise ValueError("CPF ou CNPJ deve ter 11 ou 14 caracteres")
+        return cls(canonico)
+
+    @classmethod
+    def from_chave(cls, tipo: int | None, chave: int | None) -> "DocumentoFiscal | None":
+        if tipo is None or chave is None:
+            return None
+        if tipo == TIPO_CPF:
+            base = f"{chave:09d}"
+            return cls(base + digitos_cpf(base))
+        base = _base36(chave, 12)
+        return cls(base + digitos_cnpj(base))
+
+    @property
+    def tipo(self) -> int:
+        return TIPO_CPF if len(self) == 11 else TIPO_CNPJ
+
+    @property
+    def chave(self) -> int:
+        return int(self[:9]) if self.tipo == TIPO_CPF else int(self[:12], 36)
+
+    @property
+    def formatado(self) -> str:
+        if self.tipo == TIPO_CPF:
+            return f"{self[:3]}.{self[3:6]}.{self[6:9]}-{self[9:]}"
+        return f"{self[:2]}.{self[2:5]}.{self[5:8]}/{self[8:12]}-{self[12:]}"
+
+    def __composite_values__(self):
+        return self.tipo, self.chave
@@ -0,0 +1,30 @@
+import functools
+import inspect
+from contextvars import ContextVar
+from shared.utils.tracing import tracer
+
+# "Classe.metodo" mais interno em execução (repositório ou service); os
+# hooks da engine leem daqui para atribuir cada statement
+operacao_atual: ContextVar[str | None] = ContextVar("operacao_atual", default=None)
+
+def _envolver(metodo, rotulo: str, camada: str):
+    @functools.wraps(metodo)
+    async def wrapper(*args, **kwargs):
+        token = operacao_atual.set(rotulo)
+        try:
+            if not tracer.ativo:
+                return await metodo(*args, **kwargs)
+            return await tracer.executar(tracer.abrir(rotulo, camada), metodo, *args, **kwargs)
+        finally:
+            operacao_atual.reset(token)
+
+    return wrapper
+
+def instrumentado(cls):
+    """Marca os métodos assíncronos públicos da classe em ``operacao_atual`` e,
+    com tracing ligado, abre um span por chamada na camada do módulo."""
+    camada = "service" if ".services." in f".{cls.__module__}." else "repository"
+    for nome, metodo in list(vars(cls).items()):
+        if not nome.startswith("_") and inspect.iscoroutinefunction(metodo):
+            setattr(cls, nome, _envolver(metodo, f"{cls.__name__}.{nome}", camada))
+    return cls
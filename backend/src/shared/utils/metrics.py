@@ -0,0 +1,142 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import defaultdict
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Segundos; cobre de respostas em cache até o prazo padrão das rotas
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _formatar_rotulos(nomes: tuple[str, ...], valores: tuple) -> str:
+    if not nomes:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)) + "}"
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+class Metrica(ABC):
+    """Série com rótulos, no formato de exposição do Prometheus.
+
+    Sem locks: as atualizações acontecem no event loop, e um ``+=`` num
+    dict é atômico o bastante para o valor lido no scrape.
+    """
+
+    tipo = "untyped"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = (), registro=None):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        (registro_padrao if registro is None else registro).registrar(self)
+
+    @abstractmethod
+    def amostras(self):
+        """Tuplas ``(sufixo, rótulos, valores, valor)``."""
+
+    def renderizar(self) -> list[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for sufixo, nomes, valores, valor in self.amostras():
+            linhas.append(f"{self.nome}{sufixo}{_formatar_rotulos(nomes, valores)} {_numero(valor)}")
+        return linhas
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.valores = defaultdict(float)
+
+    def inc(self, *rotulos, valor: float = 1.0):
+        self.valores[rotulos] += valor
+
+    def amostras(self):
+        for rotulos, valor in list(self.valores.items()):
+            yield "", self.rotulos, rotulos, valor
+
+class Medidor(Metrica):
+    """Gauge; com ``coletar`` o valor é lido na hora do scrape."""
+
+    tipo = "gauge"
+
+    def __init__(self, *args, coletar=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.valores = defaultdict(float)
+        self.coletar = coletar
+
+    def set(self, valor: float, *rotulos):
+        self.valores[rotulos] = valor
+
+    def inc(self, *rotulos, valor: float = 1.0):
+        self.valores[rotulos] += valor
+
+    def dec(self, *rotulos, valor: float = 1.0):
+        self.valores[rotulos] -= valor
+
+    def amostras(self):
+        valores = self.coletar() if self.coletar else self.valores
+        for rotulos, valor in list(valores.items()):
+            yield "", self.rotulos, rotulos, valor
+
+class Histograma(Metrica):
+    tipo = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = BUCKETS_LATENCIA, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}
+
+    def observar(self, valor: float, *rotulos):
+        serie = self.series.get(rotulos)
+        if serie is None:
+            # Contagens por faixa (a última é +Inf), soma e total
+            serie = self.series[rotulos] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0][bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+
+    def amostras(self):
+        nomes_bucket = self.rotulos + ("le",)
+        for rotulos, (contagens, soma) in list(self.series.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += contagem
+                yield "_bucket", nomes_bucket, rotulos + ("+Inf" if limite == float("inf") else _numero(limite),), acumulado
+            yield "_sum", self.rotulos, rotulos, soma
+            yield "_count", self.rotulos, rotulos, acumulado
+
+class Registro:
+    def __init__(self):
+        self.metricas = {}
+
+    def registrar(self, metrica: Metrica):
+        if metrica.nome in self.metricas:
+            raise ValueError(f"Métrica duplicada: {metrica.nome}")
+        self.metricas[metrica.nome] = metrica
+
+    def renderizar(self) -> str:
+        linhas = []
+        for metrica in self.metricas.values():
+            linhas.extend(metrica.renderizar())
+        return "\n".join(linhas) + "\n"
+
+registro_padrao = Registro()
+
+cache_consultas = Contador(
+    "cache_lookups_total", "Consultas aos caches em memória, por resultado (hit/miss)", ("cache", "resultado")
+)
+
+def _taxas_de_acerto() -> dict:
+    totais = defaultdict(lambda: [0.0, 0.0])
+    for (cache, resultado), valor in list(cache_consultas.valores.items()):
+        totais[(cache,)][resultado == "hit"] += valor
+    return {cache: acertos / (acertos + erros) for cache, (erros, acertos) in totais.items() if acertos + erros}
+
+cache_taxa_de_acerto = Medidor(
+    "cache_hit_ratio", "Fração das consultas ao cache atendidas sem ir ao banco", ("cache",), coletar=_taxas_de_acerto
+)
+
+def registrar_consulta_ao_cache(cache: str, acerto: bool):
+    cache_consultas.inc(cache, "hit" if acerto else "miss")
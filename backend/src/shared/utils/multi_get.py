@@ -0,0 +1,14 @@
+from shared.config.settings import settings
+
+def parse_ids(valor: str) -> list[int]:
+    """Ids de ``?ids=1,2,3``, sem repetição e na ordem pedida."""
+    try:
+        ids = [int(parte) for parte in valor.split(",") if parte.strip()]
+    except ValueError:
+        raise ValueError("ids deve ser uma lista de inteiros separados por vírgula")
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError("Informe ao menos um id")
+    if len(ids) > settings.multi_get_max_ids:
+        raise ValueError(f"No máximo {settings.multi_get_max_ids} ids por requisição")
+    return ids
@@ -0,0 +1,14 @@
+from fnmatch import fnmatchcase
+
+def parse_route_rules(spec: str) -> list[tuple[str, str]]:
+    """Lê regras no formato "METODO /rota=valor", separadas por ";"."""
+    rules = []
+    for item in filter(None, (part.strip() for part in spec.split(";"))):
+        rota, sep, valor = item.rpartition("=")
+        if not sep or not rota.strip() or not valor.strip():
+            raise ValueError(f"Regra de rota inválida: {item!r}")
+        rules.append((" ".join(rota.split()), valor.strip()))
+    return rules
+
+def route_matches(pattern: str, method: str, path: str) -> bool:
+    return fnmatchcase(f"{method} {path}", pattern)
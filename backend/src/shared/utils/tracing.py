@@ -0,0 +1,225 @@
+import asyncio
+import importlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from fastapi.routing import APIRoute
+from shared.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+def novo_trace_id() -> str:
+    return os.urandom(16).hex()
+
+def novo_span_id() -> str:
+    return os.urandom(8).hex()
+
+def ler_traceparent(valor: str | None) -> tuple[str, str] | None:
+    """``(trace_id, span_id)`` de um header W3C traceparent válido."""
+    if not valor:
+        return None
+    casado = TRACEPARENT.match(valor.strip().lower())
+    if not casado or casado.group(1) == "0" * 32 or casado.group(2) == "0" * 16:
+        return None
+    return casado.group(1), casado.group(2)
+
+def formatar_traceparent(trace_id: str, span_id: str) -> str:
+    return f"00-{trace_id}-{span_id}-01"
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "pai_id", "nome", "camada", "inicio_ns", "fim_ns", "atributos", "erro")
+
+    def __init__(self, nome: str, camada: str, trace_id: str, pai_id: str | None, atributos: dict | None = None):
+        self.trace_id = trace_id
+        self.span_id = novo_span_id()
+        self.pai_id = pai_id
+        self.nome = nome
+        self.camada = camada
+        self.inicio_ns = time.time_ns()
+        self.fim_ns = None
+        self.atributos = atributos or {}
+        self.erro = None
+
+    @property
+    def duracao_ms(self) -> float | None:
+        return None if self.fim_ns is None else (self.fim_ns - self.inicio_ns) / 1e6
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "pai_id": self.pai_id,
+            "nome": self.nome,
+            "camada": self.camada,
+            "inicio_ns": self.inicio_ns,
+            "duracao_ms": self.duracao_ms,
+            "atributos": self.atributos,
+            "erro": self.erro,
+        }
+
+span_atual: ContextVar[Span | None] = ContextVar("span_atual", default=None)
+
+class MemoriaExporter:
+    """Últimos traces do processo, para /debug/traces."""
+
+    def __init__(self, max_traces: int | None = None):
+        self.max_traces = settings.tracing_max_traces if max_traces is None else max_traces
+        self.traces = OrderedDict()
+
+    def exportar(self, span: Span):
+        spans = self.traces.get(span.trace_id)
+        if spans is None:
+            spans = self.traces[span.trace_id] = []
+            if len(self.traces) > self.max_traces:
+                self.traces.popitem(last=False)
+        spans.append(span)
+
+    def listar(self) -> list[dict]:
+        resumo = []
+        for trace_id, spans in reversed(self.traces.items()):
+            raiz = min(spans, key=lambda span: span.inicio_ns)
+            resumo.append({"trace_id": trace_id, "raiz": raiz.nome, "duracao_ms": raiz.duracao_ms, "spans": len(spans)})
+        return resumo
+
+    def obter(self, trace_id: str) -> list[dict] | None:
+        spans = self.traces.get(trace_id)
+        return None if spans is None else [span.to_dict() for span in sorted(spans, key=lambda span: span.inicio_ns)]
+
+class ArquivoExporter:
+    """Um span por linha, em JSON, para análise local (jq, pandas).
+
+    Dentro do event loop a escrita vai para uma thread (``asyncio.to_thread``),
+    uma por vez; o que chegar enquanto ela grava sai na escrita seguinte.
+    """
+
+    def __init__(self, caminho: str | None = None):
+        self.caminho = caminho or settings.tracing_file
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._gravando = None
+
+    def exportar(self, span: Span):
+        self._buffer.append(json.dumps(span.to_dict(), default=str))
+        # Flush a cada requisição: o span http é o último a fechar
+        if span.camada == "http" or len(self._buffer) >= 512:
+            self._agendar_flush()
+
+    def _agendar_flush(self):
+        if self._gravando is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        self._gravando = loop.create_task(asyncio.to_thread(self.flush))
+        self._gravando.add_done_callback(self._fim_do_flush)
+
+    def _fim_do_flush(self, tarefa):
+        self._gravando = None
+        if not tarefa.cancelled() and tarefa.exception() is not None:
+            logger.warning("Falha ao gravar spans em %s", self.caminho, exc_info=tarefa.exception())
+        elif self._buffer:
+            self._agendar_flush()
+
+    def flush(self):
+        with self._lock:
+            linhas = []
+            while self._buffer:
+                linhas.append(self._buffer.popleft())
+            if linhas:
+                with open(self.caminho, "a", encoding="utf-8") as arquivo:
+                    arquivo.write("\n".join(linhas) + "\n")
+
+    async def encerrar(self):
+        """Espera a escrita em curso e grava o que sobrou no buffer."""
+        if self._gravando is not None:
+            await asyncio.gather(self._gravando, return_exceptions=True)
+        await asyncio.to_thread(self.flush)
+
+EXPORTERS = {"memoria": MemoriaExporter, "arquivo": ArquivoExporter}
+
+def criar_exporter(nome: str):
+    """"memoria", "arquivo" ou "pacote.modulo:Classe"; vazio desliga o tracing."""
+    if not nome:
+        return None
+    if nome in EXPORTERS:
+        return EXPORTERS[nome]()
+    modulo, sep, classe = nome.partition(":")
+    if not sep:
+        raise ValueError(f"Exporter de tracing inválido: {nome!r}")
+    return getattr(importlib.import_module(modulo), classe)()
+
+class Tracer:
+    """Abre spans aninhados pelo contexto da requisição.
+
+    Sem exporter configurado ``ativo`` é falso e quem instrumenta nem chega
+    a criar o span, então o custo desligado é um teste de atributo.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def ativo(self) -> bool:
+        return self.exporter is not None
+
+    def abrir(self, nome: str, camada: str, atributos: dict | None = None, remoto: tuple[str, str] | None = None) -> Span:
+        """Span filho do atual; sem span atual, continua o trace ``remoto`` ou começa um novo."""
+        pai = span_atual.get()
+        if pai is not None:
+            return Span(nome, camada, pai.trace_id, pai.span_id, atributos)
+        trace_id, pai_id = remoto or (novo_trace_id(), None)
+        return Span(nome, camada, trace_id, pai_id, atributos)
+
+    def fechar(self, span: Span, erro: BaseException | None = None):
+        span.fim_ns = time.time_ns()
+        if erro is not None:
+            span.erro = type(erro).__name__
+        exporter = self.exporter
+        if exporter is not None:
+            exporter.exportar(span)
+
+    async def encerrar(self):
+        """No shutdown, para exporters que bufferizam (``encerrar`` opcional)."""
+        encerrar = getattr(self.exporter, "encerrar", None)
+        if encerrar is not None:
+            await encerrar()
+
+    async def executar(self, span: Span, funcao, *args, **kwargs):
+        """Executa a corrotina com ``span`` como span atual."""
+        token = span_atual.set(span)
+        try:
+            resultado = await funcao(*args, **kwargs)
+        except BaseException as exc:
+            self.fechar(span, exc)
+            raise
+        finally:
+            span_atual.reset(token)
+        self.fechar(span)
+        return resultado
+
+tracer = Tracer(criar_exporter(settings.tracing_exporter))
+
+class RotaInstrumentada(APIRoute):
+    """Rota que abre um span "handler" em volta do endpoint, das
+    dependências e da serialização da resposta."""
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        nome = f"{self.endpoint.__module__.rsplit('.', 1)[-1]}.{self.endpoint.__name__}"
+
+        async def instrumentado(request):
+            if not tracer.ativo:
+                return await handler(request)
+            span = tracer.abrir(nome, "controller", {"http.route": self.path})
+            return await tracer.executar(span, handler, request)
+
+        return instrumentado
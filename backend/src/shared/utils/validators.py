@@ -1,25 +1,36 @@
 import re
 
-def validar_cpf(cpf: str) -> bool:
-    cpf = re.sub(r'[^0-9]', '', cpf)
-    if len(cpf) != 11 or cpf == cpf[0] * 11:
-        return False
-    soma = sum(int(cpf[i]) * (10 - i) for i in range(9))
+def digitos_cpf(base: str) -> str:
+    """Dígitos verificadores dos 9 primeiros números de um CPF."""
+    soma = sum(int(base[i]) * (10 - i) for i in range(9))
     dig1 = ((soma * 10) % 11) % 10
-    soma = sum(int(cpf[i]) * (11 - i) for i in range(10))
+    soma = sum(int(c) * (11 - i) for i, c in enumerate(base + str(dig1)))
     dig2 = ((soma * 10) % 11) % 10
-    return dig1 == int(cpf[9]) and dig2 == int(cpf[10])
+    return f"{dig1}{dig2}"
 
-def validar_cnpj(cnpj: str) -> bool:
-    cnpj = re.sub(r'[^0-9]', '', cnpj)
-    if len(cnpj) != 14 or cnpj == cnpj[0] * 14:
-        return False
+def digitos_cnpj(base: str) -> str:
+    """Dígitos verificadores dos 12 primeiros caracteres de um CNPJ.
+
+    Cada caractere vale seu código ASCII menos 48, como no CNPJ
+    alfanumérico; para os só numéricos dá o cálculo de sempre.
+    """
     pesos1 = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
     pesos2 = [6] + pesos1
-    soma1 = sum(int(cnpj[i]) * pesos1[i] for i in range(12))
-    dig1 = 11 - soma1 % 11
+    valores = [ord(c) - 48 for c in base]
+    dig1 = 11 - sum(v * p for v, p in zip(valores, pesos1)) % 11
     dig1 = dig1 if dig1 < 10 else 0
-    soma2 = sum(int(cnpj[i]) * pesos2[i] for i in range(13))
-    dig2 = 11 - soma2 % 11
+    dig2 = 11 - sum(v * p for v, p in zip(valores + [dig1], pesos2)) % 11
     dig2 = dig2 if dig2 < 10 else 0
-    return dig1 == int(cnpj[12]) and dig2 == int(cnpj[13]) 
\ No newline at end of file
+    return f"{dig1}{dig2}"
+
+def validar_cpf(cpf: str) -> bool:
+    cpf = re.sub(r'[^0-9]', '', cpf)
+    if len(cpf) != 11 or cpf == cpf[0] * 11:
+        return False
+    return digitos_cpf(cpf[:9]) == cpf[9:]
+
+def validar_cnpj(cnpj: str) -> bool:
+    cnpj = re.sub(r'[^0-9A-Za-z]', '', cnpj).upper()
+    if not re.fullmatch(r'[0-9A-Z]{12}[0-9]{2}', cnpj) or cnpj == cnpj[0] * 14:
+        return False
+    return digitos_cnpj(cnpj[:12]) == cnpj[12:]
@@ -1,10 +1,17 @@
 import pytest
 import asyncio
 from httpx import AsyncClient
+from sqlalchemy import MetaData, insert
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from shared.database.base import Base
-from shared.database.session import get_session
+from shared.database.partitions import ensure_default_partitions
+from shared.database.session import get_session, get_read_db
+from modules.produtor.entities.produtor import Produtor
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.safra.entities.safra import Safra
+from modules.cultura.entities.cultura import Cultura
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
 from main import app
 
 # Test database URL
@@ -29,6 +36,7 @@ async def test_db_setup():
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+        await ensure_default_partitions(conn)
     yield
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -47,6 +55,7 @@ async def client(db_session):
         yield db_session
     
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_db] = override_get_session
     
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
@@ -72,4 +81,56 @@ def sample_propriedade_data():
         "area_agricultavel": 60.0,
         "area_vegetacao": 40.0,
         "produtor_id": 1
-    } 
\ No newline at end of file
+    }
+
+# Base pequena dos testes do dashboard, comum aos backends SQL, colunar e espelho
+ESTADOS = ["MT", "GO", "PR", "SP"]
+
+DADOS_DASHBOARD = {
+    Produtor: [{"id": i, "documento_tipo": 1, "documento_chave": i, "nome": f"Produtor {i}"} for i in range(1, 4)],
+    Propriedade: [
+        {
+            "id": i,
+            "nome": f"Fazenda {i}",
+            "cidade": "Cidade",
+            "estado": ESTADOS[i % len(ESTADOS)],
+            "area_total": 100.1 * i,
+            "area_agricultavel": 60.3 * i,
+            "area_vegetacao": 39.8 * i,
+            "produtor_id": 1 + i % 3,
+        }
+        for i in range(1, 21)
+    ],
+    CatalogoCultura: [
+        {"id": 1, "nome": "Soja", "nome_normalizado": "soja"},
+        {"id": 2, "nome": "Milho", "nome_normalizado": "milho"},
+        {"id": 3, "nome": "Café", "nome_normalizado": "cafe"},
+    ],
+    Safra: [{"id": i, "ano": 2023 + i % 3, "propriedade_id": i} for i in range(1, 21)],
+    Cultura: [
+        {"id": i, "ano": 2023 + (1 + i % 20) % 3, "catalogo_id": 1 + i % 2, "safra_id": 1 + i % 20, "propriedade_id": 1 + i % 20}
+        for i in range(1, 41)
+    ],
+}
+
+@pytest.fixture
+def dados_dashboard():
+    """Rows shared by the dashboard backend tests, per model."""
+    return DADOS_DASHBOARD
+
+@pytest.fixture
+async def sqlite_session():
+    """In-memory SQLite session loaded with the dashboard rows."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    # Cópia das tabelas sem autoincrement: o SQLite não o aceita em PK
+    # composta, e os testes informam os ids
+    metadata = MetaData()
+    for model in DADOS_DASHBOARD:
+        model.__table__.to_metadata(metadata).c.id.autoincrement = False
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        for model, linhas in DADOS_DASHBOARD.items():
+            await conn.execute(insert(model), linhas)
+    async with AsyncSession(engine) as session:
+        yield session
+    await engine.dispose()
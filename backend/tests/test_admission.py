@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from modules.debug.controllers import debug_controller
+from shared.config.settings import settings
+from shared.middlewares.admission import AdmissionController, AdmissionControlMiddleware, parse_limits
+
+
+def make_app(controller, liberar: asyncio.Event):
+    app = FastAPI()
+
+    @app.get("/lento")
+    async def lento():
+        await liberar.wait()
+        return {"ok": True}
+
+    @app.get("/rapido/{item_id}")
+    async def rapido(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+    return app
+
+
+class TestParseLimits:
+    """Test cases for the admission limits spec parser."""
+
+    def test_parse_limits(self):
+        limiters = parse_limits("GET /produtores/=4:16; GET /dashboard/*=2")
+        assert [(l.pattern, l.limite, l.fila_max) for l in limiters] == [
+            ("GET /produtores/", 4, 16),
+            ("GET /dashboard/*", 2, 0),
+        ]
+
+    def test_parse_limits_invalid(self):
+        with pytest.raises(ValueError):
+            parse_limits("GET /produtores/=muitos")
+
+    def test_match_uses_wildcards(self):
+        controller = AdmissionController(parse_limits("GET /dashboard/*=2:4"), 1, 1)
+        assert controller.match("GET", "/dashboard/totais") is not None
+        assert controller.match("POST", "/dashboard/totais") is None
+        assert controller.match("GET", "/produtores/1") is None
+
+
+class TestAdmissionMiddleware:
+    """Test cases for per-route admission control."""
+
+    @pytest.mark.asyncio
+    async def test_sheds_load_when_queue_is_full_or_times_out(self):
+        controller = AdmissionController(parse_limits("GET /lento=1:1"), queue_timeout_s=0.05, retry_after_s=3)
+        liberar = asyncio.Event()
+        app = make_app(controller, liberar)
+        limiter = controller.limiters[0]
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            primeira = asyncio.create_task(client.get("/lento"))
+            await asyncio.sleep(0.01)
+            enfileirada = asyncio.create_task(client.get("/lento"))
+            await asyncio.sleep(0.01)
+            assert limiter.na_fila == 1
+
+            rejeitada = await client.get("/lento")
+            assert rejeitada.status_code == 503
+            assert rejeitada.headers["Retry-After"] == "3"
+
+            expirada = await enfileirada
+            assert expirada.status_code == 503
+
+            liberar.set()
+            assert (await primeira).status_code == 200
+
+        snapshot = controller.snapshot()[0]
+        assert snapshot["rejeitadas"] == 1
+        assert snapshot["expiradas"] == 1
+        assert snapshot["em_execucao"] == 0
+        assert snapshot["na_fila"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unlimited_routes_are_not_blocked(self):
+        controller = AdmissionController(parse_limits("GET /lento=1:0"), queue_timeout_s=0.05, retry_after_s=1)
+        liberar = asyncio.Event()
+        app = make_app(controller, liberar)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            lenta = asyncio.create_task(client.get("/lento"))
+            await asyncio.sleep(0.01)
+            response = await client.get("/rapido/1")
+            assert response.status_code == 200
+            liberar.set()
+            assert (await lenta).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_queued_request_runs_when_slot_frees(self):
+        controller = AdmissionController(parse_limits("GET /lento=1:4"), queue_timeout_s=1, retry_after_s=1)
+        liberar = asyncio.Event()
+        app = make_app(controller, liberar)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            tarefas = [asyncio.create_task(client.get("/lento")) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            liberar.set()
+            respostas = await asyncio.gather(*tarefas)
+
+        assert [r.status_code for r in respostas] == [200, 200, 200]
+
+    @pytest.mark.asyncio
+    async def test_debug_endpoint_requires_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "debug_token", "segredo")
+        app = FastAPI()
+        app.include_router(debug_controller.router)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/debug/admission")).status_code == 403
+            response = await client.get("/debug/admission", headers={"X-Debug-Token": "segredo"})
+
+        assert response.status_code == 200
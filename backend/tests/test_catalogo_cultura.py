@@ -0,0 +1,129 @@
+import pytest
+from types import SimpleNamespace
+from httpx import AsyncClient
+from sqlalchemy import event, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
+from modules.cultura.repositories.catalogo_cultura_repository import CatalogoCulturaRepository
+from modules.cultura.services.catalogo_cultura_service import CatalogoCulturaCache, CatalogoCulturaService, normalizar_nome
+
+
+class FakeCatalogoRepository:
+    """Catalog repository double that counts round trips."""
+
+    def __init__(self):
+        self.entradas = {}
+        self.chamadas = 0
+
+    async def get_or_create(self, nome_normalizado, nome):
+        self.chamadas += 1
+        if nome_normalizado not in self.entradas:
+            self.entradas[nome_normalizado] = SimpleNamespace(id=len(self.entradas) + 1, nome=nome, nome_normalizado=nome_normalizado)
+        return self.entradas[nome_normalizado]
+
+
+class TestNormalizarNome:
+    """Test cases for crop name normalization."""
+
+    @pytest.mark.parametrize("nome", ["Soja", "soja", " SOJA ", "Sója"])
+    def test_spelling_variants_collapse(self, nome):
+        assert normalizar_nome(nome) == "soja"
+
+    def test_inner_whitespace_collapses(self):
+        assert normalizar_nome("Café   Arábica") == "cafe arabica"
+
+
+class TestCatalogoCulturaService:
+    """Test cases for catalog resolution through the in-memory cache."""
+
+    @pytest.mark.asyncio
+    async def test_variants_resolve_to_same_id(self):
+        service = CatalogoCulturaService(FakeCatalogoRepository(), CatalogoCulturaCache())
+        assert await service.resolve("Soja") == await service.resolve(" soja ")
+        assert await service.resolve("Milho") != await service.resolve("Soja")
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_repository(self):
+        repository = FakeCatalogoRepository()
+        cache = CatalogoCulturaCache()
+        service = CatalogoCulturaService(repository, cache)
+        catalogo_id = await service.resolve("Soja")
+        await service.resolve("SOJA")
+        assert repository.chamadas == 1
+        assert cache.get_nome(catalogo_id) == "Soja"
+
+    @pytest.mark.asyncio
+    async def test_blank_name_is_rejected(self):
+        service = CatalogoCulturaService(FakeCatalogoRepository(), CatalogoCulturaCache())
+        with pytest.raises(ValueError):
+            await service.resolve("   ")
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'catalogo.db'}")
+    async with engine.begin() as conn:
+        # O SQLite só gera o id sozinho numa INTEGER PRIMARY KEY, não na SMALLINT do model
+        await conn.execute(text(
+            "CREATE TABLE catalogo_culturas (id INTEGER PRIMARY KEY, nome VARCHAR(100) NOT NULL, "
+            "nome_normalizado VARCHAR(100) NOT NULL UNIQUE)"
+        ))
+        await conn.execute(insert(CatalogoCultura), [{"id": 1, "nome": "Soja", "nome_normalizado": "soja"}])
+    yield engine
+    await engine.dispose()
+
+
+class TestCatalogoCulturaRepository:
+    """Test cases for looking up and creating catalog entries."""
+
+    @pytest.mark.asyncio
+    async def test_existing_name_does_not_insert(self, engine):
+        inserts = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: inserts.append(args[2]) if args[2].startswith("INSERT") else None)
+        async with AsyncSession(engine) as session:
+            entrada = await CatalogoCulturaRepository(session).get_or_create("soja", "Soja")
+
+        assert entrada.id == 1
+        assert inserts == []
+
+    @pytest.mark.asyncio
+    async def test_new_name_does_not_commit_the_callers_session(self, engine):
+        commits = []
+        async with AsyncSession(engine) as session:
+            event.listen(session.sync_session, "after_commit", commits.append)
+            entrada = await CatalogoCulturaRepository(session).get_or_create("milho", "Milho")
+
+        async with engine.connect() as conn:
+            nomes = (await conn.execute(select(CatalogoCultura.nome).order_by(CatalogoCultura.id))).scalars().all()
+        assert entrada.nome == "Milho"
+        assert nomes == ["Soja", "Milho"]
+        assert commits == []
+
+
+@pytest.mark.integration
+class TestCatalogoEndpoints:
+    """Crop names are stored once in the catalog and grouped by id."""
+
+    async def criar_safra(self, client: AsyncClient):
+        produtor = await client.post("/produtores/", json={"cpf_cnpj": "52998224725", "nome": "João"})
+        propriedade = await client.post("/propriedades/", json={
+            "nome": "Fazenda", "cidade": "Sorriso", "estado": "MT",
+            "area_total": 100.0, "area_agricultavel": 60.0, "area_vegetacao": 40.0,
+            "produtor_id": produtor.json()["id"],
+        })
+        propriedade_id = propriedade.json()["id"]
+        safra = await client.post("/safras/", json={"ano": 2024, "propriedade_id": propriedade_id})
+        return safra.json()["id"], propriedade_id
+
+    @pytest.mark.asyncio
+    async def test_spelling_variants_share_catalog_entry(self, client: AsyncClient):
+        safra_id, propriedade_id = await self.criar_safra(client)
+        for nome in ("Soja", "soja", "Milho"):
+            response = await client.post("/culturas/", json={"nome": nome, "safra_id": safra_id, "propriedade_id": propriedade_id})
+            assert response.status_code == 201
+
+        catalogo = (await client.get("/culturas/catalogo")).json()
+        assert sorted(item["nome"] for item in catalogo) == ["Milho", "Soja"]
+
+        por_cultura = {item["cultura"]: item["total"] for item in (await client.get("/dashboard/por-cultura")).json()}
+        assert por_cultura == {"Soja": 2, "Milho": 1}
@@ -0,0 +1,173 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import MetaData, event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.changes.controllers import change_controller
+from modules.changes.entities.alteracao import Alteracao
+from modules.changes.repositories.alteracao_repository import AlteracaoRepository
+from modules.changes.services.change_service import ChangeService
+from modules.jobs.entities.job import Job
+from modules.jobs.services.job_runner import job_runner
+from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO, ProdutorUpdateDTO
+from modules.produtor.entities.produtor import Produtor
+from modules.produtor.repositories.produtor_repository import ProdutorRepository
+from modules.produtor.services.produtor_service import ProdutorService
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
+from modules.cultura.entities.cultura import Cultura
+from modules.safra.entities.safra import Safra
+from modules.safra.dtos.safra_dto import SafraPatchDTO, SafraUpdateDTO
+from modules.safra.repositories.safra_repository import SafraRepository
+from modules.safra.services.safra_service import SafraService
+from shared.database.session import get_read_db
+from shared.utils.documento_fiscal import TIPO_CPF, DocumentoFiscal
+
+CPF = "52998224725"
+
+
+@pytest.fixture
+async def session(monkeypatch):
+    # A exclusão agenda a purga; aqui só interessa o changelog
+    monkeypatch.setattr(job_runner, "submit", lambda job_id: None)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    metadata = MetaData()
+    for model in (Produtor, Propriedade, Alteracao, Job):
+        model.__table__.to_metadata(metadata)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session_com_safras():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    # O ano das culturas acompanha a safra pelo ON UPDATE CASCADE
+    event.listen(engine.sync_engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys = ON"))
+    metadata = MetaData()
+    for model in (Produtor, Propriedade, Safra, CatalogoCultura, Cultura, Alteracao):
+        tabela = model.__table__.to_metadata(metadata)
+        if model in (Safra, Cultura):
+            tabela.c.id.autoincrement = False
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(insert(Produtor), [{"id": 1, "documento_tipo": TIPO_CPF, "documento_chave": 529982247, "nome": "Ana"}])
+        await conn.execute(insert(Propriedade), [{
+            "id": 1, "nome": "Fazenda", "cidade": "Sorriso", "estado": "MT", "area_total": 100,
+            "area_agricultavel": 60, "area_vegetacao": 30, "produtor_id": 1,
+        }])
+        await conn.execute(insert(CatalogoCultura), [{"id": 1, "nome": "Soja", "nome_normalizado": "soja"}])
+        await conn.execute(insert(Safra), [{"id": 1, "ano": 2024, "propriedade_id": 1}])
+        await conn.execute(insert(Cultura), [
+            {"id": i, "ano": 2024, "catalogo_id": 1, "safra_id": 1, "propriedade_id": 1} for i in (1, 2)
+        ])
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+async def changelog(session):
+    result = await session.execute(select(Alteracao).order_by(Alteracao.seq))
+    return [(a.entidade, a.entidade_id, a.operacao, a.dados) for a in result.scalars()]
+
+
+class TestChangeLog:
+    """Test cases for recording writes in the changelog."""
+
+    @pytest.mark.asyncio
+    async def test_create_update_delete_are_recorded_in_order(self, session):
+        service = ProdutorService(ProdutorRepository(session))
+        produtor = await service.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+        await service.update_produtor(produtor.id, ProdutorUpdateDTO(cpf_cnpj=CPF, nome="Ana Maria"))
+        await service.delete_produtor(produtor.id)
+
+        assert await changelog(session) == [
+            ("produtor", produtor.id, "criacao", {"id": produtor.id, "cpf_cnpj": CPF, "nome": "Ana", "versao": 1}),
+            ("produtor", produtor.id, "alteracao", {"id": produtor.id, "cpf_cnpj": CPF, "nome": "Ana Maria", "versao": 2}),
+            ("produtor", produtor.id, "exclusao", None),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_update_without_changes_is_not_recorded(self, session):
+        service = ProdutorService(ProdutorRepository(session))
+        produtor = await service.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+        await service.update_produtor(produtor.id, ProdutorUpdateDTO(cpf_cnpj=CPF, nome="Ana"))
+
+        assert [operacao for _, _, operacao, _ in await changelog(session)] == ["criacao"]
+
+    @pytest.mark.asyncio
+    async def test_failed_write_leaves_no_entry(self, session):
+        service = ProdutorService(ProdutorRepository(session))
+        await service.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+        with pytest.raises(ValueError):
+            await service.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Outra"))
+        await session.rollback()
+
+        assert len(await changelog(session)) == 1
+
+
+    @pytest.mark.asyncio
+    async def test_entries_are_written_at_commit(self, session):
+        session.add(Produtor(cpf_cnpj=DocumentoFiscal.from_chave(TIPO_CPF, 1), nome="Desfeito"))
+        await session.flush()
+        assert await changelog(session) == []
+        await session.rollback()
+
+        produtor = Produtor(cpf_cnpj=DocumentoFiscal.parse(CPF), nome="Ana")
+        session.add(produtor)
+        await session.flush()
+        assert await changelog(session) == []
+        await session.commit()
+
+        assert [(entidade_id, operacao) for _, entidade_id, operacao, _ in await changelog(session)] == [(produtor.id, "criacao")]
+
+    @pytest.mark.asyncio
+    async def test_safra_year_change_records_its_culturas(self, session_com_safras):
+        service = SafraService(SafraRepository(session_com_safras))
+        await service.patch_safra(1, SafraPatchDTO(versao=1, ano=2025))
+        await service.update_safra(1, SafraUpdateDTO(ano=2026, propriedade_id=1))
+
+        alteracoes = (await ChangeService(AlteracaoRepository(session_com_safras)).get_changes(0, 10))["alteracoes"]
+        culturas = [(a.entidade_id, a.dados["ano"], a.dados["versao"]) for a in alteracoes if a.entidade == "cultura"]
+        assert culturas == [(1, 2025, 2), (2, 2025, 2), (1, 2026, 3), (2, 2026, 3)]
+
+
+class TestChangeFeed:
+    """Test cases for paging through GET /changes."""
+
+    @pytest.mark.asyncio
+    async def test_pages_follow_the_sequence(self, session):
+        for i in range(5):
+            session.add(Produtor(cpf_cnpj=DocumentoFiscal.from_chave(TIPO_CPF, i), nome=f"P{i}"))
+            await session.commit()
+        service = ChangeService(AlteracaoRepository(session))
+
+        primeira = await service.get_changes(0, 3)
+        segunda = await service.get_changes(primeira["proximo"], 3)
+        vazia = await service.get_changes(segunda["proximo"], 3)
+
+        assert [a.dados["nome"] for a in primeira["alteracoes"] + segunda["alteracoes"]] == [f"P{i}" for i in range(5)]
+        assert (primeira["mais"], segunda["mais"]) == (True, False)
+        assert vazia == {"alteracoes": [], "proximo": segunda["proximo"], "mais": False}
+
+    @pytest.mark.asyncio
+    async def test_endpoint(self, session):
+        session.add(Produtor(cpf_cnpj=DocumentoFiscal.parse(CPF), nome="Ana"))
+        await session.commit()
+        app = FastAPI()
+        app.include_router(change_controller.router)
+
+        async def override():
+            yield session
+
+        app.dependency_overrides[get_read_db] = override
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            resposta = await client.get("/changes", params={"since": 0, "limit": 10})
+            invalida = await client.get("/changes", params={"limit": 0})
+
+        corpo = resposta.json()
+        assert corpo["proximo"] == corpo["alteracoes"][0]["seq"]
+        assert corpo["alteracoes"][0]["operacao"] == "criacao"
+        assert invalida.status_code == 422
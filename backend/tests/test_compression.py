@@ -0,0 +1,101 @@
+import gzip
+import json
+import brotli
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from shared.middlewares.compression import CompressionMiddleware
+from shared.utils.compression import negotiate, parse_levels
+
+PAYLOAD = [{"id": i, "nome": f"Fazenda {i}", "cidade": "Sorriso", "estado": "MT", "area_total": 100.0} for i in range(500)]
+
+
+def make_app(**kwargs):
+    app = FastAPI()
+
+    @app.get("/propriedades/")
+    async def list_propriedades():
+        return PAYLOAD
+
+    @app.get("/pequeno")
+    async def pequeno():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for item in PAYLOAD:
+                yield json.dumps(item).encode() + b"\n"
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, **kwargs)
+    return app
+
+
+class TestNegotiation:
+    """Test cases for Accept-Encoding negotiation."""
+
+    def test_prefers_server_order_on_ties(self):
+        assert negotiate("gzip, br, zstd") == "zstd"
+
+    def test_respects_q_values(self):
+        assert negotiate("gzip;q=1.0, br;q=0.5, zstd;q=0") == "gzip"
+
+    def test_identity_only(self):
+        assert negotiate("identity") is None
+
+    def test_wildcard(self):
+        assert negotiate("*;q=0.5, zstd;q=0") == "br"
+
+    def test_parse_levels(self):
+        assert parse_levels("gzip:9, br:5") == {"gzip": 9, "br": 5}
+        with pytest.raises(ValueError):
+            parse_levels("gzip:alto")
+
+
+class TestCompressionMiddleware:
+    """Test cases for response compression."""
+
+    async def get(self, app, path, encoding):
+        """Return the response headers and the raw (still encoded) body."""
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            async with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        return response.headers, raw
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("encoding, decompress", [
+        ("gzip", gzip.decompress),
+        ("br", brotli.decompress),
+        ("zstd", lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)),
+    ])
+    async def test_large_response_is_compressed(self, encoding, decompress):
+        headers, raw = await self.get(make_app(min_size=100), "/propriedades/", encoding)
+        assert headers["content-encoding"] == encoding
+        assert "Accept-Encoding" in headers["vary"]
+        assert int(headers["content-length"]) == len(raw)
+        assert json.loads(decompress(raw)) == PAYLOAD
+
+    @pytest.mark.asyncio
+    async def test_small_response_is_not_compressed(self):
+        headers, raw = await self.get(make_app(min_size=100), "/pequeno", "gzip")
+        assert "content-encoding" not in headers
+        assert json.loads(raw) == {"ok": True}
+
+    @pytest.mark.asyncio
+    async def test_streaming_response_is_compressed(self):
+        headers, raw = await self.get(make_app(min_size=100), "/stream", "gzip")
+        assert headers["content-encoding"] == "gzip"
+        assert "content-length" not in headers
+        linhas = gzip.decompress(raw).splitlines()
+        assert [json.loads(linha) for linha in linhas] == PAYLOAD
+
+    def test_route_level_overrides_default(self):
+        middleware = CompressionMiddleware(
+            None, min_size=100, default_levels={"gzip": 1, "br": 4}, route_levels=[("GET /propriedades/", {"gzip": 9})]
+        )
+        scope = {"method": "GET", "path": "/propriedades/"}
+        assert middleware.levels_for(scope) == {"gzip": 9, "br": 4}
+        assert middleware.levels_for({**scope, "path": "/safras/"}) == {"gzip": 1, "br": 4}
@@ -0,0 +1,112 @@
+import pytest
+from types import SimpleNamespace
+from fastapi import Response
+from httpx import AsyncClient
+from shared.config.settings import settings
+from shared.database.counts import Contagem, count_rows
+from shared.utils.count_headers import set_count_headers
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.safra.entities.safra import Safra
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+    def scalar_one(self):
+        return self.row[0]
+
+
+class FakeSession:
+    """Session double answering the planner-statistics query and the exact count."""
+
+    def __init__(self, estatisticas, exato):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+        self.estatisticas = estatisticas
+        self.exato = exato
+        self.bind_arguments = []
+        self.statements = []
+
+    async def execute(self, statement, bind_arguments=None):
+        self.bind_arguments.append(bind_arguments)
+        self.statements.append(str(statement))
+        if "pg_class" in str(statement):
+            return FakeResult(self.estatisticas)
+        return FakeResult((self.exato,))
+
+
+class TestCountRows:
+    """Test cases for exact and estimated counts."""
+
+    @pytest.fixture(autouse=True)
+    def limites(self, monkeypatch):
+        monkeypatch.setattr(settings, "count_exact_threshold", 1000)
+        monkeypatch.setattr(settings, "count_estimate_max_modified", 0.1)
+
+    @pytest.mark.asyncio
+    async def test_exact_mode_counts_rows(self):
+        session = FakeSession((5_000_000, 10, False), exato=4_999_990)
+        assert await count_rows(session, Propriedade, exato=True) == Contagem(4_999_990)
+
+    @pytest.mark.asyncio
+    async def test_estimate_uses_planner_statistics_on_primary(self):
+        session = FakeSession((5_000_000, 1200, False), exato=4_999_990)
+        assert await count_rows(session, Propriedade, exato=False) == Contagem(5_000_000, True, 1200)
+        assert session.bind_arguments[0] == {"primary": True}
+
+    @pytest.mark.asyncio
+    async def test_small_table_falls_back_to_exact(self):
+        session = FakeSession((500, 0, False), exato=498)
+        assert await count_rows(session, Propriedade, exato=False) == Contagem(498)
+
+    @pytest.mark.asyncio
+    async def test_stale_statistics_fall_back_to_exact(self):
+        session = FakeSession((5_000_000, 900_000, False), exato=5_700_000)
+        assert await count_rows(session, Propriedade, exato=False) == Contagem(5_700_000)
+
+    @pytest.mark.asyncio
+    async def test_never_analyzed_falls_back_to_exact(self):
+        session = FakeSession((-1, None, True), exato=12)
+        assert await count_rows(session, Propriedade, exato=False) == Contagem(12)
+
+    @pytest.mark.asyncio
+    async def test_partitioned_table_sums_its_partitions(self):
+        session = FakeSession((3_000_000, 500, False), exato=3_000_100)
+        assert await count_rows(session, Safra, exato=False) == Contagem(3_000_000, True, 500)
+        assert "pg_inherits" in session.statements[0]
+
+    @pytest.mark.asyncio
+    async def test_partition_never_analyzed_falls_back_to_exact(self):
+        session = FakeSession((2_000_000, 0, True), exato=2_500_000)
+        assert await count_rows(session, Safra, exato=False) == Contagem(2_500_000)
+
+    def test_estimate_headers(self):
+        response = Response()
+        set_count_headers(response, Contagem(5_000_000, True, 1200))
+        assert response.headers["X-Total-Count-Estimate"] == "5000000"
+        assert response.headers["X-Total-Count-Modified"] == "1200"
+        assert "X-Total-Count" not in response.headers
+
+
+@pytest.mark.integration
+class TestCountHeaders:
+    """Test cases for count headers on list endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_list_without_count_has_no_header(self, client: AsyncClient):
+        response = await client.get("/produtores/")
+        assert "X-Total-Count" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_exact_count_header(self, client: AsyncClient):
+        response = await client.get("/produtores/?exato=true")
+        assert response.headers["X-Total-Count"] == str(len(response.json()))
+
+    @pytest.mark.asyncio
+    async def test_estimate_on_small_table_is_exact(self, client: AsyncClient):
+        response = await client.get("/propriedades/?exato=false")
+        assert response.headers["X-Total-Count"] == str(len(response.json()))
+        assert "X-Total-Count-Estimate" not in response.headers
@@ -0,0 +1,96 @@
+import json
+import pytest
+import pyarrow
+import pyarrow.parquet as parquet
+from fastapi import Response
+from shared.config.settings import settings
+from shared.snapshots.cache import SnapshotCache
+from shared.snapshots.exporter import MANIFEST, SNAPSHOT_TABLES, arrow_schema
+from modules.dashboard.controllers import dashboard_controller
+from modules.dashboard.services.dashboard_service import DashboardService
+from modules.dashboard.services.columnar_dashboard_service import ColumnarDashboardService, dashboard_snapshot
+from modules.dashboard.services.dashboard_validation import compare_backends, equivalentes
+
+
+def write_snapshot(destino, model, linhas):
+    nome = model.__tablename__
+    spec = SNAPSHOT_TABLES[nome]
+    grupos = {}
+    for linha in linhas:
+        # versao é ignorada pelo schema das tabelas que não a têm
+        linha = dict(linha, versao=1, _versao=1)
+        valor = linha.pop(spec.particao) if spec.particao else None
+        grupos.setdefault(valor, []).append(linha)
+    for valor, grupo in grupos.items():
+        pasta = destino / nome / f"{spec.particao}={valor}" if spec.particao else destino / nome
+        pasta.mkdir(parents=True, exist_ok=True)
+        parquet.write_table(pyarrow.Table.from_pylist(grupo, schema=arrow_schema(spec)), pasta / "part-teste.parquet")
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path, dados_dashboard):
+    for model, linhas in dados_dashboard.items():
+        write_snapshot(tmp_path, model, linhas)
+    (tmp_path / MANIFEST).write_text(json.dumps({"tabelas": {}, "execucoes": [{"id": "teste"}]}))
+    return tmp_path
+
+
+class TestEquivalencia:
+    """Test cases for the result comparison helper."""
+
+    def test_float_sums_and_group_order_are_tolerated(self):
+        a = [{"estado": "MT", "area": 0.1 + 0.2}, {"estado": "GO", "area": 1.0}]
+        b = [{"estado": "GO", "area": 1.0}, {"estado": "MT", "area": 0.3}]
+        assert equivalentes(a, b)
+
+    def test_different_totals_are_reported(self):
+        assert not equivalentes([{"estado": "MT", "total": 1}], [{"estado": "MT", "total": 2}])
+
+
+class TestColumnarDashboard:
+    """The columnar backend must match the SQL path on the same data."""
+
+    @pytest.mark.asyncio
+    async def test_matches_sql_backend(self, sqlite_session, snapshot_dir):
+        snapshot = SnapshotCache(snapshot_dir, ("propriedades", "culturas", "catalogo_culturas"), refresh_s=60)
+        assert await snapshot.load()
+
+        divergencias = await compare_backends(DashboardService(sqlite_session), ColumnarDashboardService(snapshot))
+
+        assert divergencias == {}
+
+    @pytest.mark.asyncio
+    async def test_filter_by_year_matches_sql_backend(self, sqlite_session, snapshot_dir):
+        snapshot = SnapshotCache(snapshot_dir, ("propriedades", "culturas", "catalogo_culturas"), refresh_s=60)
+        await snapshot.load()
+
+        esperado = await DashboardService(sqlite_session).fazendas_por_cultura(2024)
+        obtido = await ColumnarDashboardService(snapshot).fazendas_por_cultura(2024)
+
+        assert esperado and equivalentes(esperado, obtido)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_sql_without_snapshot(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "dashboard_backend", "columnar")
+        monkeypatch.setattr(dashboard_snapshot, "destino", tmp_path)
+        monkeypatch.setattr(dashboard_snapshot, "tabelas", {})
+        monkeypatch.setattr(dashboard_snapshot, "_mtime", None)
+        monkeypatch.setattr(dashboard_snapshot, "_verificado_em", None)
+
+        service = await dashboard_controller.get_dashboard_service(Response(), db=None)
+
+        assert isinstance(service, DashboardService)
+
+    @pytest.mark.asyncio
+    async def test_selected_by_configuration(self, monkeypatch, snapshot_dir):
+        monkeypatch.setattr(settings, "dashboard_backend", "columnar")
+        monkeypatch.setattr(dashboard_snapshot, "destino", snapshot_dir)
+        monkeypatch.setattr(dashboard_snapshot, "tabelas", {})
+        monkeypatch.setattr(dashboard_snapshot, "_mtime", None)
+        monkeypatch.setattr(dashboard_snapshot, "_verificado_em", None)
+        response = Response()
+
+        service = await dashboard_controller.get_dashboard_service(response, db=None)
+
+        assert isinstance(service, ColumnarDashboardService)
+        assert response.headers["X-Dashboard-Snapshot"] == "teste"
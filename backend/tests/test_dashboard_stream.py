@@ -0,0 +1,154 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+from modules.dashboard.controllers import dashboard_controller
+from modules.dashboard.services.dashboard_stream import (
+    Assinante,
+    DashboardBroadcaster,
+    LimiteDeAssinantes,
+    formatar_sse,
+)
+from shared.middlewares.admission import AdmissionController, parse_limits
+from shared.middlewares.deadline import DeadlineMiddleware
+from shared.utils import change_events
+
+
+class FakeKpis:
+    """Counts how many times the KPIs were computed."""
+
+    def __init__(self):
+        self.chamadas = 0
+        self.total = 1
+
+    async def __call__(self):
+        self.chamadas += 1
+        return {"totais": {"total_fazendas": self.total}, "uso_do_solo": {"agricultavel": 1.0}}
+
+
+class TestAssinante:
+    """Test cases for per-connection backpressure."""
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_gets_coalesced_latest_values(self):
+        assinante = Assinante()
+        assinante.entregar({"totais": 1})
+        assinante.entregar({"totais": 2, "por_estado": []})
+
+        assert await assinante.proximo(0.1) == {"totais": 2, "por_estado": []}
+        assert await assinante.proximo(0.01) is None
+
+
+class TestDashboardBroadcaster:
+    """Test cases for computing KPI changes once and fanning them out."""
+
+    @pytest.mark.asyncio
+    async def test_burst_of_writes_is_computed_once_for_all_subscribers(self):
+        kpis = FakeKpis()
+        broadcaster = DashboardBroadcaster(kpis, max_assinantes=10, debounce_s=0.02, refresh_s=60)
+        assinantes = []
+        for _ in range(3):
+            assinante, inicial = await broadcaster.assinar()
+            assinantes.append(assinante)
+        assert inicial["totais"] == {"total_fazendas": 1}
+        assert kpis.chamadas == 1
+
+        kpis.total = 2
+        for _ in range(5):
+            broadcaster.notificar()
+        deltas = await asyncio.gather(*(a.proximo(1) for a in assinantes))
+
+        assert kpis.chamadas == 2
+        assert deltas == [{"totais": {"total_fazendas": 2}}] * 3
+        for assinante in assinantes:
+            broadcaster.cancelar(assinante)
+        assert broadcaster._task is None
+
+    @pytest.mark.asyncio
+    async def test_subscriber_cap(self):
+        broadcaster = DashboardBroadcaster(FakeKpis(), max_assinantes=1, debounce_s=0, refresh_s=60)
+        assinante, _ = await broadcaster.assinar()
+        with pytest.raises(LimiteDeAssinantes):
+            await broadcaster.assinar()
+        broadcaster.cancelar(assinante)
+
+    @pytest.mark.asyncio
+    async def test_subscriber_cap_holds_during_first_computation(self):
+        liberar = asyncio.Event()
+        kpis = FakeKpis()
+
+        async def lento():
+            await liberar.wait()
+            return await kpis()
+
+        broadcaster = DashboardBroadcaster(lento, max_assinantes=1, debounce_s=0, refresh_s=60)
+        primeiro = asyncio.create_task(broadcaster.assinar())
+        await asyncio.sleep(0)
+        with pytest.raises(LimiteDeAssinantes):
+            await broadcaster.assinar()
+        liberar.set()
+        assinante, inicial = await primeiro
+
+        assert inicial["totais"] == {"total_fazendas": 1}
+        assert await assinante.proximo(0.01) is None
+        broadcaster.cancelar(assinante)
+
+    @pytest.mark.asyncio
+    async def test_failed_first_computation_frees_the_slot(self):
+        async def quebra():
+            raise RuntimeError("banco fora")
+
+        broadcaster = DashboardBroadcaster(quebra, max_assinantes=1, debounce_s=0, refresh_s=60)
+        with pytest.raises(RuntimeError):
+            await broadcaster.assinar()
+
+        assert broadcaster.assinantes == set()
+        assert broadcaster._task is None
+
+    def test_writes_without_subscribers_only_invalidate(self):
+        broadcaster = DashboardBroadcaster(FakeKpis(), max_assinantes=1, debounce_s=0, refresh_s=60)
+        broadcaster.estado = {"totais": {}}
+        broadcaster.notificar()
+        assert broadcaster.estado is None
+
+    def test_change_events_reach_listeners(self):
+        recebidos = []
+        change_events.subscribe("teste", lambda *args: recebidos.append(args))
+        change_events.publish("teste", "criacao", 7)
+        assert recebidos == [("teste", "criacao", 7)]
+
+    def test_sse_format(self):
+        assert formatar_sse("delta", {"totais": 1}) == 'event: delta\ndata: {"totais": 1}\n\n'
+        assert formatar_sse("delta", None) == ": ping\n\n"
+
+
+class TestDashboardWebSocket:
+    """Test cases for the WebSocket transport."""
+
+    def test_snapshot_then_delta(self, monkeypatch):
+        kpis = FakeKpis()
+        broadcaster = DashboardBroadcaster(kpis, max_assinantes=5, debounce_s=0, refresh_s=60)
+        monkeypatch.setattr(dashboard_controller, "dashboard_broadcaster", broadcaster)
+        app = FastAPI()
+        app.include_router(dashboard_controller.router)
+
+        with TestClient(app) as client:
+            with client.websocket_connect("/dashboard/ws") as ws:
+                assert ws.receive_json() == {"evento": "snapshot", "dados": {"totais": {"total_fazendas": 1}, "uso_do_solo": {"agricultavel": 1.0}}}
+                kpis.total = 5
+                client.portal.call(broadcaster.notificar)
+                assert ws.receive_json() == {"evento": "delta", "dados": {"totais": {"total_fazendas": 5}}}
+
+
+class TestStreamIsExemptFromLimits:
+    """The long-lived stream must not hold admission slots or hit deadlines."""
+
+    def test_admission_zero_limit_exempts_route(self):
+        controller = AdmissionController(parse_limits("GET /dashboard/stream=0;GET /dashboard/*=2:4"), 1, 1)
+        assert controller.match("GET", "/dashboard/stream") is None
+        assert controller.match("GET", "/dashboard/totais") is not None
+
+    def test_deadline_zero_disables_budget(self):
+        middleware = DeadlineMiddleware(None, rules=[("GET /dashboard/stream", 0), ("GET /dashboard/*", 5000)], default_ms=30000)
+        scope = {"type": "http", "method": "GET", "path": "/dashboard/stream", "headers": []}
+        assert middleware.budget_ms(scope) is None
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from shared.database.session import RoutingSession, bind_deadline
+from shared.middlewares.deadline import DeadlineMiddleware
+from shared.utils.deadline import current_deadline, remaining_ms
+
+
+def make_app(rules, default_ms, get_session=None):
+    app = FastAPI()
+
+    @app.get("/lento")
+    async def lento():
+        await asyncio.sleep(1)
+        return {"ok": True}
+
+    @app.get("/rapido")
+    async def rapido():
+        return {"restante_ms": remaining_ms(current_deadline())}
+
+    if get_session is not None:
+        @app.get("/consulta-lenta")
+        async def consulta_lenta(session: AsyncSession = Depends(get_session)):
+            await session.execute(text("SELECT pg_sleep(2)"))
+            return {"ok": True}
+
+    app.add_middleware(DeadlineMiddleware, rules=rules, default_ms=default_ms)
+    return app
+
+
+class TestDeadlineBudget:
+    """Test cases for the per-request time budget."""
+
+    def make_scope(self, path, headers=()):
+        return {"type": "http", "method": "GET", "path": path, "headers": list(headers)}
+
+    def test_route_rule_overrides_default(self):
+        middleware = DeadlineMiddleware(None, rules=[("GET /dashboard/*", 5000)], default_ms=30000)
+        assert middleware.budget_ms(self.make_scope("/dashboard/totais")) == 5000
+        assert middleware.budget_ms(self.make_scope("/produtores/")) == 30000
+
+    def test_client_header_can_only_shorten_budget(self):
+        middleware = DeadlineMiddleware(None, rules=[], default_ms=1000)
+        assert middleware.budget_ms(self.make_scope("/", [(b"x-request-timeout-ms", b"200")])) == 200
+        assert middleware.budget_ms(self.make_scope("/", [(b"x-request-timeout-ms", b"9000")])) == 1000
+        assert middleware.budget_ms(self.make_scope("/", [(b"x-request-timeout-ms", b"abc")])) == 1000
+
+
+class TestDeadlineMiddleware:
+    """Test cases for deadline enforcement."""
+
+    @pytest.mark.asyncio
+    async def test_slow_request_gets_504(self):
+        app = make_app(rules=[("GET /lento", 50)], default_ms=5000)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/lento")
+        assert response.status_code == 504
+
+    @pytest.mark.asyncio
+    async def test_deadline_visible_to_handlers(self):
+        app = make_app(rules=[], default_ms=5000)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/rapido", headers={"X-Request-Timeout-Ms": "300"})
+        assert response.status_code == 200
+        assert 0 < response.json()["restante_ms"] <= 300
+
+
+@pytest.mark.integration
+class TestStatementTimeout:
+    """Slow queries against the local database are cancelled by Postgres."""
+
+    @pytest.mark.asyncio
+    async def test_slow_query_is_cancelled_with_504(self, test_db_setup):
+        from tests.conftest import test_engine
+
+        session_factory = async_sessionmaker(
+            bind=test_engine,
+            class_=AsyncSession,
+            sync_session_class=RoutingSession,
+            primary=test_engine.sync_engine,
+            replica=test_engine.sync_engine,
+        )
+
+        async def get_session():
+            async with session_factory() as session:
+                yield bind_deadline(session)
+
+        app = make_app(rules=[("GET /consulta-lenta", 300)], default_ms=5000, get_session=get_session)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/consulta-lenta")
+        assert response.status_code == 504
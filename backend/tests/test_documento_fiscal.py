@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import MetaData
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.changes.entities.alteracao import Alteracao
+from modules.jobs.services.job_handlers import validar_documentos
+from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO
+from modules.produtor.entities.produtor import Produtor
+from modules.produtor.repositories.produtor_repository import ProdutorRepository
+from modules.produtor.services.produtor_service import ProdutorService
+from modules.propriedade.entities.propriedade import Propriedade
+from shared.utils.documento_fiscal import TIPO_CNPJ, TIPO_CPF, DocumentoFiscal
+
+
+class FakeContext:
+    async def progresso(self, atual, total=None):
+        pass
+
+    async def run_cpu(self, funcao, *args):
+        return funcao(*args)
+
+
+class TestDocumentoFiscal:
+    """Test cases for the canonical CPF/CNPJ value type."""
+
+    def test_formatting_variants_are_the_same_document(self):
+        assert DocumentoFiscal.parse("529.982.247-25") == DocumentoFiscal.parse(" 52998224725 ") == "52998224725"
+        assert DocumentoFiscal.parse("12.abc.345/01de-35") == "12ABC34501DE35"
+
+    def test_invalid_documents(self):
+        for documento, mensagem in [("529.982.247-26", "CPF"), ("11111111111", "CPF"), ("12ABC34501DE36", "CNPJ"), ("123", "11 ou 14")]:
+            with pytest.raises(ValueError, match=mensagem):
+                DocumentoFiscal.parse(documento)
+
+    def test_key_round_trip(self):
+        for documento, tipo in [("52998224725", TIPO_CPF), ("11222333000181", TIPO_CNPJ), ("12ABC34501DE35", TIPO_CNPJ)]:
+            parsed = DocumentoFiscal.parse(documento)
+            assert parsed.tipo == tipo
+            assert DocumentoFiscal.from_chave(parsed.tipo, parsed.chave) == documento
+
+    def test_largest_cnpj_fits_bigint(self):
+        maior = DocumentoFiscal.from_chave(TIPO_CNPJ, 36 ** 12 - 1)
+        assert maior.startswith("Z" * 12)
+        assert DocumentoFiscal.parse(maior).chave < 2 ** 63
+
+    def test_formatado(self):
+        assert DocumentoFiscal.parse("52998224725").formatado == "529.982.247-25"
+        assert DocumentoFiscal.parse("12ABC34501DE35").formatado == "12.ABC.345/01DE-35"
+
+
+@pytest.fixture
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    metadata = MetaData()
+    for model in (Produtor, Propriedade, Alteracao):
+        model.__table__.to_metadata(metadata)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
+
+
+class TestProdutorDocumento:
+    """Test cases for storing and looking up producers by document."""
+
+    @pytest.mark.asyncio
+    async def test_lookup_and_uniqueness_ignore_formatting(self, session):
+        service = ProdutorService(ProdutorRepository(session))
+        produtor = await service.create_produtor(ProdutorCreateDTO(cpf_cnpj="529.982.247-25", nome="Ana"))
+
+        assert produtor.cpf_cnpj == "52998224725"
+        assert (produtor.documento_tipo, produtor.documento_chave) == (TIPO_CPF, 529982247)
+        assert (await service.repository.get_by_cpf_cnpj("52998224725")).id == produtor.id
+        with pytest.raises(ValueError, match="já cadastrado"):
+            await service.create_produtor(ProdutorCreateDTO(cpf_cnpj="52998224725", nome="Outra"))
+
+    @pytest.mark.asyncio
+    async def test_batch_lookup(self, session):
+        service = ProdutorService(ProdutorRepository(session))
+        await service.create_produtor(ProdutorCreateDTO(cpf_cnpj="12.ABC.345/01DE-35", nome="Empresa"))
+
+        documentos = [DocumentoFiscal.parse("12abc34501de35"), DocumentoFiscal.parse("52998224725")]
+        encontrados = await service.repository.get_by_documentos(documentos)
+
+        assert [p.cpf_cnpj for p in encontrados] == ["12ABC34501DE35"]
+
+
+class TestValidarDocumentosJob:
+    """Test cases for bulk validation and dedupe."""
+
+    @pytest.mark.asyncio
+    async def test_reports_same_document_written_differently(self):
+        documentos = ["529.982.247-25", "52998224725", "12.abc.345/01de-35", "12ABC34501DE35", "123"]
+        resultado = await validar_documentos(FakeContext(), {"documentos": documentos, "tamanho_lote": 2})
+
+        assert resultado == {
+            "total": 5,
+            "invalidos": ["123"],
+            "duplicados": [["529.982.247-25", "52998224725"], ["12.abc.345/01de-35", "12ABC34501DE35"]],
+        }
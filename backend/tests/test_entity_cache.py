@@ -0,0 +1,198 @@
+import asyncio
+import pytest
+from sqlalchemy import MetaData, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from modules.changes.entities.alteracao import Alteracao
+from modules.jobs.entities.job import Job
+from modules.jobs.services.job_runner import job_runner
+from modules.produtor.dtos.produtor_dto import ProdutorPatchDTO, ProdutorReadDTO
+from modules.produtor.entities.produtor import Produtor
+from modules.produtor.repositories.produtor_repository import ProdutorRepository
+from modules.produtor.services.produtor_service import ProdutorService
+from modules.propriedade.dtos.propriedade_dto import PropriedadePatchDTO
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.propriedade.repositories.propriedade_repository import PropriedadeRepository
+from modules.propriedade.services.propriedade_mirror import PropriedadeMirror
+from modules.propriedade.services.propriedade_service import PropriedadeService
+from shared.database.entity_cache import EntityCache, chave
+from shared.database.session import RoutingSession
+from shared.utils.documento_fiscal import TIPO_CPF
+from shared.utils.metrics import cache_consultas
+
+
+async def criar_banco(nome_do_produtor: str = "Produtor"):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    metadata = MetaData()
+    for model in (Produtor, Propriedade, Alteracao, Job):
+        model.__table__.to_metadata(metadata)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(insert(Produtor), [
+            {"id": i, "documento_tipo": TIPO_CPF, "documento_chave": 529982240 + i, "nome": f"{nome_do_produtor} {i}"} for i in (1, 2)
+        ])
+        await conn.execute(insert(Propriedade), [
+            {"id": i, "nome": f"Fazenda {i}", "cidade": "Sorriso", "estado": "MT", "area_total": 100,
+             "area_agricultavel": 60, "area_vegetacao": 30, "produtor_id": 1} for i in (1, 2)
+        ])
+    return engine
+
+
+@pytest.fixture
+async def engine():
+    engine = await criar_banco()
+    yield engine
+    await engine.dispose()
+
+
+class RepositorioContado:
+    """Conta as idas ao banco do ``get_by_id``."""
+
+    def __init__(self, linhas: dict, atraso: float = 0):
+        self.linhas = linhas
+        self.atraso = atraso
+        self.consultas = 0
+
+    async def get_by_id(self, produtor_id: int):
+        self.consultas += 1
+        await asyncio.sleep(self.atraso)
+        return self.linhas.get(produtor_id)
+
+
+def produtor(produtor_id: int, nome: str = "Ana") -> dict:
+    return {"id": produtor_id, "cpf_cnpj": "529.982.247-25", "nome": nome, "versao": 1, "propriedades": []}
+
+
+def consultas(cache: str, resultado: str) -> float:
+    return cache_consultas.valores.get((cache, resultado), 0)
+
+
+class TestEntityCache:
+    """Test cases for the read-through entity cache."""
+
+    @pytest.mark.asyncio
+    async def test_second_read_is_a_hit(self):
+        cache = EntityCache(10, 60)
+        repository = RepositorioContado({1: produtor(1)})
+        acertos = consultas("entidades_produtor", "hit")
+
+        primeiro = await cache.obter("produtor", 1, lambda: repository.get_by_id(1))
+        segundo = await cache.obter("produtor", 1, lambda: repository.get_by_id(1))
+
+        assert isinstance(primeiro, ProdutorReadDTO)
+        assert segundo is primeiro
+        assert repository.consultas == 1
+        assert consultas("entidades_produtor", "hit") == acertos + 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        cache = EntityCache(10, 60)
+        repository = RepositorioContado({1: produtor(1)}, atraso=0.05)
+
+        resultados = await asyncio.gather(*(cache.obter("produtor", 1, lambda: repository.get_by_id(1)) for _ in range(20)))
+
+        assert repository.consultas == 1
+        assert all(r is resultados[0] for r in resultados)
+
+    @pytest.mark.asyncio
+    async def test_waiters_reload_when_the_loader_is_cancelled(self):
+        cache = EntityCache(10, 60)
+        repository = RepositorioContado({1: produtor(1)}, atraso=0.05)
+
+        carga = asyncio.ensure_future(cache.obter("produtor", 1, lambda: repository.get_by_id(1)))
+        await asyncio.sleep(0.01)
+        espera = asyncio.ensure_future(cache.obter("produtor", 1, lambda: repository.get_by_id(1)))
+        await asyncio.sleep(0.01)
+        carga.cancel()
+
+        assert (await espera).nome == "Ana"
+        assert carga.cancelled()
+        assert repository.consultas == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_rows_are_not_cached(self):
+        cache = EntityCache(10, 60)
+        repository = RepositorioContado({})
+
+        assert await cache.obter("produtor", 1, lambda: repository.get_by_id(1)) is None
+        assert await cache.obter("produtor", 1, lambda: repository.get_by_id(1)) is None
+        assert repository.consultas == 2
+
+    @pytest.mark.asyncio
+    async def test_load_racing_an_invalidation_is_not_stored(self):
+        cache = EntityCache(10, 60)
+        repository = RepositorioContado({1: produtor(1)}, atraso=0.05)
+
+        carga = asyncio.ensure_future(cache.obter("produtor", 1, lambda: repository.get_by_id(1)))
+        await asyncio.sleep(0.01)
+        repository.linhas[1] = produtor(1, "Alterada")
+        await cache.invalidar(chave("produtor", 1))
+        await carga
+
+        assert (await cache.obter("produtor", 1, lambda: repository.get_by_id(1))).nome == "Alterada"
+        assert repository.consultas == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_and_entries_expire(self):
+        repository = RepositorioContado({i: produtor(i) for i in (1, 2, 3)})
+        cache = EntityCache(2, 60)
+        for i in (1, 2, 1, 3):
+            await cache.obter("produtor", i, lambda i=i: repository.get_by_id(i))
+        assert repository.consultas == 3
+        # O 2 era o menos usado
+        await cache.obter("produtor", 2, lambda: repository.get_by_id(2))
+        assert repository.consultas == 4
+
+        cache = EntityCache(10, 0)
+        await cache.obter("produtor", 1, lambda: repository.get_by_id(1))
+        await cache.obter("produtor", 1, lambda: repository.get_by_id(1))
+        assert repository.consultas == 6
+
+    @pytest.mark.asyncio
+    async def test_services_invalidate_what_they_write(self, engine):
+        cache = EntityCache(100, 60)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            produtores = ProdutorService(ProdutorRepository(session), cache)
+            propriedades = PropriedadeService(PropriedadeRepository(session), PropriedadeMirror(), cache)
+
+            assert [p.nome for p in (await produtores.get_produtor_by_id(1)).propriedades] == ["Fazenda 1", "Fazenda 2"]
+            assert (await propriedades.get_propriedade_by_id(2)).produtor.nome == "Produtor 1"
+            assert set(cache._entradas) == {"produtor:1", "propriedade:2"}
+
+            # Escrever na propriedade derruba o produtor que a embute
+            await propriedades.patch_propriedade(1, PropriedadePatchDTO(versao=1, nome="Renomeada"))
+            assert set(cache._entradas) == {"propriedade:2"}
+            assert [p.nome for p in (await produtores.get_produtor_by_id(1)).propriedades] == ["Renomeada", "Fazenda 2"]
+
+            # E escrever no produtor derruba as propriedades que o embutem
+            await produtores.patch_produtor(1, ProdutorPatchDTO(versao=1, nome="Ana"))
+            assert set(cache._entradas) == set()
+            assert (await propriedades.get_propriedade_by_id(2)).produtor.nome == "Ana"
+
+    @pytest.mark.asyncio
+    async def test_delete_drops_the_entry(self, engine, monkeypatch):
+        monkeypatch.setattr(job_runner, "submit", lambda job_id: None)
+        cache = EntityCache(100, 60)
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            service = ProdutorService(ProdutorRepository(session), cache)
+            assert await service.get_produtor_by_id(2) is not None
+            await service.delete_produtor(2)
+
+            assert await service.get_produtor_by_id(2) is None
+
+    @pytest.mark.asyncio
+    async def test_misses_are_loaded_from_the_primary(self):
+        primario, replica = await criar_banco(), await criar_banco("Atrasado")
+        sessoes = async_sessionmaker(
+            class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False,
+            primary=primario.sync_engine, replica=replica.sync_engine,
+        )
+        try:
+            async with sessoes() as session:
+                service = ProdutorService(ProdutorRepository(session), EntityCache(100, 60))
+
+                # A réplica ainda não viu a escrita; o cache não pode guardar o que ela leu
+                assert (await service.get_produtor_by_id(1)).nome == "Produtor 1"
+                assert (await ProdutorRepository(session).get_by_id(2)).nome == "Atrasado 2"
+        finally:
+            await primario.dispose()
+            await replica.dispose()
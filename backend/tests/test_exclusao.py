@@ -0,0 +1,210 @@
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import MetaData, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.changes.entities.alteracao import Alteracao
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
+from modules.cultura.entities.cultura import Cultura
+from modules.jobs.entities.job import Job
+from modules.jobs.services.job_runner import job_runner
+from modules.jobs.services import purga
+from modules.jobs.services.purga import PURGA, purgar, varrer
+from modules.produtor.controllers import produtor_controller
+from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO, ProdutorPatchDTO
+from modules.produtor.entities.produtor import Produtor
+from modules.produtor.repositories.produtor_repository import ProdutorRepository
+from modules.produtor.services.produtor_service import ProdutorService
+from modules.propriedade.dtos.propriedade_dto import PropriedadeCreateDTO, PropriedadePatchDTO
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.propriedade.repositories.propriedade_repository import PropriedadeRepository
+from modules.propriedade.services.propriedade_mirror import PropriedadeMirror
+from modules.propriedade.services.propriedade_service import PropriedadeService
+from modules.safra.entities.safra import Safra
+from modules.safra.repositories.safra_repository import SafraRepository
+from shared.database.exclusao import PaiNaoEncontrado
+from shared.database.session import get_db
+from shared.utils import change_events
+from shared.utils.documento_fiscal import TIPO_CPF
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    metadata = MetaData()
+    # Cópia das tabelas sem autoincrement: o SQLite não o aceita em PK composta
+    for model in (Produtor, Propriedade, Safra, CatalogoCultura, Cultura):
+        model.__table__.to_metadata(metadata).c.id.autoincrement = False
+    for model in (Alteracao, Job):
+        model.__table__.to_metadata(metadata)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(insert(Produtor), [
+            {"id": i, "documento_tipo": TIPO_CPF, "documento_chave": 529982240 + i, "nome": f"Produtor {i}"} for i in (1, 2)
+        ])
+        await conn.execute(insert(Propriedade), [
+            {"id": i, "nome": f"Fazenda {i}", "cidade": "Sorriso", "estado": "MT", "area_total": 100,
+             "area_agricultavel": 60, "area_vegetacao": 30, "produtor_id": 1 if i < 3 else 2} for i in (1, 2, 3)
+        ])
+        await conn.execute(insert(Safra), [{"id": i, "ano": 2024, "propriedade_id": 1 + i % 3} for i in range(1, 6)])
+        await conn.execute(insert(CatalogoCultura), [{"id": 1, "nome": "Soja", "nome_normalizado": "soja"}])
+        await conn.execute(insert(Cultura), [
+            *({"id": i, "ano": 2024, "catalogo_id": 1, "safra_id": 1 + i % 5, "propriedade_id": 1 + i % 3} for i in range(1, 8)),
+            {"id": 8, "ano": 2024, "catalogo_id": 1, "safra_id": 5, "propriedade_id": 3},
+        ])
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def submetidos(monkeypatch):
+    jobs = []
+    monkeypatch.setattr(job_runner, "submit", jobs.append)
+    return jobs
+
+
+async def ids(engine, model) -> list[int]:
+    async with engine.connect() as conn:
+        return list((await conn.execute(select(model.id).order_by(model.id))).scalars())
+
+
+class TestExclusaoLogica:
+    """Test cases for soft delete and its background purge."""
+
+    @pytest.mark.asyncio
+    async def test_delete_hides_the_row_and_schedules_the_purge(self, engine, submetidos):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            service = ProdutorService(ProdutorRepository(session))
+            exclusao = await service.delete_produtor(1)
+
+            assert submetidos == [exclusao.purga]
+            assert await service.get_produtor_by_id(1) is None
+            assert [p.id for p in await service.get_all_produtores()] == [2]
+            assert (await service.count_produtores()).total == 1
+            assert await service.patch_produtor(1, ProdutorPatchDTO(versao=2, nome="Volta")) is None
+            with pytest.raises(ValueError, match="Produtor não encontrado"):
+                await service.delete_produtor(1)
+
+            job = await session.get(Job, exclusao.purga)
+            assert (job.tipo, job.parametros) == (PURGA, {"entidade": "produtor", "id": 1})
+
+        # A linha continua lá até a purga; as dependentes nem foram tocadas
+        assert await ids(engine, Produtor) == [1, 2]
+        assert await ids(engine, Propriedade) == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_document_of_a_deleted_produtor_can_be_registered_again(self, engine, submetidos):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            service = ProdutorService(ProdutorRepository(session))
+            antigo = (await service.create_produtor(ProdutorCreateDTO(cpf_cnpj="52998224725", nome="Ana"))).id
+            await service.delete_produtor(antigo)
+
+            novo = (await service.create_produtor(ProdutorCreateDTO(cpf_cnpj="52998224725", nome="Ana"))).id
+            with pytest.raises(ValueError, match="CPF/CNPJ já cadastrado"):
+                await service.create_produtor(ProdutorCreateDTO(cpf_cnpj="529.982.247-25", nome="Outra"))
+
+        assert novo != antigo
+        # O antigo segue na tabela, à espera da purga
+        assert await ids(engine, Produtor) == [1, 2, antigo, novo]
+
+    @pytest.mark.asyncio
+    async def test_relationships_skip_deleted_rows(self, engine, submetidos):
+        async with AsyncSession(engine) as session:
+            await PropriedadeRepository(session).delete(2)
+            produtor = await ProdutorRepository(session).get_by_id(1)
+
+            assert [p.id for p in produtor.propriedades] == [1]
+
+    @pytest.mark.asyncio
+    async def test_writes_under_a_deleted_parent_are_rejected(self, engine, submetidos):
+        async with AsyncSession(engine) as session:
+            await ProdutorRepository(session).delete(1)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            service = PropriedadeService(PropriedadeRepository(session), PropriedadeMirror())
+            with pytest.raises(ValueError, match="Erro ao cadastrar propriedade"):
+                await service.create_propriedade(PropriedadeCreateDTO(
+                    nome="Nova", cidade="Sorriso", estado="MT", area_total=100, area_agricultavel=60, area_vegetacao=30, produtor_id=1,
+                ))
+            with pytest.raises(ValueError, match="Erro ao alterar propriedade"):
+                await service.patch_propriedade(3, PropriedadePatchDTO(versao=1, produtor_id=1))
+            # A propriedade 1 está viva, mas o produtor dela não: a purga a levaria junto
+            with pytest.raises(PaiNaoEncontrado):
+                await SafraRepository(session).create(Safra(id=9, ano=2024, propriedade_id=1))
+            safra = await SafraRepository(session).create(Safra(id=9, ano=2024, propriedade_id=3))
+
+        assert safra.id == 9
+        assert await ids(engine, Propriedade) == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_purge_removes_dependents_in_batches(self, engine, submetidos):
+        async with AsyncSession(engine) as session:
+            await ProdutorRepository(session).delete(1)
+        progresso = []
+
+        async def registrar(atual, total=None):
+            progresso.append((atual, total))
+
+        resultado = await purgar(engine, "produtor", 1, 2, registrar)
+
+        assert resultado["apagadas"] == {"culturas": 7, "safras": 3, "propriedades": 2}
+        assert await ids(engine, Produtor) == [2]
+        assert await ids(engine, Propriedade) == [3]
+        assert await ids(engine, Safra) == [2, 5]
+        assert await ids(engine, Cultura) == [8]
+        # 12 dependentes em lotes de 2, mais a raiz
+        assert progresso[0] == (0, 13)
+        assert progresso[-1] == (13, 13)
+        assert len(progresso) == 10
+
+        async with engine.connect() as conn:
+            result = await conn.execute(select(Alteracao.entidade, Alteracao.operacao))
+            excluidas = [entidade for entidade, operacao in result if operacao == "exclusao"]
+        assert sorted(excluidas) == sorted(["produtor"] + ["cultura"] * 7 + ["safra"] * 3 + ["propriedade"] * 2)
+
+    @pytest.mark.asyncio
+    async def test_purge_updates_the_mirror_and_the_stream(self, engine, submetidos, monkeypatch):
+        removidas, eventos = [], []
+        monkeypatch.setattr(purga, "propriedade_mirror", SimpleNamespace(remover=removidas.append))
+        monkeypatch.setattr(change_events, "_listeners", {})
+        for entidade in ("propriedade", "cultura"):
+            change_events.subscribe(entidade, lambda entidade, operacao, _id: eventos.append((entidade, operacao, _id)))
+        async with AsyncSession(engine) as session:
+            await ProdutorRepository(session).delete(1)
+
+        await purgar(engine, "produtor", 1, 100)
+
+        assert sorted(removidas) == [1, 2]
+        assert sorted(_id for entidade, _, _id in eventos if entidade == "propriedade") == [1, 2]
+        assert len([e for e in eventos if e[0] == "cultura"]) == 7
+        assert {operacao for _, operacao, _ in eventos} == {"exclusao"}
+
+    @pytest.mark.asyncio
+    async def test_sweep_purges_leftover_deletions(self, engine, submetidos):
+        async with AsyncSession(engine) as session:
+            await PropriedadeRepository(session).delete(3)
+        async with AsyncSession(engine) as session:
+            await ProdutorRepository(session).delete(2)
+
+        assert await varrer(engine, 100) == {"purgadas": 2}
+        assert await ids(engine, Produtor) == [1]
+        assert await ids(engine, Propriedade) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_delete_endpoint_returns_the_purge_job(self, engine, submetidos):
+        app = FastAPI()
+        app.include_router(produtor_controller.router)
+
+        async def sqlite_db():
+            async with AsyncSession(engine) as session:
+                yield session
+
+        app.dependency_overrides[get_db] = sqlite_db
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            excluido = await client.delete("/produtores/1")
+            ausente = await client.delete("/produtores/1")
+
+        assert excluido.status_code == 204
+        assert excluido.headers["X-Purge-Job"] == str(submetidos[0])
+        assert ausente.status_code == 404
@@ -0,0 +1,196 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+from sqlalchemy import MetaData, event, insert, select, text
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.util import await_only
+from modules.changes.entities.alteracao import Alteracao
+from modules.cultura.dtos.cultura_dto import CulturaCreateDTO
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
+from modules.cultura.repositories.catalogo_cultura_repository import CatalogoCulturaRepository
+from modules.cultura.repositories.cultura_repository import CulturaRepository
+from modules.cultura.services.catalogo_cultura_service import CatalogoCulturaCache, CatalogoCulturaService
+from modules.cultura.services.cultura_service import CulturaService
+from modules.produtor.entities.produtor import Produtor
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.safra.dtos.safra_dto import SafraCreateDTO
+from modules.safra.entities.safra import Safra
+from modules.safra.repositories.safra_repository import SafraRepository
+from modules.safra.services.safra_service import SafraService
+from shared.config.settings import settings
+from shared.database.exclusao import PaiNaoEncontrado
+from shared.database.group_commit import GroupCommit
+from shared.exceptions import DeadlineExceeded
+from shared.utils.deadline import reset_deadline, set_deadline
+from shared.utils.documento_fiscal import TIPO_CPF
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'group_commit.db'}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys = ON")
+
+    metadata = MetaData()
+    for model in (Produtor, Propriedade, CatalogoCultura, Alteracao):
+        model.__table__.to_metadata(metadata)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        # O SQLite só gera o id sozinho numa PK de uma coluna, como a sequência do Postgres
+        await conn.execute(text(
+            "CREATE TABLE safras (id INTEGER PRIMARY KEY, ano INTEGER NOT NULL, "
+            "propriedade_id INTEGER NOT NULL REFERENCES propriedades(id), "
+            "versao INTEGER NOT NULL DEFAULT 1, excluido_em DATETIME)"
+        ))
+        await conn.execute(text(
+            "CREATE TABLE culturas (id INTEGER PRIMARY KEY, ano INTEGER NOT NULL, "
+            "catalogo_id INTEGER NOT NULL REFERENCES catalogo_culturas(id), safra_id INTEGER NOT NULL, "
+            "propriedade_id INTEGER NOT NULL REFERENCES propriedades(id), "
+            "versao INTEGER NOT NULL DEFAULT 1, excluido_em DATETIME)"
+        ))
+        await conn.execute(insert(Produtor), [{"id": 1, "documento_tipo": TIPO_CPF, "documento_chave": 529982247, "nome": "Ana"}])
+        await conn.execute(insert(Propriedade), [
+            {"id": i, "nome": f"Fazenda {i}", "cidade": "Sorriso", "estado": "MT", "area_total": 100,
+             "area_agricultavel": 60, "area_vegetacao": 30, "produtor_id": 1} for i in (1, 2)
+        ])
+        await conn.execute(insert(CatalogoCultura), [{"id": 1, "nome": "Soja", "nome_normalizado": "soja"}])
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def commits(engine):
+    feitos = []
+    event.listen(engine.sync_engine, "commit", feitos.append)
+    return feitos
+
+
+async def changelog(engine):
+    async with engine.connect() as conn:
+        result = await conn.execute(select(Alteracao.entidade, Alteracao.entidade_id, Alteracao.operacao).order_by(Alteracao.seq))
+        return result.all()
+
+
+class TestGroupCommit:
+    """Test cases for coalescing concurrent inserts into one transaction."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_inserts_share_one_commit(self, engine, commits):
+        escritor = GroupCommit(engine, 50, 100)
+        safras = await asyncio.gather(*(escritor.inserir(Safra(ano=2024, propriedade_id=1 + i % 2)) for i in range(10)))
+
+        assert [safra.id for safra in safras] == list(range(1, 11))
+        assert [safra.propriedade_id for safra in safras] == [1 + i % 2 for i in range(10)]
+        assert {safra.versao for safra in safras} == {1}
+        # Uma transação; no Postgres também um statement só (o id SERIAL ordena o RETURNING)
+        assert len(commits) == 1
+        assert await changelog(engine) == [("safra", i, "criacao") for i in range(1, 11)]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_written_without_waiting(self, engine, commits):
+        escritor = GroupCommit(engine, 60_000, 3)
+        safras = await asyncio.wait_for(
+            asyncio.gather(*(escritor.inserir(Safra(ano=2024, propriedade_id=1)) for _ in range(6))), timeout=5
+        )
+
+        assert sorted(safra.id for safra in safras) == list(range(1, 7))
+        assert len(commits) == 2
+
+    @pytest.mark.asyncio
+    async def test_bad_row_fails_alone(self, engine):
+        escritor = GroupCommit(engine, 50, 100)
+        resultados = await asyncio.gather(
+            escritor.inserir(Safra(ano=2024, propriedade_id=1)),
+            escritor.inserir(Safra(ano=2024, propriedade_id=99)),
+            escritor.inserir(Safra(ano=2024, propriedade_id=2)),
+            return_exceptions=True,
+        )
+
+        assert isinstance(resultados[1], IntegrityError)
+        assert [resultados[0].propriedade_id, resultados[2].propriedade_id] == [1, 2]
+        assert [operacao for _, _, operacao in await changelog(engine)] == ["criacao", "criacao"]
+
+    @pytest.mark.asyncio
+    async def test_data_error_fails_only_its_row(self, engine):
+        # Limite de tamanho de valor baixo: o nome longo dá DataError (string or blob too big)
+        @event.listens_for(engine.sync_engine, "connect")
+        def _limite(dbapi_connection, connection_record):
+            driver = dbapi_connection.driver_connection
+            await_only(driver._execute(lambda: driver._conn.setlimit(sqlite3.SQLITE_LIMIT_LENGTH, 2000)))
+
+        await engine.dispose()
+        escritor = GroupCommit(engine, 50, 100)
+
+        def propriedade(nome):
+            return Propriedade(nome=nome, cidade="Sorriso", estado="MT", area_total=100, area_agricultavel=60, area_vegetacao=30, produtor_id=1)
+
+        resultados = await asyncio.gather(
+            escritor.inserir(propriedade("Boa")),
+            escritor.inserir(propriedade("x" * 5000)),
+            escritor.inserir(propriedade("Outra")),
+            return_exceptions=True,
+        )
+
+        assert isinstance(resultados[1], DataError)
+        assert [resultados[0].nome, resultados[2].nome] == ["Boa", "Outra"]
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_fails_only_its_row(self, engine, commits):
+        escritor = GroupCommit(engine, 50, 100)
+
+        async def inserir(deadline):
+            token = set_deadline(deadline)
+            try:
+                return await escritor.inserir(Safra(ano=2024, propriedade_id=1))
+            finally:
+                reset_deadline(token)
+
+        resultados = await asyncio.gather(
+            inserir(time.monotonic() + 10), inserir(time.monotonic() + 0.01), inserir(None), return_exceptions=True,
+        )
+
+        assert isinstance(resultados[1], DeadlineExceeded)
+        assert [resultados[0].id, resultados[2].id] == [1, 2]
+        assert len(commits) == 1
+
+    @pytest.mark.asyncio
+    async def test_rows_under_a_deleted_parent_fail_alone(self, engine):
+        async with engine.begin() as conn:
+            await conn.execute(text("UPDATE propriedades SET excluido_em = CURRENT_TIMESTAMP WHERE id = 2"))
+        escritor = GroupCommit(engine, 50, 100)
+        resultados = await asyncio.gather(
+            escritor.inserir(Safra(ano=2024, propriedade_id=1)),
+            escritor.inserir(Safra(ano=2024, propriedade_id=2)),
+            return_exceptions=True,
+        )
+
+        assert resultados[0].propriedade_id == 1
+        assert isinstance(resultados[1], PaiNaoEncontrado)
+
+    @pytest.mark.asyncio
+    async def test_services_use_the_writer_when_enabled(self, engine, commits, monkeypatch):
+        monkeypatch.setattr(settings, "group_commit_enabled", True)
+        monkeypatch.setattr(settings, "group_commit_max_delay_ms", 50)
+        cache = CatalogoCulturaCache()
+        cache.add(1, "soja", "Soja")
+
+        async def criar_safra(propriedade_id):
+            async with AsyncSession(engine) as session:
+                return await SafraService(SafraRepository(session)).create_safra(SafraCreateDTO(ano=2024, propriedade_id=propriedade_id))
+
+        primeira, segunda = await asyncio.gather(criar_safra(1), criar_safra(2))
+        assert (primeira.id, segunda.id) == (1, 2)
+        assert len(commits) == 1
+        with pytest.raises(ValueError, match="Erro ao cadastrar safra"):
+            await criar_safra(99)
+
+        async with AsyncSession(engine) as session:
+            catalogo = CatalogoCulturaService(CatalogoCulturaRepository(session), cache)
+            service = CulturaService(CulturaRepository(session), catalogo)
+            cultura = await service.create_cultura(CulturaCreateDTO(nome="soja", safra_id=1, propriedade_id=1))
+
+        assert (cultura.id, cultura.nome, cultura.ano) == (1, "Soja", 2024)
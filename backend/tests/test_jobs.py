@@ -0,0 +1,180 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from httpx import AsyncClient
+from modules.jobs.services.job_handlers import normalizar_lote
+from modules.jobs.services.job_runner import JobRunner
+
+
+class FakeJobRunner(JobRunner):
+    """JobRunner that keeps job state in memory instead of the database."""
+
+    def __init__(self, jobs, **kwargs):
+        super().__init__(session_factory=None, **kwargs)
+        self.jobs = jobs
+
+    async def load_job(self, job_id):
+        return self.jobs.get(job_id)
+
+    async def update_job(self, job_id, **fields):
+        for key, value in fields.items():
+            setattr(self.jobs[job_id], key, value)
+
+    async def claim_job(self, job_id):
+        if self.jobs[job_id].status != "pendente":
+            return False
+        self.jobs[job_id].status = "executando"
+        return True
+
+    async def requeue_jobs(self):
+        for job in self.jobs.values():
+            if job.status == "executando":
+                job.status = "pendente"
+        return [job_id for job_id, job in self.jobs.items() if job.status == "pendente"]
+
+
+def make_job(tipo, parametros=None):
+    return SimpleNamespace(tipo=tipo, parametros=parametros or {}, status="pendente", progresso=0, total=None, resultado=None, erro=None)
+
+
+class TestJobHandlers:
+    """Test cases for job handler helpers."""
+
+    def test_normalizar_lote(self):
+        documentos = ["529.982.247-25", "11144477735", "12345678901", "11.222.333/0001-81", "123"]
+        assert normalizar_lote(documentos) == ["52998224725", "11144477735", None, "11222333000181", None]
+
+
+class TestJobRunner:
+    """Test cases for the in-process job runner."""
+
+    @pytest.mark.asyncio
+    async def test_job_completes_with_progress(self):
+        jobs = {1: make_job("validar_documentos", {"documentos": ["52998224725", "00000000000"], "tamanho_lote": 1})}
+        runner = FakeJobRunner(jobs, max_concurrency=1, process_workers=0)
+        from modules.jobs.services.job_handlers import validar_documentos
+        runner.register("validar_documentos")(validar_documentos)
+
+        await runner.submit(1)
+
+        assert jobs[1].status == "concluido"
+        assert jobs[1].progresso == 2
+        assert jobs[1].total == 2
+        assert jobs[1].resultado == {"total": 2, "invalidos": ["00000000000"], "duplicados": []}
+
+    @pytest.mark.asyncio
+    async def test_job_failure_is_recorded(self):
+        jobs = {1: make_job("quebra")}
+        runner = FakeJobRunner(jobs, max_concurrency=1, process_workers=0)
+
+        @runner.register("quebra")
+        async def quebra(ctx, parametros):
+            raise RuntimeError("falhou de propósito")
+
+        await runner.submit(1)
+
+        assert jobs[1].status == "falhou"
+        assert jobs[1].erro == "falhou de propósito"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        jobs = {i: make_job("lento") for i in range(6)}
+        runner = FakeJobRunner(jobs, max_concurrency=2, process_workers=0)
+        ativos, pico = 0, 0
+
+        @runner.register("lento")
+        async def lento(ctx, parametros):
+            nonlocal ativos, pico
+            ativos += 1
+            pico = max(pico, ativos)
+            await asyncio.sleep(0.01)
+            ativos -= 1
+
+        await asyncio.gather(*(runner.submit(i) for i in jobs))
+
+        assert pico == 2
+        assert all(job.status == "concluido" for job in jobs.values())
+
+    @pytest.mark.asyncio
+    async def test_shutdown_returns_running_job_to_the_queue(self):
+        jobs = {1: make_job("infinito")}
+        runner = FakeJobRunner(jobs, max_concurrency=1, process_workers=0)
+        iniciou = asyncio.Event()
+
+        @runner.register("infinito")
+        async def infinito(ctx, parametros):
+            iniciou.set()
+            await asyncio.Event().wait()
+
+        task = runner.submit(1)
+        await iniciou.wait()
+        await runner.shutdown()
+
+        assert task.cancelled()
+        assert jobs[1].status == "pendente"
+
+    @pytest.mark.asyncio
+    async def test_resume_reruns_unfinished_jobs(self):
+        jobs = {1: make_job("ok"), 2: make_job("ok"), 3: make_job("ok")}
+        jobs[2].status = "executando"
+        jobs[3].status = "concluido"
+        runner = FakeJobRunner(jobs, max_concurrency=2, process_workers=0)
+        executados = []
+
+        @runner.register("ok")
+        async def ok(ctx, parametros):
+            executados.append(ctx.job_id)
+
+        assert await runner.resume() == 2
+        await asyncio.gather(*runner._tasks)
+
+        assert sorted(executados) == [1, 2]
+        assert all(job.status == "concluido" for job in jobs.values())
+
+    @pytest.mark.asyncio
+    async def test_claimed_job_is_not_run_twice(self):
+        jobs = {1: make_job("ok")}
+        runner = FakeJobRunner(jobs, max_concurrency=2, process_workers=0)
+        executados = []
+
+        @runner.register("ok")
+        async def ok(ctx, parametros):
+            executados.append(ctx.job_id)
+
+        await asyncio.gather(runner.submit(1), runner.submit(1))
+
+        assert executados == [1]
+
+    @pytest.mark.asyncio
+    async def test_run_cpu_uses_process_pool(self):
+        runner = FakeJobRunner({}, max_concurrency=1, process_workers=1)
+        try:
+            assert await runner.run_cpu(normalizar_lote, ["123"]) == [None]
+            assert runner._executor is not None
+        finally:
+            await runner.shutdown()
+
+
+@pytest.mark.integration
+class TestJobEndpoints:
+    """Test cases for job endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_submit_unknown_job_type(self, client: AsyncClient):
+        response = await client.post("/jobs/", json={"tipo": "inexistente"})
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_submit_and_poll_job(self, client: AsyncClient):
+        response = await client.post("/jobs/", json={"tipo": "validar_documentos", "parametros": {"documentos": ["52998224725"]}})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        response = await client.get(f"/jobs/{job_id}")
+        assert response.status_code == 200
+        assert response.json()["status"] in ("pendente", "executando", "concluido")
+
+    @pytest.mark.asyncio
+    async def test_get_job_not_found(self, client: AsyncClient):
+        response = await client.get("/jobs/999999")
+        assert response.status_code == 404
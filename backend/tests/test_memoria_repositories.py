@@ -0,0 +1,153 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from modules.cultura.dtos.cultura_dto import CulturaCreateDTO
+from modules.cultura.repositories.catalogo_cultura_memoria_repository import CatalogoCulturaMemoriaRepository
+from modules.cultura.repositories.cultura_memoria_repository import CulturaMemoriaRepository
+from modules.cultura.services.catalogo_cultura_service import CatalogoCulturaCache, CatalogoCulturaService
+from modules.cultura.services.cultura_service import CulturaService
+from modules.produtor.controllers import produtor_controller
+from modules.produtor.dtos.produtor_dto import ProdutorCreateDTO, ProdutorPatchDTO
+from modules.produtor.repositories.produtor_memoria_repository import ProdutorMemoriaRepository
+from modules.produtor.services.produtor_service import ProdutorService
+from modules.propriedade.dtos.propriedade_dto import PropriedadeCreateDTO, PropriedadePatchDTO, PropriedadeUpdateDTO
+from modules.propriedade.repositories.propriedade_memoria_repository import PropriedadeMemoriaRepository
+from modules.propriedade.services.propriedade_mirror import PropriedadeMirror
+from modules.propriedade.services.propriedade_service import AREAS_INVALIDAS, PropriedadeService
+from modules.safra.dtos.safra_dto import SafraCreateDTO, SafraPatchDTO
+from modules.safra.repositories.safra_memoria_repository import SafraMemoriaRepository
+from modules.safra.services.safra_service import SafraService
+from shared.config.settings import settings
+from shared.database.memoria import BancoEmMemoria, banco_em_memoria
+from shared.exceptions import ConflitoDeVersao
+
+CPF = "52998224725"
+
+
+@pytest.fixture
+def banco():
+    return BancoEmMemoria()
+
+
+@pytest.fixture
+def produtores(banco):
+    return ProdutorService(ProdutorMemoriaRepository(banco))
+
+
+@pytest.fixture
+def propriedades(banco):
+    return PropriedadeService(PropriedadeMemoriaRepository(banco), PropriedadeMirror())
+
+
+def nova_propriedade(produtor_id: int, **areas) -> PropriedadeCreateDTO:
+    valores = {"area_total": 100, "area_agricultavel": 60, "area_vegetacao": 30, **areas}
+    return PropriedadeCreateDTO(nome="Fazenda", cidade="Sorriso", estado="MT", produtor_id=produtor_id, **valores)
+
+
+class TestMemoriaRepositories:
+    """Test cases for the in-memory repository backend."""
+
+    @pytest.mark.asyncio
+    async def test_document_index_and_unique_constraint(self, produtores):
+        produtor = await produtores.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+
+        assert (produtor.id, produtor.versao) == (1, 1)
+        assert await produtores.repository.get_by_cpf_cnpj("529.982.247-25") is produtor
+        assert await produtores.repository.get_by_cpf_cnpj("invalido") is None
+        with pytest.raises(ValueError, match="CPF/CNPJ já cadastrado"):
+            await produtores.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Outra"))
+        assert (await produtores.count_produtores()).total == 1
+
+    @pytest.mark.asyncio
+    async def test_patch_checks_version(self, produtores):
+        produtor = await produtores.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+
+        alterado = await produtores.patch_produtor(produtor.id, ProdutorPatchDTO(versao=1, nome="Ana Maria"))
+        assert (alterado.nome, alterado.versao) == ("Ana Maria", 2)
+        with pytest.raises(ConflitoDeVersao):
+            await produtores.patch_produtor(produtor.id, ProdutorPatchDTO(versao=1, nome="Velha"))
+        assert await produtores.patch_produtor(99, ProdutorPatchDTO(versao=1, nome="X")) is None
+
+    @pytest.mark.asyncio
+    async def test_patch_criteria_are_evaluated_in_python(self, produtores, propriedades):
+        await produtores.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+        propriedade = await propriedades.create_propriedade(nova_propriedade(1))
+
+        with pytest.raises(ValueError, match=AREAS_INVALIDAS):
+            await propriedades.patch_propriedade(propriedade.id, PropriedadePatchDTO(versao=1, area_vegetacao=50))
+        assert (propriedade.area_vegetacao, propriedade.versao) == (30, 1)
+
+        alterada = await propriedades.patch_propriedade(propriedade.id, PropriedadePatchDTO(versao=1, area_vegetacao=40))
+        assert (alterada.area_vegetacao, alterada.versao) == (40, 2)
+
+    @pytest.mark.asyncio
+    async def test_foreign_keys_and_secondary_indexes(self, banco, produtores, propriedades):
+        with pytest.raises(ValueError, match="Erro ao cadastrar propriedade"):
+            await propriedades.create_propriedade(nova_propriedade(99))
+
+        await produtores.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+        await produtores.create_produtor(ProdutorCreateDTO(cpf_cnpj="11144477735", nome="Bia"))
+        propriedade = await propriedades.create_propriedade(nova_propriedade(1))
+        assert [p.id for p in (await produtores.get_produtor_by_id(1)).propriedades] == [propriedade.id]
+        assert propriedade.produtor.nome == "Ana"
+
+        await propriedades.patch_propriedade(propriedade.id, PropriedadePatchDTO(versao=1, produtor_id=2))
+        assert (await produtores.get_produtor_by_id(1)).propriedades == []
+        assert banco["propriedades"].buscar("produtor_id", 2) == [propriedade]
+
+        # Sem job de purga: as dependentes vão junto na hora
+        exclusao = await produtores.delete_produtor(2)
+        assert (exclusao.id, exclusao.purga) == (2, None)
+        assert await produtores.get_produtor_by_id(2) is None
+        assert await propriedades.get_propriedade_by_id(propriedade.id) is None
+        assert banco["propriedades"].buscar("produtor_id", 2) == []
+        with pytest.raises(ValueError, match="Produtor não encontrado"):
+            await produtores.delete_produtor(2)
+
+    @pytest.mark.asyncio
+    async def test_failed_update_leaves_the_row_as_stored(self, banco, produtores, propriedades):
+        await produtores.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+        propriedade = await propriedades.create_propriedade(nova_propriedade(1))
+
+        with pytest.raises(ValueError, match="Erro ao alterar propriedade"):
+            await propriedades.update_propriedade(propriedade.id, PropriedadeUpdateDTO(
+                nome="Outra", cidade="Sinop", estado="MT", area_total=100, area_agricultavel=60, area_vegetacao=30, produtor_id=99,
+            ))
+
+        gravada = await propriedades.get_propriedade_by_id(propriedade.id)
+        assert (gravada.nome, gravada.produtor_id, gravada.versao) == ("Fazenda", 1, 1)
+        assert banco["propriedades"].buscar("produtor_id", 1) == [gravada]
+
+    @pytest.mark.asyncio
+    async def test_culturas_follow_the_year_of_their_safra(self, banco, produtores, propriedades):
+        await produtores.create_produtor(ProdutorCreateDTO(cpf_cnpj=CPF, nome="Ana"))
+        await propriedades.create_propriedade(nova_propriedade(1))
+        safras = SafraService(SafraMemoriaRepository(banco))
+        catalogo = CatalogoCulturaService(CatalogoCulturaMemoriaRepository(banco), CatalogoCulturaCache())
+        culturas = CulturaService(CulturaMemoriaRepository(banco), catalogo, SafraMemoriaRepository(banco))
+        safra = await safras.create_safra(SafraCreateDTO(ano=2024, propriedade_id=1))
+
+        cultura = await culturas.create_cultura(CulturaCreateDTO(nome=" soja ", safra_id=safra.id, propriedade_id=1))
+        assert (cultura.nome, cultura.ano) == ("soja", 2024)
+
+        await safras.patch_safra(safra.id, SafraPatchDTO(versao=1, ano=2025))
+        assert await culturas.get_all_culturas(2024) == []
+        assert [c.id for c in await culturas.get_all_culturas(2025)] == [cultura.id]
+        assert await culturas.get_cultura_by_id(cultura.id, 2025) is cultura
+        assert await culturas.get_culturas_by_ids([99, cultura.id, cultura.id], 2025) == [cultura]
+        assert await culturas.get_culturas_by_ids([cultura.id], 2024) == []
+
+    @pytest.mark.asyncio
+    async def test_backend_is_selected_by_configuration(self, monkeypatch):
+        monkeypatch.setattr(settings, "repository_backend", "memoria")
+        banco_em_memoria.clear()
+        app = FastAPI()
+        app.include_router(produtor_controller.router)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            criado = await client.post("/produtores/", json={"cpf_cnpj": CPF, "nome": "Ana"})
+            lido = await client.get(f"/produtores/{criado.json()['id']}")
+
+        banco_em_memoria.clear()
+        assert criado.status_code == 201
+        assert lido.json() == {"id": 1, "cpf_cnpj": CPF, "nome": "Ana", "versao": 1, "propriedades": []}
@@ -0,0 +1,135 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import MetaData, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.changes.entities.alteracao import Alteracao
+from modules.changes.repositories.alteracao_repository import AlteracaoRepository
+from modules.cultura.services.catalogo_cultura_service import CatalogoCulturaCache
+from modules.metrics.controllers import metrics_controller
+from shared.database import metrics as db_metrics
+from shared.middlewares.metrics import MetricsMiddleware, http_duracao, http_tamanho
+from shared.utils.instrumentation import instrumentado, operacao_atual
+from shared.utils.metrics import Contador, Histograma, Registro, cache_taxa_de_acerto
+
+
+def make_app():
+    app = FastAPI()
+
+    @app.get("/itens/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    app.include_router(metrics_controller.router)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+class TestExposicao:
+    """Test cases for the Prometheus text format."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        registro = Registro()
+        histograma = Histograma("latencia_seconds", "Latência", ("rota",), buckets=(0.1, 1.0), registro=registro)
+        for valor in (0.05, 0.5, 0.5, 3.0):
+            histograma.observar(valor, "/a")
+
+        assert registro.renderizar().splitlines() == [
+            "# HELP latencia_seconds Latência",
+            "# TYPE latencia_seconds histogram",
+            'latencia_seconds_bucket{rota="/a",le="0.1"} 1',
+            'latencia_seconds_bucket{rota="/a",le="1"} 3',
+            'latencia_seconds_bucket{rota="/a",le="+Inf"} 4',
+            'latencia_seconds_sum{rota="/a"} 4.05',
+            'latencia_seconds_count{rota="/a"} 4',
+        ]
+
+    def test_label_values_are_escaped_and_names_unique(self):
+        registro = Registro()
+        contador = Contador("erros_total", "Erros", ("motivo",), registro=registro)
+        contador.inc('a "b"\nc')
+        assert 'erros_total{motivo="a \\"b\\"\\nc"} 1' in registro.renderizar()
+        with pytest.raises(ValueError):
+            Contador("erros_total", "De novo", registro=registro)
+
+
+class TestMetricsMiddleware:
+    """Test cases for request metrics."""
+
+    @pytest.mark.asyncio
+    async def test_labels_use_route_template(self):
+        async with AsyncClient(transport=ASGITransport(app=make_app()), base_url="http://test") as client:
+            await client.get("/itens/1")
+            await client.get("/itens/2")
+            await client.get("/nao-existe/123")
+            response = await client.get("/metrics")
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert sum(http_duracao.series[("GET", "/itens/{item_id}", 200)][0]) >= 2
+        assert ("GET", "<sem_rota>", 404) in http_duracao.series
+        assert http_tamanho.series[("GET", "/itens/{item_id}")][1] >= 2 * len(b'{"id":1}')
+        assert 'http_request_duration_seconds_count{metodo="GET",rota="/itens/{item_id}",status="200"}' in response.text
+        assert "http_requests_in_flight 1" in response.text
+
+
+class TestInstrumentacao:
+    """Test cases for attributing statements to repository methods."""
+
+    @pytest.mark.asyncio
+    async def test_operation_is_set_only_during_the_call(self):
+        @instrumentado
+        class Repositorio:
+            async def get_by_id(self, id):
+                return operacao_atual.get()
+
+            def sincrono(self):
+                return operacao_atual.get()
+
+        assert await Repositorio().get_by_id(1) == "Repositorio.get_by_id"
+        assert Repositorio().sincrono() is None
+        assert operacao_atual.get() is None
+
+    @pytest.mark.asyncio
+    async def test_queries_are_counted_per_repository_method(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        metadata = MetaData()
+        Alteracao.__table__.to_metadata(metadata)
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        db_metrics.instrumentar(engine, "teste")
+        antes = db_metrics.db_consultas.valores[("AlteracaoRepository.get_since",)]
+
+        async with AsyncSession(engine) as session:
+            await AlteracaoRepository(session).get_since(0, 10)
+            await AlteracaoRepository(session).get_since(0, 10)
+        await engine.dispose()
+
+        assert db_metrics.db_consultas.valores[("AlteracaoRepository.get_since",)] == antes + 2
+        assert ("AlteracaoRepository.get_since",) in db_metrics.db_duracao.series
+
+    @pytest.mark.asyncio
+    async def test_failed_statements_do_not_leak_their_start(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        db_metrics.instrumentar(engine, "teste")
+
+        async with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(Exception):
+                    await conn.execute(text("SELECT * FROM nao_existe"))
+                await conn.rollback()
+            inicios = (await conn.get_raw_connection()).info.get("metrics_inicio")
+        await engine.dispose()
+
+        assert not inicios
+
+
+class TestCacheMetrics:
+    """Test cases for cache hit ratios."""
+
+    def test_catalog_cache_hits_and_misses(self):
+        cache = CatalogoCulturaCache()
+        cache.add(1, "soja", "Soja")
+        for nome in ("soja", "soja", "soja", "milho"):
+            cache.get_id(nome)
+
+        assert 0 < cache_taxa_de_acerto.coletar()[("catalogo_culturas",)] < 1
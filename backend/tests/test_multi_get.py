@@ -0,0 +1,146 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import MetaData, event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.cultura.entities.catalogo_cultura import CatalogoCultura
+from modules.cultura.entities.cultura import Cultura
+from modules.produtor.controllers import produtor_controller
+from modules.produtor.entities.produtor import Produtor
+from modules.propriedade.controllers import propriedade_controller
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.safra.controllers import safra_controller
+from modules.safra.entities.safra import Safra
+from shared.config.settings import settings
+from shared.database.batch_loader import batch_loader
+from shared.database.session import get_read_db
+from shared.utils.documento_fiscal import TIPO_CPF
+from shared.utils.multi_get import parse_ids
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    metadata = MetaData()
+    # Cópia das tabelas sem autoincrement: o SQLite não o aceita em PK composta
+    for model in (Produtor, Propriedade, Safra, CatalogoCultura, Cultura):
+        model.__table__.to_metadata(metadata).c.id.autoincrement = False
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(insert(Produtor), [
+            {"id": i, "documento_tipo": TIPO_CPF, "documento_chave": 529982240 + i, "nome": f"Produtor {i}"} for i in (1, 2)
+        ])
+        await conn.execute(insert(Propriedade), [
+            {"id": i, "nome": f"Fazenda {i}", "cidade": "Sorriso", "estado": "MT", "area_total": 100,
+             "area_agricultavel": 60, "area_vegetacao": 30, "produtor_id": 1 if i < 3 else 2} for i in (1, 2, 3)
+        ])
+        await conn.execute(insert(Safra), [{"id": 1, "ano": 2024, "propriedade_id": 1}, {"id": 2, "ano": 2025, "propriedade_id": 2}])
+        await conn.execute(insert(CatalogoCultura), [{"id": 1, "nome": "Soja", "nome_normalizado": "soja"}])
+        await conn.execute(insert(Cultura), [
+            {"id": 1, "ano": 2024, "catalogo_id": 1, "safra_id": 1, "propriedade_id": 1},
+            {"id": 2, "ano": 2024, "catalogo_id": 1, "safra_id": 1, "propriedade_id": 1},
+        ])
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    executados = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda conn, cursor, sql, *args: executados.append(sql))
+    return executados
+
+
+def make_app(engine):
+    app = FastAPI()
+    for controller in (produtor_controller, propriedade_controller, safra_controller):
+        app.include_router(controller.router)
+
+    async def sqlite_db():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = sqlite_db
+    return app
+
+
+class TestParseIds:
+    """Test cases for the ids query parameter."""
+
+    def test_keeps_order_and_drops_duplicates(self):
+        assert parse_ids("3, 1,3,,2") == [3, 1, 2]
+
+    @pytest.mark.parametrize("valor", ["", "a,b", "1;2"])
+    def test_invalid_values(self, valor):
+        with pytest.raises(ValueError):
+            parse_ids(valor)
+
+    def test_limit(self, monkeypatch):
+        monkeypatch.setattr(settings, "multi_get_max_ids", 2)
+        with pytest.raises(ValueError, match="No máximo 2"):
+            parse_ids("1,2,3")
+
+
+class TestBatchLoader:
+    """Test cases for the request-scoped batching loader."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_share_one_query(self, engine, statements):
+        async with AsyncSession(engine) as session:
+            loader = batch_loader(session)
+            um, dois, ausente = await asyncio.gather(loader.load(Produtor, 1), loader.load(Produtor, 2), loader.load(Produtor, 9))
+            assert (um.nome, dois.nome, ausente) == ("Produtor 1", "Produtor 2", None)
+            assert len(statements) == 1
+
+            # Cache da requisição: o mesmo id não volta ao banco
+            assert await loader.load(Produtor, 1) is um
+            assert len(statements) == 1
+            assert batch_loader(session) is loader
+
+
+class TestMultiGet:
+    """Test cases for ?ids= multi-get and batched relationship loading."""
+
+    @pytest.mark.asyncio
+    async def test_multi_get_in_requested_order(self, engine, statements):
+        async with AsyncClient(transport=ASGITransport(app=make_app(engine)), base_url="http://test") as client:
+            response = await client.get("/produtores/?ids=2,1,99")
+
+        assert response.status_code == 200
+        assert [produtor["id"] for produtor in response.json()] == [2, 1]
+        # Os produtores e, pelo selectin, as propriedades de todos eles
+        assert len(statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_relationships_are_loaded_in_one_query(self, engine, statements):
+        async with AsyncClient(transport=ASGITransport(app=make_app(engine)), base_url="http://test") as client:
+            propriedades = await client.get("/propriedades/")
+            assert [p["produtor"]["id"] for p in propriedades.json()] == [1, 1, 2]
+            assert len(statements) == 2
+            assert "produtores" in statements[1]
+
+            safras = await client.get("/safras/?ids=1,2")
+
+        assert [[c["id"] for c in safra["culturas"]] for safra in safras.json()] == [[1, 2], []]
+        assert len(statements) == 4
+        # As culturas filtradas pela chave inteira da safra, com o ano
+        assert "culturas.safra_id IN" in statements[3] and "culturas.ano IN" in statements[3]
+
+    @pytest.mark.asyncio
+    async def test_multi_get_sets_count_headers(self, engine):
+        async with AsyncClient(transport=ASGITransport(app=make_app(engine)), base_url="http://test") as client:
+            exato = await client.get("/propriedades/?ids=3,1,99&exato=true")
+            estimado = await client.get("/safras/?ids=1,2&exato=false")
+            sem_contagem = await client.get("/produtores/?ids=1")
+
+        assert exato.headers["X-Total-Count"] == "2"
+        assert estimado.headers["X-Total-Count"] == "2"
+        assert "X-Total-Count" not in sem_contagem.headers
+
+    @pytest.mark.asyncio
+    async def test_invalid_ids_are_rejected(self, engine):
+        async with AsyncClient(transport=ASGITransport(app=make_app(engine)), base_url="http://test") as client:
+            response = await client.get("/propriedades/?ids=1,x")
+
+        assert response.status_code == 400
@@ -0,0 +1,63 @@
+import pytest
+from datetime import date
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+from shared.database.partitions import (
+    archive_partitions,
+    ensure_partitions,
+    list_partitions,
+    partition_name,
+    partition_window,
+)
+from modules.safra.entities.safra import Safra
+from modules.cultura.entities.cultura import Cultura
+
+
+class TestPartitionHelpers:
+    """Test cases for the yearly partition helpers."""
+
+    def test_partition_window(self):
+        assert list(partition_window(date(2025, 6, 1), 1, 2)) == [2024, 2025, 2026, 2027]
+
+    def test_partition_name(self):
+        assert partition_name("culturas", 2025) == "culturas_2025"
+
+    def test_tables_are_partitioned_by_ano(self):
+        for model in (Safra, Cultura):
+            ddl = str(CreateTable(model.__table__).compile(dialect=postgresql.dialect()))
+            assert "PARTITION BY RANGE (ano)" in ddl
+            assert "PRIMARY KEY (id, ano)" in ddl
+
+    def test_cultura_references_safra_with_year(self):
+        ddl = str(CreateTable(Cultura.__table__).compile(dialect=postgresql.dialect()))
+        assert "FOREIGN KEY(safra_id, ano) REFERENCES safras (id, ano) ON UPDATE CASCADE" in ddl
+
+    def test_year_filter_reaches_query(self):
+        query = select(Cultura).where(Cultura.ano == 2025)
+        assert "culturas.ano = " in str(query)
+
+    @pytest.mark.asyncio
+    async def test_archive_rejects_invalid_schema(self):
+        with pytest.raises(ValueError):
+            await archive_partitions(None, 2020, "arquivo; DROP TABLE safras")
+
+
+@pytest.mark.integration
+class TestPartitionMaintenance:
+    """Integration tests for creating and archiving partitions."""
+
+    @pytest.mark.asyncio
+    async def test_create_and_archive_partitions(self, test_db_setup):
+        from tests.conftest import test_engine
+
+        async with test_engine.begin() as conn:
+            criadas = await ensure_partitions(conn, [2010, 2011])
+            assert "safras_2010" in criadas and "culturas_2011" in criadas
+            assert await ensure_partitions(conn, [2010, 2011]) == []
+
+            arquivadas = await archive_partitions(conn, 2010, "arquivo_teste")
+            assert sorted(arquivadas) == ["arquivo_teste.culturas_2010", "arquivo_teste.safras_2010"]
+            assert "safras_2010" not in await list_partitions(conn, "safras")
+            assert "safras_2011" in await list_partitions(conn, "safras")
+            await conn.execute(text("DROP SCHEMA arquivo_teste CASCADE"))
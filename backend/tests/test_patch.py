@@ -0,0 +1,119 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import MetaData, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.changes.entities.alteracao import Alteracao
+from modules.produtor.controllers import produtor_controller
+from modules.produtor.dtos.produtor_dto import ProdutorPatchDTO, ProdutorUpdateDTO
+from modules.produtor.entities.produtor import Produtor
+from modules.produtor.repositories.produtor_repository import ProdutorRepository
+from modules.produtor.services.produtor_service import ProdutorService
+from modules.propriedade.dtos.propriedade_dto import PropriedadePatchDTO
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.propriedade.repositories.propriedade_repository import PropriedadeRepository
+from modules.propriedade.services.propriedade_mirror import PropriedadeMirror
+from modules.propriedade.services.propriedade_service import PropriedadeService
+from shared.database.session import get_db
+from shared.exceptions import ConflitoDeVersao
+from shared.utils.documento_fiscal import TIPO_CPF
+
+CPF = "52998224725"
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    # Arquivo em vez de :memory: para que sessões diferentes vejam o mesmo banco
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'patch.db'}")
+    metadata = MetaData()
+    for model in (Produtor, Propriedade, Alteracao):
+        model.__table__.to_metadata(metadata)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(insert(Produtor), [{"id": 1, "documento_tipo": TIPO_CPF, "documento_chave": 529982247, "nome": "Ana"}])
+        await conn.execute(insert(Propriedade), [{
+            "id": 1, "nome": "Fazenda", "cidade": "Sorriso", "estado": "MT",
+            "area_total": 100.0, "area_agricultavel": 60.0, "area_vegetacao": 30.0, "produtor_id": 1,
+        }])
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def session(engine):
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+class TestPatch:
+    """Test cases for conditional partial updates."""
+
+    @pytest.mark.asyncio
+    async def test_applies_only_supplied_fields_and_bumps_version(self, session):
+        service = PropriedadeService(PropriedadeRepository(session), mirror=PropriedadeMirror())
+
+        propriedade = await service.patch_propriedade(1, PropriedadePatchDTO(cidade="Sinop", versao=1))
+
+        assert (propriedade.cidade, propriedade.nome, propriedade.area_total, propriedade.versao) == ("Sinop", "Fazenda", 100.0, 2)
+        alteracao = (await session.execute(select(Alteracao))).scalars().one()
+        assert (alteracao.operacao, alteracao.dados["cidade"], alteracao.dados["versao"]) == ("alteracao", "Sinop", 2)
+
+    @pytest.mark.asyncio
+    async def test_stale_version_conflicts(self, session):
+        service = ProdutorService(ProdutorRepository(session))
+        await service.patch_produtor(1, ProdutorPatchDTO(nome="Ana Maria", versao=1))
+
+        with pytest.raises(ConflitoDeVersao):
+            await service.patch_produtor(1, ProdutorPatchDTO(nome="Outra", versao=1))
+        assert (await service.get_produtor_by_id(1)).nome == "Ana Maria"
+
+    @pytest.mark.asyncio
+    async def test_missing_row(self, session):
+        service = ProdutorService(ProdutorRepository(session))
+        assert await service.patch_produtor(99, ProdutorPatchDTO(nome="X", versao=1)) is None
+
+    @pytest.mark.asyncio
+    async def test_area_rule_uses_stored_values_for_missing_fields(self, session):
+        service = PropriedadeService(PropriedadeRepository(session), mirror=PropriedadeMirror())
+
+        with pytest.raises(ValueError):
+            await service.patch_propriedade(1, PropriedadePatchDTO(area_total=80.0, versao=1))
+        propriedade = await service.patch_propriedade(1, PropriedadePatchDTO(area_total=95.0, versao=1))
+
+        assert (propriedade.area_total, propriedade.versao) == (95.0, 2)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_put_conflicts(self, engine):
+        async with AsyncSession(engine, expire_on_commit=False) as a, AsyncSession(engine, expire_on_commit=False) as b:
+            primeiro = ProdutorService(ProdutorRepository(a))
+            segundo = ProdutorService(ProdutorRepository(b))
+            # Os dois leem a versão 1 antes de qualquer escrita
+            lidos = [await primeiro.get_produtor_by_id(1), await segundo.get_produtor_by_id(1)]  # noqa: F841
+            await a.commit()
+            await b.commit()
+
+            await primeiro.update_produtor(1, ProdutorUpdateDTO(cpf_cnpj=CPF, nome="A"))
+            with pytest.raises(ConflitoDeVersao):
+                await segundo.update_produtor(1, ProdutorUpdateDTO(cpf_cnpj=CPF, nome="B"))
+
+
+class TestPatchEndpoint:
+    """Test cases for the PATCH status codes."""
+
+    @pytest.mark.asyncio
+    async def test_status_codes(self, session):
+        app = FastAPI()
+        app.include_router(produtor_controller.router)
+
+        async def override():
+            yield session
+
+        app.dependency_overrides[get_db] = override
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            ok = await client.patch("/produtores/1", json={"nome": "Ana Maria", "versao": 1})
+            conflito = await client.patch("/produtores/1", json={"nome": "Outra", "versao": 1})
+            ausente = await client.patch("/produtores/99", json={"nome": "X", "versao": 1})
+            sem_versao = await client.patch("/produtores/1", json={"nome": "X"})
+
+        assert (ok.status_code, ok.json()["nome"], ok.json()["versao"]) == (200, "Ana Maria", 2)
+        assert (conflito.status_code, ausente.status_code, sem_versao.status_code) == (409, 404, 422)
@@ -0,0 +1,139 @@
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from modules.debug.controllers import debug_controller
+from shared.config.settings import settings
+from shared.middlewares.profiling import (
+    AGUARDANDO,
+    Amostrador,
+    ProfileStore,
+    ProfilingMiddleware,
+    classificar,
+    pilha_suspensa,
+)
+
+TOKEN = "segredo"
+
+
+def ocupar_cpu(segundos: float):
+    fim = time.perf_counter() + segundos
+    while time.perf_counter() < fim:
+        pass
+
+
+def make_app(store, rules=()):
+    app = FastAPI()
+
+    @app.get("/lento")
+    async def lento():
+        ocupar_cpu(0.05)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    app.include_router(debug_controller.router)
+    app.add_middleware(ProfilingMiddleware, rules=list(rules), store=store, amostrador=Amostrador(1))
+    return app
+
+
+class TestClassificar:
+    """Test cases for attributing samples to layers."""
+
+    def test_innermost_application_frame_wins(self):
+        base = (("fastapi.routing", "run_endpoint_function"), ("modules.safra.controllers.safra_controller", "get_safras"))
+        servico = base + (("modules.safra.services.safra_service", "SafraService.get_all"),)
+        repositorio = servico + (("modules.safra.repositories.safra_repository", "SafraRepository.get_all"), ("sqlalchemy.orm.session", "Session.execute"))
+
+        assert classificar(base) == "controller"
+        assert classificar(servico) == "service"
+        assert classificar(repositorio + (AGUARDANDO,)) == "repository"
+        assert classificar((("fastapi.routing", "serialize_response"), ("pydantic.main", "BaseModel.model_validate"))) == "serializacao"
+        assert classificar((("starlette.routing", "Router.app"),)) == "outros"
+
+
+class TestPilhaSuspensa:
+    """Test cases for reading the await chain of a parked task."""
+
+    @pytest.mark.asyncio
+    async def test_follows_awaits_to_the_pending_future(self):
+        liberar = asyncio.Event()
+
+        async def interna():
+            await liberar.wait()
+
+        async def externa():
+            await interna()
+
+        task = asyncio.create_task(externa())
+        await asyncio.sleep(0)
+        funcoes = [funcao for _, funcao in pilha_suspensa(task.get_coro())]
+        liberar.set()
+        await task
+
+        assert funcoes[:2] == [
+            "TestPilhaSuspensa.test_follows_awaits_to_the_pending_future.<locals>.externa",
+            "TestPilhaSuspensa.test_follows_awaits_to_the_pending_future.<locals>.interna",
+        ]
+        assert funcoes[-1] == AGUARDANDO[1]
+        assert "Event.wait" in funcoes
+
+
+class TestProfilingMiddleware:
+    """Test cases for request selection and the /debug/profiles surface."""
+
+    @pytest.mark.asyncio
+    async def test_header_with_token_profiles_request(self, monkeypatch):
+        monkeypatch.setattr(settings, "debug_token", TOKEN)
+        store = ProfileStore(10)
+        monkeypatch.setattr(debug_controller, "profile_store", store)
+
+        async with AsyncClient(transport=ASGITransport(app=make_app(store)), base_url="http://test") as client:
+            response = await client.get("/lento", headers={"X-Profile": "1", "X-Debug-Token": TOKEN})
+            perfil_id = int(response.headers["x-profile-id"])
+
+            lista = await client.get("/debug/profiles", headers={"X-Debug-Token": TOKEN})
+            detalhe = await client.get(f"/debug/profiles/{perfil_id}", headers={"X-Debug-Token": TOKEN})
+            folded = await client.get(f"/debug/profiles/{perfil_id}/folded", headers={"X-Debug-Token": TOKEN})
+
+        assert [p["id"] for p in lista.json()] == [perfil_id]
+        dados = detalhe.json()
+        assert dados["motivo"] == "header" and dados["status"] == 200
+        assert dados["amostras"] > 0
+        assert set(dados["camadas"]) == {"controller", "service", "repository", "serializacao", "outros"}
+        assert "ocupar_cpu" in folded.text
+        assert AGUARDANDO[0] in folded.text
+        assert all(linha.rsplit(" ", 1)[1].isdigit() for linha in folded.text.splitlines())
+
+    @pytest.mark.asyncio
+    async def test_header_without_valid_token_is_ignored(self, monkeypatch):
+        monkeypatch.setattr(settings, "debug_token", TOKEN)
+        store = ProfileStore(10)
+
+        async with AsyncClient(transport=ASGITransport(app=make_app(store)), base_url="http://test") as client:
+            response = await client.get("/lento", headers={"X-Profile": "1", "X-Debug-Token": "errado"})
+
+        assert "x-profile-id" not in response.headers
+        assert store.listar() == []
+
+    @pytest.mark.asyncio
+    async def test_sample_rate_per_route(self, monkeypatch):
+        monkeypatch.setattr(settings, "debug_token", "")
+        store = ProfileStore(10)
+        app = make_app(store, rules=[("GET /lento", 100.0), ("GET /*", 0.0)])
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/lento")
+            await client.get("/debug/admission")
+
+        assert [(p["rota"], p["motivo"]) for p in store.listar()] == [("/lento", "amostragem")]
+
+    @pytest.mark.asyncio
+    async def test_profiles_require_configured_token(self, monkeypatch):
+        app = make_app(ProfileStore(10))
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            monkeypatch.setattr(settings, "debug_token", "")
+            assert (await client.get("/debug/profiles", headers={"X-Debug-Token": ""})).status_code == 403
+            monkeypatch.setattr(settings, "debug_token", TOKEN)
+            assert (await client.get("/debug/profiles")).status_code == 403
+            assert (await client.get("/debug/profiles/999", headers={"X-Debug-Token": TOKEN})).status_code == 404
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from modules.propriedade.dtos.propriedade_dto import PropriedadeCreateDTO, PropriedadeUpdateDTO
+from modules.propriedade.entities.propriedade import Propriedade
+from modules.propriedade.services.propriedade_mirror import ColunasPropriedade, PropriedadeMirror
+from modules.propriedade.services.propriedade_service import PropriedadeService
+from modules.dashboard.services.dashboard_service import DashboardService
+from modules.dashboard.services.dashboard_validation import compare_backends
+from modules.dashboard.services.mirror_dashboard_service import MirrorDashboardService
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session whose query blocks until released, to interleave writes."""
+
+    def __init__(self, rows, liberar: asyncio.Event):
+        self.rows = rows
+        self.liberar = liberar
+
+    async def execute(self, statement, bind_arguments=None):
+        await self.liberar.wait()
+        return FakeResult(self.rows)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePropriedadeRepository:
+    def __init__(self):
+        self.rows = {}
+
+    async def create(self, propriedade):
+        propriedade.id = len(self.rows) + 1
+        self.rows[propriedade.id] = propriedade
+        return propriedade
+
+    async def get_by_id(self, propriedade_id):
+        return self.rows.get(propriedade_id)
+
+    async def update(self, propriedade):
+        return propriedade
+
+    async def delete(self, propriedade_id):
+        return self.rows.pop(propriedade_id, None)
+
+
+def dto(estado="MT", area_total=100.0, cls=PropriedadeCreateDTO):
+    return cls(nome="F", cidade="C", estado=estado, area_total=area_total, area_agricultavel=50.0, area_vegetacao=20.0, produtor_id=1)
+
+
+class TestColunasPropriedade:
+    """Test cases for the array-backed property columns."""
+
+    def test_upsert_remove_and_grow(self):
+        colunas = ColunasPropriedade(capacidade=2)
+        for i in range(1, 6):
+            colunas.upsert(i, "MT" if i % 2 else "GO", 10.0 * i, 5.0, 1.0, 1)
+        colunas.upsert(2, "SP", 100.0, 5.0, 1.0, 1)
+        colunas.remove(1)
+        colunas.remove(42)
+
+        assert colunas.tamanho == 4
+        assert sorted(colunas.posicao) == [2, 3, 4, 5]
+        assert all(colunas.ids[i] == id for id, i in colunas.posicao.items())
+        assert colunas.soma("area_total") == 100.0 + 30.0 + 40.0 + 50.0
+        assert colunas.por_estado() == {"MT": 2, "GO": 1, "SP": 1}
+
+    def test_states_without_properties_are_omitted(self):
+        colunas = ColunasPropriedade.from_rows([(1, "MT", 10.0, 5.0, 1.0, 1), (2, "GO", 20.0, 5.0, 1.0, 1)])
+        colunas.remove(2)
+        assert colunas.por_estado("area_total") == {"MT": 10.0}
+
+
+class TestPropriedadeMirror:
+    """Test cases for keeping the mirror current."""
+
+    @pytest.mark.asyncio
+    async def test_service_writes_update_mirror(self):
+        mirror = PropriedadeMirror()
+        mirror.colunas = ColunasPropriedade()
+        service = PropriedadeService(FakePropriedadeRepository(), mirror=mirror)
+
+        criada = await service.create_propriedade(dto("MT"))
+        await service.create_propriedade(dto("GO"))
+        await service.update_propriedade(criada.id, dto("PR", 300.0, PropriedadeUpdateDTO))
+        await service.delete_propriedade(2)
+
+        assert mirror.colunas.por_estado("area_total") == {"PR": 300.0}
+
+    @pytest.mark.asyncio
+    async def test_writes_during_reconcile_are_replayed(self):
+        mirror = PropriedadeMirror()
+        liberar = asyncio.Event()
+        rows = [(1, "MT", 10.0, 5.0, 1.0, 1), (2, "GO", 20.0, 5.0, 1.0, 1)]
+
+        reconciliacao = asyncio.create_task(mirror.reconcile(lambda: FakeSession(rows, liberar)))
+        await asyncio.sleep(0)
+        mirror.aplicar(Propriedade(id=3, estado="SP", area_total=30.0, area_agricultavel=5.0, area_vegetacao=1.0, produtor_id=1))
+        mirror.remover(1)
+        liberar.set()
+
+        assert await reconciliacao == 2
+        assert mirror.colunas.por_estado() == {"GO": 1, "SP": 1}
+
+    @pytest.mark.asyncio
+    async def test_matches_sql_backend(self, sqlite_session, dados_dashboard):
+        mirror = PropriedadeMirror()
+        rows = [
+            (p["id"], p["estado"], p["area_total"], p["area_agricultavel"], p["area_vegetacao"], p["produtor_id"])
+            for p in dados_dashboard[Propriedade]
+        ]
+        mirror.colunas = ColunasPropriedade.from_rows(rows)
+
+        divergencias = await compare_backends(DashboardService(sqlite_session), MirrorDashboardService(sqlite_session, mirror))
+
+        assert divergencias == {}
@@ -0,0 +1,111 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import MetaData, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.changes.entities.alteracao import Alteracao
+from modules.changes.repositories.alteracao_repository import AlteracaoRepository
+from modules.debug.controllers import debug_controller
+from shared.config.settings import settings
+from shared.database.slow_queries import SlowQueryLog, explicavel, formato_dos_parametros, normalizar_sql
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    metadata = MetaData()
+    Alteracao.__table__.to_metadata(metadata)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+class TestNormalizacao:
+    """Test cases for grouping statements by shape."""
+
+    def test_literals_and_placeholders_become_question_marks(self):
+        sql = "SELECT *\n  FROM produtores WHERE nome = 'Ana' AND id IN ($1, $2, $3) LIMIT 10"
+        assert normalizar_sql(sql) == "SELECT * FROM produtores WHERE nome = ? AND id IN (?, ...) LIMIT ?"
+        assert normalizar_sql("SELECT t1.col2 FROM t1") == "SELECT t1.col2 FROM t1"
+
+    def test_parameter_shape_hides_values(self):
+        assert formato_dos_parametros((1, "Ana"), False) == ["int", "str"]
+        assert formato_dos_parametros({"id": 1}, False) == {"id": "int"}
+        assert formato_dos_parametros([(1,), (2,)], True) == {"linhas": 2, "tipos": ["int"]}
+
+    def test_only_selects_are_explained(self):
+        assert explicavel("  select 1 from produtores")
+        assert not explicavel("UPDATE produtores SET nome = $1")
+
+    def test_locking_and_function_call_selects_are_not_explained(self):
+        assert explicavel("SELECT count(*) FROM safras WHERE nome = 'FOR UPDATE'")
+        assert not explicavel("SELECT pg_advisory_xact_lock($1)")
+        assert not explicavel("SELECT setval('culturas_id_seq', 10)")
+        assert not explicavel("SELECT id FROM propriedades WHERE id = $1 FOR UPDATE")
+        assert not explicavel("SELECT id FROM produtores WHERE id IN ($1) FOR NO KEY UPDATE")
+        assert not explicavel("SELECT propriedades.id FROM propriedades FOR SHARE OF propriedades")
+        assert not explicavel("SELECT nextval('safras_id_seq') FROM generate_series(1, 10)")
+
+
+class TestSlowQueryLog:
+    """Test cases for the engine hooks."""
+
+    @pytest.mark.asyncio
+    async def test_records_statement_with_calling_repository_method(self, engine):
+        log = SlowQueryLog(limite_ms=0, amostra_explain=100, max_registros=2)
+        log.instrumentar(engine)
+
+        async with AsyncSession(engine) as session:
+            await AlteracaoRepository(session).get_since(5, 10)
+
+        registro = log.snapshot()["consultas"][0]
+        assert registro["chamador"] == "modules.changes.repositories.alteracao_repository:AlteracaoRepository.get_since"
+        assert registro["sql"].startswith("SELECT alteracoes.seq")
+        assert set(registro["parametros"]) == {"int"}
+        # EXPLAIN só existe no Postgres
+        assert registro["plano"] is None
+
+    @pytest.mark.asyncio
+    async def test_threshold_and_ring_buffer(self, engine):
+        rapido = SlowQueryLog(limite_ms=10_000, amostra_explain=0, max_registros=2)
+        todos = SlowQueryLog(limite_ms=0, amostra_explain=0, max_registros=2)
+        rapido.instrumentar(engine)
+        todos.instrumentar(engine)
+
+        async with engine.connect() as conn:
+            for i in range(3):
+                await conn.execute(text(f"SELECT {i}"))
+
+        assert rapido.snapshot()["consultas"] == []
+        assert todos.total == 3
+        assert len(todos.snapshot()["consultas"]) == 2
+        assert todos.snapshot()["consultas"][0]["chamador"] is None
+
+    @pytest.mark.asyncio
+    async def test_failed_statement_does_not_leave_its_start_behind(self, engine):
+        log = SlowQueryLog(limite_ms=0, amostra_explain=0, max_registros=2)
+        log.instrumentar(engine)
+
+        async with engine.connect() as conn:
+            with pytest.raises(Exception):
+                await conn.execute(text("SELECT * FROM nao_existe"))
+            await conn.rollback()
+            await conn.execute(text("SELECT 1"))
+            inicios = (await conn.get_raw_connection()).info["slow_query_inicio"]
+
+        assert inicios == []
+        assert log.total == 1
+
+    @pytest.mark.asyncio
+    async def test_endpoint_requires_debug_token(self, monkeypatch):
+        monkeypatch.setattr(settings, "debug_token", "segredo")
+        monkeypatch.setattr(debug_controller, "slow_query_log", SlowQueryLog(limite_ms=0, amostra_explain=0, max_registros=1))
+        app = FastAPI()
+        app.include_router(debug_controller.router)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            assert (await client.get("/debug/slow-queries")).status_code == 403
+            response = await client.get("/debug/slow-queries", headers={"X-Debug-Token": "segredo"})
+
+        assert response.json()["consultas"] == []
@@ -0,0 +1,102 @@
+from datetime import datetime
+import pytest
+import pyarrow
+import pyarrow.parquet as parquet
+from sqlalchemy import select, text
+from shared.snapshots.exporter import SNAPSHOT_TABLES, SnapshotExporter, arrow_schema, version_expression
+from shared.snapshots.reader import read_snapshot
+
+
+def write_part(pasta, nome, linhas):
+    schema = arrow_schema(SNAPSHOT_TABLES["safras"])
+    pasta.mkdir(parents=True, exist_ok=True)
+    linhas = [dict(linha, versao=1) for linha in linhas]
+    parquet.write_table(pyarrow.Table.from_pylist(linhas, schema=schema), pasta / nome)
+
+
+class TestSnapshotFormat:
+    """Test cases for the Parquet snapshot layout."""
+
+    def test_partition_column_is_not_stored_in_files(self):
+        schema = arrow_schema(SNAPSHOT_TABLES["safras"])
+        assert schema.names == ["id", "propriedade_id", "versao", "excluido_em", "_versao"]
+        assert "estado" not in arrow_schema(SNAPSHOT_TABLES["propriedades"]).names
+
+    def test_version_expression_extends_xid_with_epoch(self):
+        sql = str(select(version_expression((1 << 32) + 500)))
+        assert "4294967296 + xmin::text::bigint > 4294967796" in sql
+        assert "THEN 0 + xmin::text::bigint" in sql
+
+    def test_read_snapshot_keeps_latest_version(self, tmp_path):
+        write_part(tmp_path / "safras" / "ano=2024", "part-1.parquet", [
+            {"id": 1, "propriedade_id": 10, "_versao": 100},
+            {"id": 2, "propriedade_id": 20, "_versao": 101},
+        ])
+        # Execução incremental: a safra 1 mudou de ano
+        write_part(tmp_path / "safras" / "ano=2025", "part-2.parquet", [
+            {"id": 1, "propriedade_id": 10, "_versao": 200},
+        ])
+
+        tabela = read_snapshot(tmp_path, "safras")
+
+        assert sorted(zip(tabela.column("id").to_pylist(), tabela.column("ano").to_pylist())) == [(1, 2025), (2, 2024)]
+
+    def test_read_snapshot_drops_soft_deleted_rows(self, tmp_path):
+        write_part(tmp_path / "safras" / "ano=2024", "part-1.parquet", [
+            {"id": 1, "propriedade_id": 10, "_versao": 100},
+            {"id": 2, "propriedade_id": 20, "_versao": 101},
+        ])
+        # Execução incremental depois da exclusão lógica da safra 2
+        write_part(tmp_path / "safras" / "ano=2024", "part-2.parquet", [
+            {"id": 2, "propriedade_id": 20, "excluido_em": datetime(2025, 1, 1), "_versao": 200},
+        ])
+
+        tabela = read_snapshot(tmp_path, "safras")
+
+        assert tabela.column("id").to_pylist() == [1]
+
+    def test_read_missing_table_is_empty(self, tmp_path):
+        tabela = read_snapshot(tmp_path, "culturas")
+        assert tabela.num_rows == 0
+        assert "ano" in tabela.schema.names
+
+    def test_publish_replaces_on_full_run_and_appends_on_incremental(self, tmp_path):
+        exporter = SnapshotExporter(None, tmp_path)
+        write_part(tmp_path / "safras" / "ano=2024", "part-velho.parquet", [{"id": 1, "propriedade_id": 1, "_versao": 1}])
+
+        write_part(tmp_path / ".tmp-a" / "safras" / "ano=2025", "part-a.parquet", [{"id": 2, "propriedade_id": 1, "_versao": 2}])
+        exporter.publish(tmp_path / ".tmp-a", completo=False)
+        assert sorted(p.name for p in (tmp_path / "safras").rglob("*.parquet")) == ["part-a.parquet", "part-velho.parquet"]
+
+        write_part(tmp_path / ".tmp-b" / "safras" / "ano=2025", "part-b.parquet", [{"id": 2, "propriedade_id": 1, "_versao": 3}])
+        exporter.publish(tmp_path / ".tmp-b", completo=True)
+        assert [p.name for p in (tmp_path / "safras").rglob("*.parquet")] == ["part-b.parquet"]
+
+
+@pytest.mark.integration
+class TestSnapshotExport:
+    """Integration tests exporting from the test database."""
+
+    @pytest.mark.asyncio
+    async def test_full_then_incremental_export(self, test_db_setup, tmp_path):
+        from tests.conftest import test_engine
+
+        async with test_engine.begin() as conn:
+            await conn.execute(text("INSERT INTO produtores (documento_tipo, documento_chave, nome) VALUES (1, 529982247, 'Snapshot')"))
+
+        exporter = SnapshotExporter(test_engine, tmp_path, batch_size=2)
+        primeiro = await exporter.export()
+        assert primeiro["completo"] is True
+        assert primeiro["linhas"]["produtores"] >= 1
+
+        segundo = await exporter.export()
+        assert segundo["completo"] is False
+        assert segundo["linhas"]["produtores"] == 0
+
+        async with test_engine.begin() as conn:
+            await conn.execute(text("UPDATE produtores SET nome = 'Snapshot 2' WHERE documento_chave = 529982247"))
+        terceiro = await exporter.export()
+        assert terceiro["linhas"]["produtores"] == 1
+
+        nomes = read_snapshot(tmp_path, "produtores").column("nome").to_pylist()
+        assert "Snapshot 2" in nomes and "Snapshot" not in nomes
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from shared.database.warmup import warm_up
+from shared.database.session import engine
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+IMPORT_TIME_BUDGET_S = float(os.getenv("IMPORT_TIME_BUDGET_S", "3.0"))
+
+
+class TestAppFactory:
+    """Test cases for the application factory."""
+
+    def test_all_module_routers_registered(self):
+        from main import create_app
+
+        paths = create_app().openapi()["paths"]
+        for prefix in ("/produtores/", "/propriedades/", "/safras/", "/culturas/", "/dashboard/totais", "/jobs/"):
+            assert prefix in paths
+
+    def test_cold_import_within_budget(self):
+        """Importing the app in a fresh interpreter must stay within the budget."""
+        env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+        output = subprocess.run(
+            [sys.executable, "-c", "import main; print(main.IMPORT_SECONDS)"],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        assert float(output.strip()) < IMPORT_TIME_BUDGET_S
+
+
+class TestWarmUp:
+    """Test cases for connection warm-up."""
+
+    @pytest.mark.asyncio
+    async def test_warm_up_disabled(self):
+        assert await warm_up(engine, 0) == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_warm_up_fills_pool(self, test_db_setup):
+        from tests.conftest import test_engine
+
+        assert await warm_up(test_engine, 2) == 2
+        assert test_engine.pool.checkedin() >= 2
@@ -0,0 +1,144 @@
+import json
+import threading
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import MetaData, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from modules.produtor.controllers import produtor_controller
+from modules.produtor.entities.produtor import Produtor
+from modules.propriedade.entities.propriedade import Propriedade
+from shared.database import tracing as db_tracing
+from shared.database.session import get_read_db
+from shared.middlewares.tracing import TracingMiddleware
+from shared.utils.documento_fiscal import TIPO_CPF
+from shared.utils.tracing import (
+    ArquivoExporter,
+    MemoriaExporter,
+    Span,
+    formatar_traceparent,
+    ler_traceparent,
+    tracer,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PAI_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    metadata = MetaData()
+    for model in (Produtor, Propriedade):
+        model.__table__.to_metadata(metadata)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.execute(insert(Produtor), [{"id": 1, "documento_tipo": TIPO_CPF, "documento_chave": 529982247, "nome": "Ana"}])
+    db_tracing.instrumentar(engine)
+    yield engine
+    await engine.dispose()
+
+
+def make_app(engine):
+    app = FastAPI()
+    app.include_router(produtor_controller.router)
+
+    async def sqlite_db():
+        async with AsyncSession(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = sqlite_db
+    app.add_middleware(TracingMiddleware)
+    return app
+
+
+class TestTraceContext:
+    """Test cases for W3C traceparent parsing."""
+
+    def test_parse_and_format(self):
+        assert ler_traceparent(f"00-{TRACE_ID}-{PAI_ID}-01") == (TRACE_ID, PAI_ID)
+        assert formatar_traceparent(TRACE_ID, PAI_ID) == f"00-{TRACE_ID}-{PAI_ID}-01"
+
+    @pytest.mark.parametrize("valor", [None, "", "lixo", f"01-{TRACE_ID}-{PAI_ID}-01", f"00-{'0' * 32}-{PAI_ID}-01", f"00-{TRACE_ID}-{'0' * 16}-01"])
+    def test_invalid_headers_start_a_new_trace(self, valor):
+        assert ler_traceparent(valor) is None
+
+
+class TestTracing:
+    """Test cases for spans across the controller, service and repository layers."""
+
+    @pytest.mark.asyncio
+    async def test_request_spans_are_nested_by_layer(self, engine, monkeypatch):
+        exporter = MemoriaExporter(10)
+        monkeypatch.setattr(tracer, "exporter", exporter)
+
+        async with AsyncClient(transport=ASGITransport(app=make_app(engine)), base_url="http://test") as client:
+            response = await client.get("/produtores/1", headers={"traceparent": f"00-{TRACE_ID}-{PAI_ID}-01"})
+
+        assert response.status_code == 200
+        spans = exporter.obter(TRACE_ID)
+        # O segundo SELECT é o selectin das propriedades do produtor
+        assert [span["camada"] for span in spans] == ["http", "controller", "service", "repository", "db", "db"]
+
+        http, handler, servico, repositorio, sql, propriedades = spans
+        assert http["nome"] == "GET /produtores/{produtor_id}" and http["pai_id"] == PAI_ID
+        assert http["atributos"]["http.status_code"] == 200
+        assert handler["nome"] == "produtor_controller.get_produtor" and handler["pai_id"] == http["span_id"]
+        assert servico["nome"] == "ProdutorService.get_produtor_by_id" and servico["pai_id"] == handler["span_id"]
+        assert repositorio["nome"] == "ProdutorRepository.get_by_id" and repositorio["pai_id"] == servico["span_id"]
+        assert sql["pai_id"] == propriedades["pai_id"] == repositorio["span_id"]
+        assert sql["atributos"]["db.statement"].startswith("SELECT produtores.")
+        assert (sql["atributos"]["db.rows"], propriedades["atributos"]["db.rows"]) == (1, 0)
+        assert response.headers["traceresponse"] == formatar_traceparent(TRACE_ID, http["span_id"])
+
+    @pytest.mark.asyncio
+    async def test_errors_are_recorded_and_new_trace_started(self, engine, monkeypatch):
+        exporter = MemoriaExporter(10)
+        monkeypatch.setattr(tracer, "exporter", exporter)
+
+        async with AsyncClient(transport=ASGITransport(app=make_app(engine)), base_url="http://test") as client:
+            response = await client.get("/produtores/99")
+
+        assert response.status_code == 404
+        [trace] = exporter.listar()
+        assert trace["raiz"] == "GET /produtores/{produtor_id}"
+        spans = exporter.obter(trace["trace_id"])
+        assert next(span for span in spans if span["camada"] == "controller")["erro"] == "HTTPException"
+
+    @pytest.mark.asyncio
+    async def test_disabled_tracing_records_nothing(self, engine, monkeypatch):
+        monkeypatch.setattr(tracer, "exporter", None)
+
+        async with AsyncClient(transport=ASGITransport(app=make_app(engine)), base_url="http://test") as client:
+            response = await client.get("/produtores/1")
+
+        assert response.status_code == 200
+        assert "traceresponse" not in response.headers
+
+    def test_file_exporter_writes_one_span_per_line(self, tmp_path):
+        exporter = ArquivoExporter(tmp_path / "traces.jsonl")
+        filho = Span("ProdutorRepository.get_by_id", "repository", TRACE_ID, "a" * 16)
+        raiz = Span("GET /produtores/{produtor_id}", "http", TRACE_ID, None)
+        for span in (filho, raiz):
+            tracer.fechar(span)
+            exporter.exportar(span)
+
+        linhas = [json.loads(linha) for linha in (tmp_path / "traces.jsonl").read_text().splitlines()]
+        assert [linha["camada"] for linha in linhas] == ["repository", "http"]
+        assert linhas[1]["duracao_ms"] >= 0
+
+    @pytest.mark.asyncio
+    async def test_file_exporter_writes_off_the_event_loop(self, tmp_path, monkeypatch):
+        exporter = ArquivoExporter(tmp_path / "traces.jsonl")
+        threads = []
+        flush = exporter.flush
+        monkeypatch.setattr(exporter, "flush", lambda: threads.append(threading.get_ident()) or flush())
+
+        for camada in ("repository", "http", "http"):
+            span = Span("GET /produtores/", camada, TRACE_ID, None)
+            tracer.fechar(span)
+            exporter.exportar(span)
+        await exporter.encerrar()
+
+        assert threading.get_ident() not in threads
+        assert len((tmp_path / "traces.jsonl").read_text().splitlines()) == 3